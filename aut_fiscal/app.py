@@ -1,5 +1,6 @@
+import os
+import sys
 import pandas as pd
-import mysql.connector
 import numpy as np
 from datetime import datetime
 from datetime import datetime
@@ -8,24 +9,25 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.sql import text
 from flask import jsonify, session
 
+# Raiz do repositório no sys.path, para o pacote comum/ (módulos compartilhados entre os painéis)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.banco import conectar
+
 app = Flask(__name__, template_folder='templates')
 
+banco_fiscal = conectar({
+    'user': '',
+    'password': '',
+    'host': '',
+    'database': ''
+}, nome='fiscal')
+
 def fetch_data():
-    config = {
-        'user': '',
-        'password': '',
-        'host': '',
-        'database': ''
-    }
-
-    conn = mysql.connector.connect(**config)
     query = '''
     select ***
     '''
     
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    return banco_fiscal.consultar(query)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = '*.db'
 app.config['SQLALCHEMY_BINDS'] = {
@@ -0,0 +1,13 @@
+"""
+Projeto: Portal Vidros - Módulos compartilhados
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         __init__.py
+
+* @brief
+    Pacote com o que é comum aos painéis (dash_vendas, ti, aut_fiscal):
+    acesso ao banco (banco.py) e instrumentação dos callbacks Dash
+    (instrumentacao.py). Cada painel coloca a raiz do repositório no
+    sys.path no seu ponto de entrada e importa daqui, ex.:
+    from comum.banco import conectar
+"""
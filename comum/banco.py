@@ -0,0 +1,156 @@
+"""
+Projeto: Portal Vidros - Acesso a dados compartilhado
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         banco.py
+
+* @brief
+    Camada de acesso ao banco usada pelos painéis (dash_vendas, aut_fiscal, ti).
+
+    Cada BancoDados mantém um pool limitado de conexões com o ERP (MySQL), em
+    vez de abrir e fechar uma conexão a cada consulta. Toda consulta tem tempo
+    limite e entra nas métricas (quantidade, tempo de espera por conexão, tempo
+    de execução e erros). O backend é trocável: com PORTAL_BANCO_SQLITE
+    apontando para um arquivo, as consultas vão para um SQLite local, usado em
+    testes e benchmarks.
+
+    Uso:
+        banco = conectar(config, nome='vendas')
+        df = banco.consultar("SELECT ... WHERE PERIODO >= %s", (data,))
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+TAMANHO_POOL = 4
+TEMPO_LIMITE = 120  # segundos por consulta
+
+
+class TempoEsgotado(Exception):
+    """Não havia conexão livre no pool dentro do tempo limite."""
+
+
+class BackendMySQL:
+    def __init__(self, config, nome, tamanho_pool=TAMANHO_POOL):
+        self._config = config
+        self._nome = nome
+        self._tamanho_pool = tamanho_pool
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _obter_pool(self):
+        # O pool é criado na primeira consulta, não na importação do módulo
+        with self._lock:
+            if self._pool is None:
+                from mysql.connector import pooling
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=f'portal_{self._nome}', pool_size=self._tamanho_pool,
+                    pool_reset_session=True, **self._config,
+                )
+            return self._pool
+
+    def abrir(self):
+        return self._obter_pool().get_connection()
+
+    def executar(self, conexao, query, params, tempo_limite):
+        cursor = conexao.cursor()
+        try:
+            # Limite de execução aplicado pelo próprio servidor (milissegundos, só para SELECT)
+            cursor.execute('SET SESSION MAX_EXECUTION_TIME = %s', (int(tempo_limite * 1000),))
+            cursor.execute(query, params)
+            colunas = [coluna[0] for coluna in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=colunas, coerce_float=True)
+        finally:
+            cursor.close()
+
+    def devolver(self, conexao):
+        # Em uma conexão do pool, close() devolve a conexão ao pool
+        conexao.close()
+
+
+class BackendSQLite:
+    """Substituto local do ERP: as consultas usam o mesmo estilo de parâmetro (%s) do MySQL."""
+
+    def __init__(self, caminho):
+        self._caminho = caminho
+
+    def abrir(self):
+        return sqlite3.connect(self._caminho, check_same_thread=False)
+
+    def executar(self, conexao, query, params, tempo_limite):
+        if params is not None:
+            query = re.sub(r'%%|%s', lambda m: '%' if m.group() == '%%' else '?', query)
+            params = tuple(p.isoformat() if hasattr(p, 'isoformat') else p for p in params)
+        # Interrompe a consulta quando o tempo limite é atingido
+        prazo = time.monotonic() + tempo_limite
+        conexao.set_progress_handler(lambda: time.monotonic() > prazo, 10000)
+        cursor = conexao.execute(query, params or ())
+        colunas = [coluna[0] for coluna in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=colunas, coerce_float=True)
+
+    def devolver(self, conexao):
+        conexao.close()
+
+
+class BancoDados:
+    def __init__(self, backend, nome, tamanho_pool=TAMANHO_POOL, tempo_limite=TEMPO_LIMITE):
+        self.nome = nome
+        self._backend = backend
+        self._tempo_limite = tempo_limite
+        # Limita as conexões em uso; quem passar do limite espera uma ser devolvida
+        self._vagas = threading.BoundedSemaphore(tamanho_pool)
+        self._lock = threading.Lock()
+        self._metricas = {'consultas': 0, 'erros': 0, 'espera_conexao': 0.0, 'execucao': 0.0,
+                          'execucao_maxima': 0.0, 'ultima_execucao': None}
+
+    def consultar(self, query, params=None, tempo_limite=None):
+        """Executa a consulta e devolve um DataFrame."""
+        tempo_limite = tempo_limite or self._tempo_limite
+        inicio = time.perf_counter()
+        if not self._vagas.acquire(timeout=tempo_limite):
+            self._registrar(time.perf_counter() - inicio, 0.0, erro=True)
+            raise TempoEsgotado(f'Sem conexão livre para {self.nome} em {tempo_limite}s')
+        conexao = None
+        espera = execucao = 0.0
+        try:
+            conexao = self._backend.abrir()
+            espera = time.perf_counter() - inicio
+            df = self._backend.executar(conexao, query, params, tempo_limite)
+            execucao = time.perf_counter() - inicio - espera
+            self._registrar(espera, execucao)
+            return df
+        except Exception:
+            self._registrar(espera, time.perf_counter() - inicio - espera, erro=True)
+            raise
+        finally:
+            if conexao is not None:
+                self._backend.devolver(conexao)
+            self._vagas.release()
+
+    def _registrar(self, espera, execucao, erro=False):
+        with self._lock:
+            metricas = self._metricas
+            metricas['consultas'] += 1
+            metricas['erros'] += int(erro)
+            metricas['espera_conexao'] += espera
+            metricas['execucao'] += execucao
+            metricas['execucao_maxima'] = max(metricas['execucao_maxima'], execucao)
+            metricas['ultima_execucao'] = execucao
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas)
+
+
+def conectar(config, nome, tamanho_pool=TAMANHO_POOL, tempo_limite=TEMPO_LIMITE):
+    """Cria o acesso a uma base. PORTAL_BANCO_SQLITE troca o MySQL por um arquivo SQLite local."""
+    caminho_sqlite = os.environ.get('PORTAL_BANCO_SQLITE')
+    if caminho_sqlite:
+        backend = BackendSQLite(caminho_sqlite)
+    else:
+        backend = BackendMySQL(config, nome, tamanho_pool)
+    return BancoDados(backend, nome, tamanho_pool, tempo_limite)
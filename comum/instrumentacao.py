@@ -0,0 +1,291 @@
+"""
+Projeto: Portal Vidros - Instrumentação dos callbacks Dash
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         instrumentacao.py
+
+* @brief
+    Métricas por callback para os painéis Dash (dash_vendas, ti).
+
+    instrumentar_callbacks(app) envolve cada callback registrado no app e mede
+    o tempo de resposta, o tempo de CPU, o tamanho da resposta (bytes do JSON
+    enviado ao navegador) e os erros, por callback e pelos rótulos pedidos
+    (ex.: o vendedor selecionado). As medidas ficam em histogramas expostos no
+    formato texto do Prometheus na rota /metrics do app.server. Chamadas mais
+    lentas que o limite (PORTAL_CALLBACK_LENTO, em segundos) vão para o log
+    'portal.callbacks' e, com PORTAL_LOG_CALLBACKS apontando para um arquivo,
+    também para ele.
+
+    Com vários workers (gunicorn), cada processo tem as próprias métricas e
+    todas as séries levam o rótulo 'processo' (pid do worker). Uma requisição
+    em /metrics cai em um worker só; para ver todos, aponte PORTAL_METRICAS_DIR
+    para uma pasta comum: cada worker grava ali as suas séries depois de cada
+    callback e /metrics devolve as de todos os workers vivos. Sem a pasta, cada
+    worker precisa ser coletado separadamente.
+
+    Os callbacks são envolvidos na primeira requisição (e em qualquer uma em
+    que apareçam callbacks novos), então o hook pode ser chamado logo depois de
+    criar o app, antes dos @app.callback.
+
+    Uso:
+        instrumentar_callbacks(app, rotulos={'vendedor': 'vendedor-dropdown.value'})
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from dash.exceptions import PreventUpdate
+from flask import Response
+from plotly.utils import PlotlyJSONEncoder
+
+LIMITE_LENTO = float(os.environ.get('PORTAL_CALLBACK_LENTO', '1.0'))
+BALDES_TEMPO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_BYTES = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000)
+PASTA_METRICAS = os.environ.get('PORTAL_METRICAS_DIR')
+CABECALHOS = (
+    ('dash_callback_tempo_segundos', 'histogram', 'Tempo de resposta do callback'),
+    ('dash_callback_cpu_segundos', 'histogram', 'Tempo de CPU do callback'),
+    ('dash_callback_resposta_bytes', 'histogram', 'Tamanho da resposta do callback'),
+    ('dash_callback_erros_total', 'counter', 'Chamadas do callback que terminaram em erro'),
+)
+
+log = logging.getLogger('portal.callbacks')
+if os.environ.get('PORTAL_LOG_CALLBACKS'):
+    _handler = logging.FileHandler(os.environ['PORTAL_LOG_CALLBACKS'], encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus (baldes 'le', soma e contagem)."""
+
+    def __init__(self, baldes):
+        self.baldes = baldes
+        self.contagens = [0] * (len(baldes) + 1)  # o último é o +Inf
+        self.soma = 0.0
+        self.quantidade = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.baldes, valor)] += 1
+        self.soma += valor
+        self.quantidade += 1
+
+    def linhas(self, nome, rotulos):
+        acumulado = 0
+        for limite, contagem in zip(self.baldes + (float('inf'),), self.contagens):
+            acumulado += contagem
+            le = '+Inf' if limite == float('inf') else repr(limite)
+            yield f'{nome}_bucket{_rotulos(rotulos, le=le)} {acumulado}'
+        yield f'{nome}_sum{_rotulos(rotulos)} {self.soma}'
+        yield f'{nome}_count{_rotulos(rotulos)} {self.quantidade}'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(rotulos, **extras):
+    itens = list(rotulos) + list(extras.items())
+    if not itens:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in itens) + '}'
+
+
+def _tamanho(resposta):
+    # O Dash já devolve o JSON serializado; outros tipos são serializados só para medir
+    if isinstance(resposta, (str, bytes)):
+        return len(resposta)
+    try:
+        return len(json.dumps(resposta, cls=PlotlyJSONEncoder))
+    except (TypeError, ValueError):
+        return 0
+
+
+class MetricasCallbacks:
+    def __init__(self, nomes_rotulos=(), limite_lento=LIMITE_LENTO):
+        self._nomes_rotulos = tuple(nomes_rotulos)
+        self._limite_lento = limite_lento
+        self._lock = threading.Lock()
+        # chave: (callback, valores dos rótulos) -> {'tempo', 'cpu', 'bytes': Histograma, 'erros': int}
+        self._series = {}
+        # Incrementada a cada registro: a PastaMetricas só regrava quando algo mudou
+        self.versao = 0
+
+    def registrar(self, callback, valores, tempo, cpu, tamanho, erro):
+        chave = (callback, valores)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = {'tempo': Histograma(BALDES_TEMPO), 'cpu': Histograma(BALDES_TEMPO),
+                                               'bytes': Histograma(BALDES_BYTES), 'erros': 0}
+            serie['tempo'].observar(tempo)
+            serie['cpu'].observar(cpu)
+            if not erro:
+                serie['bytes'].observar(tamanho)
+            serie['erros'] += int(erro)
+            self.versao += 1
+
+        if tempo >= self._limite_lento:
+            rotulos = ' '.join(f'{nome}={valor}' for nome, valor in zip(self._nomes_rotulos, valores))
+            log.warning('callback lento: %s %s tempo=%.3fs cpu=%.3fs bytes=%d erro=%s',
+                        callback, rotulos, tempo, cpu, tamanho, erro)
+
+    def amostras(self):
+        """Linhas de cada métrica deste processo: {nome da métrica: [linhas]}."""
+        processo = str(os.getpid())
+        campos = {'dash_callback_tempo_segundos': 'tempo', 'dash_callback_cpu_segundos': 'cpu',
+                  'dash_callback_resposta_bytes': 'bytes'}
+        amostras = {nome: [] for nome, _, _ in CABECALHOS}
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: (item[0][0],) + item[0][1])
+            for (callback, valores), serie in series:
+                rotulos = [('processo', processo), ('callback', callback)] + list(zip(self._nomes_rotulos, valores))
+                for nome, campo in campos.items():
+                    amostras[nome].extend(serie[campo].linhas(nome, rotulos))
+                amostras['dash_callback_erros_total'].append(
+                    f'dash_callback_erros_total{_rotulos(rotulos)} {serie["erros"]}')
+        return amostras
+
+    def texto_prometheus(self, outras=()):
+        """Texto do Prometheus com as séries deste processo e as de 'outras' (amostras de outros workers)."""
+        todas = [self.amostras()] + list(outras)
+        linhas = []
+        for nome, tipo, ajuda in CABECALHOS:
+            linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+            for amostras in todas:
+                linhas.extend(amostras.get(nome, []))
+        return '\n'.join(linhas) + '\n'
+
+
+class PastaMetricas:
+    """Pasta onde cada worker grava as suas amostras, para /metrics responder por todos."""
+
+    def __init__(self, pasta):
+        self._pasta = pasta
+        self._versao_publicada = 0
+        os.makedirs(pasta, exist_ok=True)
+
+    def publicar(self, metricas):
+        versao = metricas.versao
+        if versao == self._versao_publicada:
+            return
+        self._versao_publicada = versao
+        caminho = os.path.join(self._pasta, f'{os.getpid()}.json')
+        temporario = f'{caminho}.{threading.get_ident()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(metricas.amostras(), arquivo)
+        # Troca atômica: quem lê nunca vê o arquivo pela metade
+        os.replace(temporario, caminho)
+
+    def outras(self):
+        """Amostras gravadas pelos demais workers vivos; arquivos de workers encerrados são removidos."""
+        amostras = []
+        for caminho in glob.glob(os.path.join(self._pasta, '*.json')):
+            pid = int(os.path.splitext(os.path.basename(caminho))[0])
+            if pid == os.getpid():
+                continue
+            if not _processo_vivo(pid):
+                _remover(caminho)
+                continue
+            try:
+                with open(caminho, encoding='utf-8') as arquivo:
+                    amostras.append(json.load(arquivo))
+            except (OSError, ValueError):
+                continue
+        return amostras
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # O processo existe, só pertence a outro usuário
+        pass
+    return True
+
+
+def _remover(caminho):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+
+def _posicoes_rotulos(entrada, rotulos):
+    """Posição de cada rótulo nos argumentos do callback (Inputs seguidos dos States)."""
+    dependencias = [f"{item['id']}.{item['property']}" if isinstance(item['id'], str) else None
+                    for item in entrada.get('inputs', []) + entrada.get('state', [])]
+    return tuple(dependencias.index(alvo) if alvo in dependencias else None for alvo in rotulos.values())
+
+
+def _envolver(funcao, nome, posicoes, metricas):
+    def instrumentada(*args, **kwargs):
+        valores = tuple('' if posicao is None or posicao >= len(args) else str(args[posicao]) for posicao in posicoes)
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        erro = False
+        resposta = None
+        try:
+            resposta = funcao(*args, **kwargs)
+            return resposta
+        except PreventUpdate:
+            raise
+        except Exception:
+            erro = True
+            raise
+        finally:
+            metricas.registrar(nome, valores, time.perf_counter() - inicio, time.thread_time() - inicio_cpu,
+                               _tamanho(resposta) if resposta is not None else 0, erro)
+
+    instrumentada.instrumentada = True
+    return instrumentada
+
+
+def instrumentar_callbacks(app, rotulos=None, limite_lento=LIMITE_LENTO, rota='/metrics', pasta=PASTA_METRICAS):
+    """Instrumenta os callbacks do app e publica as métricas em 'rota'.
+
+    rotulos: {nome do rótulo: 'id-do-componente.propriedade'} lido dos argumentos de cada callback.
+    pasta: pasta comum aos workers para /metrics juntar as séries de todos (None: só as do worker).
+    """
+    rotulos = rotulos or {}
+    metricas = MetricasCallbacks(rotulos.keys(), limite_lento)
+    compartilhada = PastaMetricas(pasta) if pasta else None
+    lock = threading.Lock()
+    vistos = set()
+
+    def envolver_novos():
+        if len(vistos) == len(app.callback_map):
+            return
+        with lock:
+            for id_saida, entrada in list(app.callback_map.items()):
+                vistos.add(id_saida)
+                funcao = entrada.get('callback')
+                # Callbacks clientside não passam pelo servidor
+                if funcao is None or getattr(funcao, 'instrumentada', False):
+                    continue
+                nome = getattr(funcao, '__name__', id_saida)
+                entrada['callback'] = _envolver(funcao, nome, _posicoes_rotulos(entrada, rotulos), metricas)
+
+    app.server.before_request(envolver_novos)
+
+    if compartilhada is not None:
+        @app.server.after_request
+        def publicar_metricas(resposta):
+            try:
+                compartilhada.publicar(metricas)
+            except OSError:
+                log.exception('falha ao gravar as métricas em %s', pasta)
+            return resposta
+
+    @app.server.route(rota)
+    def metricas_prometheus():
+        outras = compartilhada.outras() if compartilhada is not None else ()
+        return Response(metricas.texto_prometheus(outras), mimetype='text/plain; version=0.0.4')
+
+    return metricas
@@ -0,0 +1,119 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         agregacao_sql.py
+
+* @brief
+    Modo de agregação no banco (FAROL_AGREGACAO_SQL=1).
+
+    Em vez de trazer todas as linhas de vendas para o pandas, as somas mensais
+    do cubo (Vendedor, Grupo, Tipo_Produto, mês), as somas diárias dos pedidos
+    por vendedor e cliente e as somas mensais de frete e beneficiamento são
+    feitas com GROUP BY no MySQL, envolvendo as consultas originais. Só o mês
+    atual continua vindo detalhado: as linhas de venda, para a contagem de
+    clientes por grupo, e os pedidos, para os cards do mês. O consolidado de
+    todos os vendedores do cubo é somado no pandas, e a cada atualização o
+    cubo e os pedidos são agregados só a partir do corte da ingestão
+    incremental (ver fontes_erp.py).
+
+    As expressões repetem em SQL o que dados.py faz em pandas (primeiro nome
+    do vendedor, data dd/mm/aaaa e regras de desconto). As consultas são
+    escritas para o MySQL.
+"""
+import pandas as pd
+
+from cubo import MEDIDAS, NIVEIS, TODOS_OS_VENDEDORES
+from dados import GRUPOS_AGREGADOS
+
+EXPR_VENDEDOR = "SUBSTRING_INDEX(TRIM(Vendedor), ' ', 1)"
+# Data_Pedido pode vir formatada como dd/mm/aaaa ou como DATE
+EXPR_DATA_PEDIDO = "COALESCE(STR_TO_DATE(Data_Pedido, '%d/%m/%Y'), Data_Pedido)"
+
+# Mesmas regras de calcular_desconto_vetorizado, aplicadas ao total do item
+EXPR_RECEITA = """
+    CASE Tipo_Desconto
+        WHEN 'Porcentagem' THEN GREATEST(0, total_produto - (total_produto * Desconto / 100))
+        WHEN 'Reais' THEN total_produto - (total_produto * Desconto) / ((TOTAL - COALESCE(Valor_Frete, 0)) + Desconto)
+        ELSE total_produto
+    END"""
+
+
+def _inicio_do_mes(coluna):
+    # Primeiro dia do mês sem DATE_FORMAT, para não misturar '%' com os parâmetros %s
+    return f"DATE_SUB({coluna}, INTERVAL DAYOFMONTH({coluna}) - 1 DAY)"
+
+
+def _lista_sql(valores):
+    return ', '.join("'" + valor.replace("'", "''") + "'" for valor in valores)
+
+
+def consulta_cubo(query, chaves):
+    """Somas mensais de receita, m2 e pedidos agrupadas pelo vendedor e pelas chaves."""
+    colunas = ['Vendedor'] + chaves
+    posicoes = ', '.join(str(posicao) for posicao in range(1, len(colunas) + 2))
+    return f"""
+    SELECT {_inicio_do_mes('Data_Pedido')} AS Mes, {', '.join(colunas)},
+           SUM(receita) AS receita, SUM(m2) AS m2, COUNT(DISTINCT Id_Pedido) AS pedidos
+    FROM (
+        SELECT {EXPR_VENDEDOR} AS Vendedor, Grupo, Tipo_Produto, Id_Pedido, m2,
+               {EXPR_DATA_PEDIDO} AS Data_Pedido, {EXPR_RECEITA} AS receita
+        FROM ({query}) AS base
+    ) AS linhas
+    WHERE Data_Pedido IS NOT NULL
+    GROUP BY {posicoes}
+    """
+
+
+def buscar_cubo(consultar, query):
+    """Executa as consultas de todos os níveis do cubo e junta tudo em um DataFrame para CuboVendas.de_agregados.
+
+    Só as somas por vendedor vão ao banco; o consolidado TODOS_OS_VENDEDORES é
+    a soma delas. Cada pedido tem um único vendedor, então a contagem de
+    pedidos distintos também soma entre vendedores.
+    """
+    partes = []
+    for nivel, chaves in NIVEIS.items():
+        por_vendedor = consultar(consulta_cubo(query, chaves))
+        todos = por_vendedor.groupby(['Mes'] + chaves, dropna=False, sort=False)[list(MEDIDAS)].sum().reset_index()
+        partes += [por_vendedor.assign(Nivel=nivel), todos.assign(Vendedor=TODOS_OS_VENDEDORES, Nivel=nivel)]
+    return pd.concat(partes, ignore_index=True)
+
+
+def consulta_pedidos(query, mes_atual):
+    """Tabela de pedidos no formato de dados.montar_pedidos.
+
+    Só os pedidos do mês de 'mes_atual' vêm um por linha (cards do mês). Antes
+    dele, o histórico chega somado por dia, vendedor, cliente e cidade, o grão
+    que a coorte e a tabela cliente sintético usam; nessas linhas Id_Pedido e
+    Loja ficam vazios.
+    """
+    # Data gerada aqui (não vem do usuário); literal para não misturar com os '%' do STR_TO_DATE
+    detalhe = f"Data_Pedido >= '{pd.Timestamp(mes_atual).replace(day=1).date().isoformat()}'"
+    return f"""
+    SELECT CASE WHEN {detalhe} THEN Id_Pedido END AS Id_Pedido, Data_Pedido, Vendedor,
+           Matriz_Cliente, Cliente, Cidade, CASE WHEN {detalhe} THEN Loja END AS Loja,
+           SUM(TOTAL) AS TOTAL, SUM(m2_pedido) AS m2_pedido,
+           MAX(tem_vidro) AS tem_vidro, MAX(tem_agregados) AS tem_agregados
+    FROM (
+        SELECT Id_Pedido, MIN({EXPR_DATA_PEDIDO}) AS Data_Pedido, MIN(Vendedor) AS Vendedor,
+               MIN(Matriz_Cliente) AS Matriz_Cliente, MIN(Cliente) AS Cliente, MIN(Cidade) AS Cidade,
+               MIN(Loja) AS Loja, MAX(TOTAL) AS TOTAL, MAX(m2_pedido) AS m2_pedido,
+               MAX(Grupo = 'VIDRO') AS tem_vidro,
+               MAX(Grupo IN ({_lista_sql(GRUPOS_AGREGADOS)})) AS tem_agregados
+        FROM ({query}) AS base
+        GROUP BY Id_Pedido
+    ) AS pedidos
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """
+
+
+def somar_por_mes(query, coluna_data, chaves, valores):
+    """Envolve a consulta somando 'valores' por chaves e mês; a coluna de data passa a ser o 1º dia do mês."""
+    somas = ', '.join(f'SUM({valor}) AS {valor}' for valor in valores)
+    posicoes = ', '.join(str(posicao) for posicao in range(1, len(chaves) + 2))
+    return f"""
+    SELECT {', '.join(chaves)}, {_inicio_do_mes(coluna_data)} AS {coluna_data}, {somas}
+    FROM ({query}) AS base
+    GROUP BY {posicoes}
+    """
@@ -0,0 +1,49 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         atualizador.py
+
+* @brief
+    Processo atualizador do modo com vários workers.
+
+    É o único processo que consulta o ERP: a cada FAROL_INTERVALO_ATUALIZACAO
+    segundos busca as fontes (fontes_erp.py) e publica um novo snapshot em
+    FAROL_SNAPSHOT_COMPARTILHADO (ver compartilhado.py). Os workers do
+    gunicorn leem essa pasta; aumentar o número de workers não aumenta a
+    carga no banco. Com intervalo 0 publica uma vez e termina (ex.: cron).
+
+    Uso:
+        FAROL_SNAPSHOT_COMPARTILHADO=/srv/farol/snapshot python atualizador.py
+"""
+import os
+import sys
+import time
+import traceback
+
+# Raiz do repositório no sys.path, para o pacote comum/ (módulos compartilhados entre os painéis)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compartilhado import SnapshotCompartilhado
+from fontes_erp import VERSAO_FONTES, carregar_fontes
+
+INTERVALO_ATUALIZACAO = int(os.environ.get('FAROL_INTERVALO_ATUALIZACAO', '300'))
+SNAPSHOT_COMPARTILHADO = os.environ.get('FAROL_SNAPSHOT_COMPARTILHADO', 'snapshot_compartilhado')
+
+
+def publicar(compartilhado):
+    inicio = time.perf_counter()
+    versao = compartilhado.publicar(carregar_fontes())
+    print(f'Snapshot {versao} publicado em {time.perf_counter() - inicio:.1f}s {carregar_fontes.duracoes}', flush=True)
+
+
+if __name__ == '__main__':
+    compartilhado = SnapshotCompartilhado(SNAPSHOT_COMPARTILHADO, versao_esquema=VERSAO_FONTES)
+    while True:
+        try:
+            publicar(compartilhado)
+        except Exception:
+            # Os workers continuam com a última geração publicada
+            traceback.print_exc()
+        if not INTERVALO_ATUALIZACAO:
+            break
+        time.sleep(INTERVALO_ATUALIZACAO)
@@ -0,0 +1,282 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         benchmark.py
+
+* @brief
+    Benchmark reproduzível do Farol de Vendas com dados sintéticos.
+
+    Gera os dados com dados_sinteticos.gerar_dados (mesma semente, mesmos
+    dados) e mede, para cada etapa, o tempo (mínimo e mediana de N repetições,
+    com time.perf_counter) e o pico de memória alocada (tracemalloc):
+
+    - dados: preparação das fontes, montagem do snapshot (cubo, coorte,
+      índices mensais), visão do vendedor e recortes por período;
+    - ingestao: carga completa e atualização incremental das fontes a partir
+      dos dados sintéticos gravados em SQLite (dados_sinteticos.gravar_sqlite),
+      pelo mesmo caminho do ERP (fontes_erp.montar_fontes: filtro da marca
+      d'água no WHERE, preparação e junção). Os pedidos do último dia só são
+      gravados depois da primeira carga, e o resultado da atualização
+      incremental é conferido com o de uma carga completa ('verificacoes');
+    - main: cálculos e tabelas dos callbacks (calcular_somas,
+      create_faturamento_vidro_table, create_categoria_agregadas_table,
+      preparar_dados_cliente_sintetico, update_recompra_ultimos_6_meses...).
+      O main.py é importado sobre uma cópia local (Parquet) dos dados
+      sintéticos, sem acessar o banco. Sem o Dash instalado essa parte é
+      marcada como pulada.
+
+    O resultado sai em JSON (--saida). Com --comparar, os tempos são comparados
+    com um resultado anterior e o script termina com código 1 se alguma etapa
+    ficar mais lenta que a tolerância.
+
+    Uso:
+        python benchmark.py --vendedores 15 --clientes 3000 --anos 3 --saida resultado.json
+        python benchmark.py --comparar resultado.json --tolerancia 0.25
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Raiz do repositório no sys.path, para o pacote comum/ (módulos compartilhados entre os painéis)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.banco import BackendSQLite, BancoDados
+from cubo import TODOS_OS_VENDEDORES
+from dados import (ESQUEMA_BENEF, ESQUEMA_FRETE, ESQUEMA_VENDAS, GRUPOS_AGREGADOS, consolidar_categorias,
+                   preparar_benef, preparar_frete, preparar_vendas)
+from dados_sinteticos import CONSULTAS_SQLITE, gerar_dados, gravar_sqlite
+from fontes_erp import montar_fontes
+from ingestao import CarregadorParalelo
+from persistencia import VERSAO_ESQUEMA, CacheSnapshotLocal
+from snapshot import montar_snapshot
+from visao import VisaoVendedor
+
+
+def medir(nome, funcao, repeticoes, grupo):
+    """Executa 'funcao' 'repeticoes' vezes e devolve o registro com tempos (s) e pico de memória (bytes)."""
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    # Memória medida em uma execução à parte: o tracemalloc deixa o código mais lento
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'grupo': grupo,
+        'etapa': nome,
+        'repeticoes': repeticoes,
+        'tempo_min': min(tempos),
+        'tempo_mediana': statistics.median(tempos),
+        'pico_memoria': pico,
+    }
+
+
+def preparar_fontes(brutos):
+    # As cópias evitam que a preparação (que altera o DataFrame recebido) mexa nos dados brutos
+    return {
+        'vendas': consolidar_categorias(preparar_vendas(brutos['vendas'].copy()), ESQUEMA_VENDAS),
+        'frete': consolidar_categorias(preparar_frete(brutos['frete'].copy()), ESQUEMA_FRETE),
+        'benef': consolidar_categorias(preparar_benef(brutos['benef'].copy()), ESQUEMA_BENEF),
+    }
+
+
+def casos_dados(brutos, fontes, snap, vendedor, hoje):
+    def visao():
+        # Instância nova a cada execução, para medir o cálculo e não o cache
+        v = VisaoVendedor(snap, vendedor, hoje, 1.5)
+        return (v.realizado, v.projecao, v.projecao_vidro, v.projecao_agregados,
+                v.diario, v.localidade, v.clientes_por_grupo)
+
+    return [
+        ('preparar_vendas', lambda: preparar_vendas(brutos['vendas'].copy())),
+        ('preparar_frete', lambda: preparar_frete(brutos['frete'].copy())),
+        ('preparar_benef', lambda: preparar_benef(brutos['benef'].copy())),
+        ('montar_snapshot', lambda: montar_snapshot(fontes, 1)),
+        ('visao_vendedor', visao),
+        ('visao_todos', lambda: VisaoVendedor(snap, TODOS_OS_VENDEDORES, hoje, 1.5).realizado),
+        ('cubo_soma_ano', lambda: snap.cubo.soma(vendedor, pd.date_range(end=hoje, periods=12, freq='MS'),
+                                                 grupos=['VIDRO'] + GRUPOS_AGREGADOS)),
+        ('coorte_resumo', lambda: snap.coorte.resumo(vendedor, hoje, quantidade=6)),
+        ('intervalo_ano', lambda: snap.intervalo('pedidos', f'{hoje.year}-01-01', f'{hoje.year}-12-31')),
+    ]
+
+
+def _separar_ultimo_dia(brutos, hoje):
+    """Divide os dados brutos em histórico e pedidos do dia 'hoje' (os novos da atualização incremental)."""
+    do_dia = brutos['vendas']['Data_Pedido'] == hoje.strftime('%d/%m/%Y')
+    historico = dict(brutos, vendas=brutos['vendas'][~do_dia])
+    novos = {'vendas': brutos['vendas'][do_dia], 'frete': brutos['frete'].iloc[:0], 'benef': brutos['benef'].iloc[:0]}
+    return historico, novos
+
+
+def _ordenar_vendas(df):
+    return df.sort_values('Id_Pedido', kind='mergesort', ignore_index=True)
+
+
+def casos_ingestao(pasta, brutos, hoje):
+    """Grava o SQLite sintético, faz a primeira carga e acrescenta os pedidos do dia.
+
+    Devolve os casos medidos e a conferência da atualização incremental com a carga completa.
+    """
+    caminho = os.path.join(pasta, 'erp.sqlite')
+    historico, novos = _separar_ultimo_dia(brutos, hoje)
+    gravar_sqlite(caminho, historico)
+    banco = BancoDados(BackendSQLite(caminho), 'sintetico')
+    bancos = {'vendas': banco, 'frete': banco, 'benef': banco}
+
+    def carga_completa():
+        return CarregadorParalelo(montar_fontes(bancos, CONSULTAS_SQLITE, incremental=False, agregacao_sql=False))()
+
+    atualizar = CarregadorParalelo(montar_fontes(bancos, CONSULTAS_SQLITE, incremental=True, agregacao_sql=False))
+    atualizar()
+    gravar_sqlite(caminho, novos, substituir=False)
+
+    incremental, completa = atualizar()['vendas'], carga_completa()['vendas']
+    try:
+        pd.testing.assert_frame_equal(_ordenar_vendas(incremental), _ordenar_vendas(completa),
+                                      check_dtype=False, check_categorical=False)
+        confere = True
+    except AssertionError:
+        traceback.print_exc(file=sys.stderr)
+        confere = False
+
+    casos = [
+        ('carga_completa', carga_completa),
+        ('atualizacao_incremental', atualizar),
+    ]
+    return casos, {'incremental_igual_completa': confere, 'linhas_novas': len(novos['vendas'])}
+
+
+def importar_main(pasta, fontes, metas):
+    """Importa o main.py servindo os dados sintéticos da cópia local, sem atualização pelo banco."""
+    CacheSnapshotLocal(os.path.join(pasta, 'cache_snapshot'), versao_esquema=f'{VERSAO_ESQUEMA}').salvar(fontes)
+    metas.to_excel(os.path.join(pasta, 'META_VENDEDORES.xlsx'), index=False)
+    os.environ['FAROL_CACHE_SNAPSHOT'] = os.path.join(pasta, 'cache_snapshot')
+    os.environ['FAROL_INTERVALO_ATUALIZACAO'] = '0'
+    os.environ['FAROL_AGREGACAO_SQL'] = '0'
+    diretorio = os.getcwd()
+    os.chdir(pasta)
+    try:
+        import main
+    finally:
+        os.chdir(diretorio)
+    return main
+
+
+def casos_main(main, vendedor, hoje):
+    snap = main.atualizador.atual()
+    inicio_mes = hoje.replace(day=1)
+    return [
+        ('calcular_somas', lambda: main.calcular_somas(snap.cubo, main.categorias_agregadas, inicio_mes, vendedor)),
+        ('criar_grafico_pilha', lambda: main.criar_grafico_pilha(snap.cubo, vendedor)),
+        ('create_faturamento_vidro_table', lambda: main.create_faturamento_vidro_table(snap.cubo, vendedor)),
+        ('create_categoria_vidro_table', lambda: main.create_categoria_vidro_table(snap.cubo, vendedor)),
+        ('create_faturamento_agregados_table', lambda: main.create_faturamento_agregados_table(snap, vendedor)),
+        ('create_categoria_agregadas_table', lambda: main.create_categoria_agregadas_table(snap, vendedor)),
+        ('preparar_dados_cliente_sintetico', lambda: main.preparar_dados_cliente_sintetico(
+            vendedor, snap.intervalo('pedidos', f'{hoje.year}-01-01', f'{hoje.year}-12-31'), hoje.year)),
+        # __wrapped__ é o callback sem o cache por versão do snapshot
+        ('update_recompra_ultimos_6_meses', lambda: main.update_recompra_ultimos_6_meses.__wrapped__(vendedor)),
+    ]
+
+
+def comparar(resultados, caminho_base, tolerancia):
+    """Lista as etapas cuja mediana ficou mais de 'tolerancia' (fração) acima da do resultado base."""
+    with open(caminho_base, encoding='utf-8') as arquivo:
+        base = {(r['grupo'], r['etapa']): r for r in json.load(arquivo)['resultados'] if 'tempo_mediana' in r}
+    regressoes = []
+    for resultado in resultados:
+        anterior = base.get((resultado['grupo'], resultado['etapa']))
+        if anterior is None or 'tempo_mediana' not in resultado:
+            continue
+        razao = resultado['tempo_mediana'] / anterior['tempo_mediana'] if anterior['tempo_mediana'] else 1.0
+        if razao > 1 + tolerancia:
+            regressoes.append({'grupo': resultado['grupo'], 'etapa': resultado['etapa'], 'razao': razao})
+    return regressoes
+
+
+def main_benchmark(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark do Farol de Vendas com dados sintéticos.')
+    parser.add_argument('--vendedores', type=int, default=12)
+    parser.add_argument('--clientes', type=int, default=2000)
+    parser.add_argument('--anos', type=int, default=2)
+    parser.add_argument('--pedidos-por-mes', type=int, default=3000)
+    parser.add_argument('--itens-por-pedido', type=int, default=4)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--hoje', help='Data de referência (AAAA-MM-DD); padrão: hoje')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: stdout)')
+    parser.add_argument('--comparar', help='JSON de um resultado anterior para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Aumento máximo aceito da mediana em relação ao --comparar (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    hoje = pd.Timestamp(args.hoje or pd.Timestamp.today()).normalize()
+    parametros = {chave: valor for chave, valor in vars(args).items()
+                  if chave not in ('saida', 'comparar', 'tolerancia')}
+    parametros['hoje'] = hoje.date().isoformat()
+
+    brutos = gerar_dados(args.vendedores, args.clientes, args.anos, args.pedidos_por_mes,
+                         args.itens_por_pedido, args.semente, hoje)
+    fontes = preparar_fontes(brutos)
+    snap = montar_snapshot(fontes, 1)
+    vendedor = snap.pedidos['Vendedor'].value_counts().index[0]
+
+    resultados = [medir(nome, funcao, args.repeticoes, 'dados')
+                  for nome, funcao in casos_dados(brutos, fontes, snap, vendedor, hoje)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        casos, verificacoes = casos_ingestao(pasta, brutos, hoje)
+        resultados += [medir(nome, funcao, args.repeticoes, 'ingestao') for nome, funcao in casos]
+
+        try:
+            main = importar_main(pasta, fontes, brutos['metas'])
+        except Exception as erro:
+            traceback.print_exc(file=sys.stderr)
+            resultados.append({'grupo': 'main', 'etapa': '*', 'pulado': f'{type(erro).__name__}: {erro}'})
+        else:
+            resultados += [medir(nome, funcao, args.repeticoes, 'main')
+                           for nome, funcao in casos_main(main, vendedor, hoje)]
+
+    relatorio = {
+        'parametros': parametros,
+        'volume': {'linhas_vendas': len(snap.vendas), 'pedidos': len(snap.pedidos), 'vendedor_medido': vendedor},
+        'ambiente': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                     'plataforma': platform.platform()},
+        'verificacoes': verificacoes,
+        'resultados': resultados,
+    }
+    if args.comparar:
+        relatorio['regressoes'] = comparar(resultados, args.comparar, args.tolerancia)
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False, default=str)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+    return 1 if relatorio.get('regressoes') or not verificacoes['incremental_igual_completa'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_benchmark())
@@ -0,0 +1,105 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         cache.py
+
+* @brief
+    Cache dos resultados dos callbacks por versão do snapshot.
+
+    A chave de cada entrada é (callback, argumentos, versão do snapshot). Como
+    os dados só mudam quando um novo snapshot é publicado, o mesmo vendedor
+    aberto várias vezes é servido do cache até a próxima atualização. As
+    entradas mais antigas são descartadas (LRU) quando o limite é atingido, e
+    as de versões anteriores saem assim que a versão muda, para não manter
+    snapshots antigos em memória (a VisaoVendedor guarda o snapshot).
+
+    Quando várias requisições pedem a mesma chave ao mesmo tempo, só a
+    primeira calcula; as outras esperam e recebem o mesmo resultado.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+
+class CacheVersionado:
+    def __init__(self, obter_versao, tamanho_maximo=512):
+        self._obter_versao = obter_versao
+        self._tamanho_maximo = tamanho_maximo
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._versao = None
+        self._anterior = None
+        # chave -> Event das chaves sendo calculadas
+        self._calculando = {}
+        self._acertos = {}
+        self._falhas = {}
+
+    def _contar(self, contador, nome):
+        contador[nome] = contador.get(nome, 0) + 1
+
+    def _trocar_versao(self, versao):
+        # Chamado com o lock; entradas de outras versões não serão mais lidas
+        self._anterior, self._versao = self._versao, versao
+        for chave in [chave for chave in self._entradas if chave[2] != versao]:
+            del self._entradas[chave]
+
+    def obter(self, nome, args, calcular):
+        versao = self._obter_versao()
+        chave = (nome, args, versao)
+        while True:
+            with self._lock:
+                # Quem leu a versão logo antes da troca não volta o cache para ela
+                if versao != self._versao and versao != self._anterior:
+                    self._trocar_versao(versao)
+                if chave in self._entradas:
+                    self._entradas.move_to_end(chave)
+                    self._contar(self._acertos, nome)
+                    return self._entradas[chave]
+                calculando = self._calculando.get(chave)
+                if calculando is None:
+                    calculando = self._calculando[chave] = threading.Event()
+                    self._contar(self._falhas, nome)
+                    break
+            # Outra requisição já está calculando a mesma chave; se ela falhar, esta tenta de novo
+            calculando.wait()
+
+        # O cálculo roda fora do lock para não serializar callbacks diferentes
+        try:
+            resultado = calcular()
+            with self._lock:
+                # Resultado de uma versão que já foi trocada não é guardado
+                if versao == self._versao:
+                    self._entradas[chave] = resultado
+                    self._entradas.move_to_end(chave)
+                    while len(self._entradas) > self._tamanho_maximo:
+                        self._entradas.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._calculando[chave]
+            calculando.set()
+        return resultado
+
+    def memoizar(self, funcao):
+        """Decorador para callbacks cujos argumentos são hashable (valores dos Inputs)."""
+        @functools.wraps(funcao)
+        def envolvida(*args):
+            return self.obter(funcao.__name__, args, lambda: funcao(*args))
+        return envolvida
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            nomes = set(self._acertos) | set(self._falhas)
+            return {
+                'entradas': len(self._entradas),
+                'acertos': sum(self._acertos.values()),
+                'falhas': sum(self._falhas.values()),
+                'por_callback': {
+                    nome: {'acertos': self._acertos.get(nome, 0), 'falhas': self._falhas.get(nome, 0)}
+                    for nome in sorted(nomes)
+                },
+            }
@@ -0,0 +1,114 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         calendario.py
+
+* @brief
+    Calendário de dias úteis usado nas projeções do Farol.
+
+    Considera segunda a sexta, descontando os feriados nacionais, o estadual
+    do Amazonas e os municipais de Manaus. Para cada mês é guardada a contagem
+    acumulada de dias úteis (dia 1 até o dia d), calculada na primeira vez em
+    que o mês é pedido; o mês atual e o seguinte são montados já na criação.
+    Todas as funções recebem a data de referência, então a virada do dia e do
+    mês acontece sem reiniciar o dashboard.
+"""
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# (mês, dia)
+FERIADOS_FIXOS = [
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalho
+    (9, 5),    # Elevação do Amazonas à categoria de Província (estadual)
+    (9, 7),    # Independência
+    (10, 12),  # Nossa Senhora Aparecida
+    (10, 24),  # Aniversário de Manaus (municipal)
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (11, 20),  # Dia Nacional de Zumbi e da Consciência Negra
+    (12, 8),   # Nossa Senhora da Conceição, padroeira de Manaus (municipal)
+    (12, 25),  # Natal
+]
+# Carnaval e Corpus Christi são pontos facultativos e contam como dias úteis
+
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados(ano):
+    datas = [date(ano, mes, dia) for mes, dia in FERIADOS_FIXOS]
+    datas.append(pascoa(ano) - timedelta(days=2))  # Sexta-feira Santa
+    return sorted(datas)
+
+
+class CalendarioUteis:
+    def __init__(self, hoje=None):
+        self._lock = threading.Lock()
+        self._anos = set()
+        self._feriados = []
+        self._calendario = None
+        self._acumulado = {}
+        # Mês atual e o seguinte já ficam prontos
+        hoje = pd.Timestamp(hoje or date.today())
+        self._mes(hoje)
+        self._mes(hoje + pd.offsets.MonthBegin(1))
+
+    def _mes(self, data):
+        """Dias úteis acumulados do mês de 'data': posição d-1 = dias úteis do dia 1 ao dia d."""
+        chave = (data.year, data.month)
+        acumulado = self._acumulado.get(chave)
+        if acumulado is not None:
+            return acumulado
+        with self._lock:
+            if data.year not in self._anos:
+                self._anos.add(data.year)
+                self._feriados = sorted(set(self._feriados) | set(feriados(data.year)))
+                self._calendario = np.busdaycalendar(holidays=self._feriados)
+            inicio = np.datetime64(date(data.year, data.month, 1), 'D')
+            dias = np.arange(inicio, inicio + np.timedelta64(data.days_in_month, 'D'))
+            acumulado = np.cumsum(np.is_busday(dias, busdaycal=self._calendario))
+            self._acumulado[chave] = acumulado
+            return acumulado
+
+    def dias_uteis_mes(self, data):
+        return int(self._mes(pd.Timestamp(data))[-1])
+
+    def dias_uteis_ate(self, data):
+        """Dias úteis do dia 1 do mês até 'data', inclusive."""
+        data = pd.Timestamp(data)
+        return int(self._mes(data)[data.day - 1])
+
+    def dias_uteis_ate_ontem(self, hoje):
+        hoje = pd.Timestamp(hoje)
+        return int(self._mes(hoje)[hoje.day - 2]) if hoje.day > 1 else 0
+
+    def dias_uteis_restantes(self, hoje):
+        """Dias úteis de hoje (inclusive) até o fim do mês."""
+        return self.dias_uteis_mes(hoje) - self.dias_uteis_ate_ontem(hoje)
+
+    def fator_projecao(self, hoje):
+        """Dias úteis do mês / dias úteis até ontem (0 enquanto nenhum dia útil passou)."""
+        ate_ontem = self.dias_uteis_ate_ontem(hoje)
+        return self.dias_uteis_mes(hoje) / ate_ontem if ate_ontem > 0 else 0.0
+
+    def projetar(self, realizado, hoje):
+        """Projeção do mês para um valor ou um vetor (array/Series) de valores realizados até ontem."""
+        return realizado * self.fator_projecao(hoje)
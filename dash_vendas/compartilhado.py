@@ -0,0 +1,223 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         compartilhado.py
+
+* @brief
+    Snapshot compartilhado entre processos, para servir o dashboard com vários
+    workers (ver gunicorn.conf.py).
+
+    Um único processo atualizador (atualizador.py) consulta o ERP e grava as
+    tabelas preparadas, já ordenadas pela data e com a tabela de pedidos, em
+    arquivos Arrow IPC de uma mesma geração. Por último grava o
+    manifesto.json, trocado com os.replace, então quem lê sempre vê uma
+    geração completa.
+
+    Os workers não consultam o banco. O LeitorSnapshot confere o manifesto a
+    cada poucos segundos e, quando a geração muda, abre os arquivos com
+    memory-map somente leitura e monta o snapshot sobre eles. As colunas
+    numéricas, de data e de texto apontam para as páginas do arquivo, que o
+    sistema operacional compartilha entre os workers; para isso, NaN e NaT
+    são gravados como valores comuns, sem máscara de nulos do Arrow (que
+    obrigaria o pandas a copiar a coluna).
+
+    Nem tudo fica compartilhado: os códigos das colunas categóricas (Vendedor,
+    Grupo, Subgrupo, Tipo_Produto, Cidade, Loja) são copiados por cada worker
+    ao ler o arquivo, e cada worker monta de novo as estruturas derivadas
+    (cubo, coorte, índices mensais) a cada geração.
+
+    A versão do snapshot vem do manifesto, igual em todos os workers. A
+    geração anterior é apagada só na gravação seguinte, para que um worker que
+    acabou de ler o manifesto ainda consiga abrir os arquivos.
+"""
+import glob
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+from dados import montar_pedidos
+from periodos import ordenar_por_data
+from persistencia import MANIFESTO, VERSAO_ESQUEMA
+from snapshot import COLUNAS_DATA, montar_snapshot
+
+# Textos ficam no formato do Arrow (sem um objeto Python por valor), lidos direto do arquivo
+_TIPOS_PANDAS = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+
+
+def _sem_nulos(df, tabela):
+    """Regrava colunas float e de data com nulos usando NaN/NaT como valor, para serem lidas sem cópia."""
+    for posicao, campo in enumerate(tabela.schema):
+        if tabela.column(posicao).null_count == 0:
+            continue
+        if pa.types.is_floating(campo.type):
+            coluna = pa.array(df[campo.name].to_numpy(dtype=campo.type.to_pandas_dtype()), from_pandas=False)
+        elif pa.types.is_timestamp(campo.type) and campo.type.tz is None:
+            # NaT é o menor int64: sem bitmap de validade o pandas o lê de volta como NaT
+            valores = df[campo.name].to_numpy(dtype=f'datetime64[{campo.type.unit}]').view('i8')
+            coluna = pa.Array.from_buffers(campo.type, len(valores), [None, pa.py_buffer(valores)])
+        else:
+            continue
+        tabela = tabela.set_column(posicao, campo, coluna)
+    return tabela
+
+
+def _gravar_arrow(df, caminho):
+    # Sem compressão: os buffers no arquivo são os próprios buffers das colunas
+    tabela = _sem_nulos(df, pa.Table.from_pandas(df, preserve_index=False))
+    with pa.OSFile(caminho, 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+
+def _ler_arrow(caminho):
+    # O mapa continua aberto enquanto houver colunas apontando para ele. Números, datas e textos
+    # ficam no mapa; as categorias são decodificadas em memória própria do worker
+    tabela = pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+    return tabela.to_pandas(split_blocks=True, types_mapper=_TIPOS_PANDAS.get)
+
+
+class SnapshotCompartilhado:
+    def __init__(self, pasta, versao_esquema=VERSAO_ESQUEMA):
+        self.pasta = pasta
+        self._versao_esquema = versao_esquema
+
+    @property
+    def caminho_manifesto(self):
+        return os.path.join(self.pasta, MANIFESTO)
+
+    def manifesto(self):
+        """Manifesto da geração publicada, ou None se não houver (ou for de outra versão do esquema)."""
+        try:
+            with open(self.caminho_manifesto, encoding='utf-8') as arquivo:
+                manifesto = json.load(arquivo)
+        except FileNotFoundError:
+            return None
+        return manifesto if manifesto.get('versao_esquema') == self._versao_esquema else None
+
+    def publicar(self, fontes, criado_em=None):
+        """Grava as fontes preparadas como uma nova geração e devolve a versão publicada."""
+        os.makedirs(self.pasta, exist_ok=True)
+        anterior = self.manifesto()
+        versao = (anterior['versao'] if anterior else 0) + 1
+        geracao = uuid.uuid4().hex[:12]
+
+        # Ordenadas aqui, uma vez, para que os workers montem o snapshot sem copiar as tabelas
+        tabelas = dict(fontes)
+        tabelas['vendas'] = ordenar_por_data(tabelas['vendas'], 'Data_Pedido')
+        if 'pedidos' not in tabelas:
+            tabelas['pedidos'] = montar_pedidos(tabelas['vendas'])
+        for nome, coluna in COLUNAS_DATA.items():
+            if nome in tabelas:
+                tabelas[nome] = ordenar_por_data(tabelas[nome], coluna)
+
+        arquivos = {}
+        for nome, df in tabelas.items():
+            arquivo = f'{nome}-{geracao}.arrow'
+            _gravar_arrow(df, os.path.join(self.pasta, arquivo))
+            arquivos[nome] = arquivo
+
+        manifesto = {
+            'versao_esquema': self._versao_esquema,
+            'versao': versao,
+            'criado_em': (criado_em or datetime.now()).isoformat(),
+            'geracao': geracao,
+            'arquivos': arquivos,
+        }
+        temporario = os.path.join(self.pasta, f'{MANIFESTO}.{geracao}')
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(manifesto, arquivo)
+        os.replace(temporario, self.caminho_manifesto)
+
+        # Mantém a geração atual e a anterior; as mais antigas não são mais lidas
+        manter = {geracao, anterior['geracao'] if anterior else None}
+        for caminho in glob.glob(os.path.join(self.pasta, '*.arrow')):
+            if os.path.basename(caminho).rsplit('-', 1)[-1][:-len('.arrow')] not in manter:
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    # No Windows um arquivo mapeado não pode ser apagado; fica para a próxima gravação
+                    pass
+        return versao
+
+    def abrir(self, manifesto):
+        """Fontes da geração do manifesto, mapeadas em memória (somente leitura)."""
+        return {nome: _ler_arrow(os.path.join(self.pasta, arquivo)) for nome, arquivo in manifesto['arquivos'].items()}
+
+
+class LeitorSnapshot:
+    """Lado dos workers: mesma interface do AtualizadorSnapshot (atual, versao, iniciar, parar),
+    mas os snapshots vêm do SnapshotCompartilhado gravado pelo atualizador.py."""
+
+    def __init__(self, compartilhado, intervalo=5):
+        self._compartilhado = compartilhado
+        self._intervalo = intervalo
+        self._atual = None
+        self._geracao = None
+        self._assinatura = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def atual(self):
+        return self._atual
+
+    @property
+    def versao(self):
+        return self._atual.versao if self._atual is not None else 0
+
+    def verificar(self):
+        """Publica a geração nova, se o manifesto mudou. Devolve True se um snapshot novo foi publicado."""
+        try:
+            estado = os.stat(self._compartilhado.caminho_manifesto)
+        except FileNotFoundError:
+            return False
+        # os.replace troca o arquivo: muda o inode e o mtime
+        assinatura = (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+        if assinatura == self._assinatura:
+            return False
+        with self._lock:
+            manifesto = self._compartilhado.manifesto()
+            if manifesto is not None and manifesto['geracao'] != self._geracao:
+                fontes = self._compartilhado.abrir(manifesto)
+                self._atual = montar_snapshot(fontes, manifesto['versao'], datetime.fromisoformat(manifesto['criado_em']))
+                self._geracao = manifesto['geracao']
+                publicado = True
+            else:
+                publicado = False
+            self._assinatura = assinatura
+        return publicado
+
+    def aguardar(self):
+        """Bloqueia até o primeiro snapshot publicado pelo atualizador."""
+        while self._atual is None:
+            try:
+                if self.verificar():
+                    break
+            except Exception:
+                # Geração apagada entre a leitura do manifesto e a abertura: tenta de novo
+                traceback.print_exc()
+            time.sleep(1)
+
+    def _executar(self):
+        while not self._parar.wait(self._intervalo):
+            try:
+                self.verificar()
+            except Exception:
+                # Mantém o snapshot atual; a próxima verificação tenta de novo
+                traceback.print_exc()
+
+    def iniciar(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name='leitor-snapshot', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
@@ -0,0 +1,79 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         coorte.py
+
+* @brief
+    Coorte de clientes por mês para os cards de recompra e positivação.
+
+    Os pedidos são distribuídos em meses uma única vez a cada carga. Para cada
+    vendedor (e para o consolidado "TODOS OS VENDEDORES") é guardada uma matriz
+    cliente x mês indicando se o cliente comprou no mês. Clientes ativos,
+    recompra e positivação de qualquer janela saem de somas sobre colunas dessa
+    matriz, sem filtrar o DataFrame mês a mês.
+"""
+import numpy as np
+import pandas as pd
+
+from cubo import TODOS_OS_VENDEDORES
+
+
+def _numero_mes(datas):
+    return datas.dt.year.to_numpy() * 12 + datas.dt.month.to_numpy() - 1
+
+
+def _matriz(clientes, meses, total_meses):
+    """Matriz booleana (cliente x mês) a partir dos pares (cliente, mês) dos pedidos."""
+    codigos, unicos = pd.factorize(clientes)
+    matriz = np.zeros((len(unicos), total_meses), dtype=bool)
+    matriz[codigos, meses] = True
+    return matriz
+
+
+class CoorteClientes:
+    def __init__(self, pedidos):
+        # pedidos: tabela de cabeçalho (uma linha por Id_Pedido)
+        validos = pedidos.dropna(subset=['Data_Pedido', 'Matriz_Cliente'])
+        numero_mes = _numero_mes(validos['Data_Pedido'])
+        self._primeiro_mes = int(numero_mes.min()) if len(numero_mes) else 0
+        total_meses = int(numero_mes.max()) - self._primeiro_mes + 1 if len(numero_mes) else 0
+        meses = numero_mes - self._primeiro_mes
+        clientes = validos['Matriz_Cliente'].to_numpy()
+
+        self._matrizes = {TODOS_OS_VENDEDORES: _matriz(clientes, meses, total_meses)}
+        vendedores = validos['Vendedor'].to_numpy()
+        for vendedor in validos['Vendedor'].dropna().unique():
+            linhas = vendedores == vendedor
+            self._matrizes[vendedor] = _matriz(clientes[linhas], meses[linhas], total_meses)
+
+    def resumo(self, vendedor, ultimo_mes, quantidade=6):
+        """Clientes ativos, recompra e positivação dos 'quantidade' meses terminados em 'ultimo_mes'.
+
+        Devolve um DataFrame indexado pelo mês (Period), do mais antigo para o
+        mais recente. 'positivacao' compara a quantidade de clientes com a do
+        mês anterior; 'recompra' é o percentual dos clientes do mês anterior que
+        voltaram a comprar no mês.
+        """
+        matriz = self._matrizes.get(vendedor or TODOS_OS_VENDEDORES)
+        if matriz is None:
+            matriz = np.zeros((0, 0), dtype=bool)
+
+        ultimo = pd.Period(ultimo_mes, 'M')
+        # Um mês extra no início serve de base para o primeiro mês da janela
+        colunas = (ultimo.year * 12 + ultimo.month - 1 - self._primeiro_mes) + np.arange(-quantidade, 1)
+        dentro = (colunas >= 0) & (colunas < matriz.shape[1])
+        janela = np.zeros((matriz.shape[0], len(colunas)), dtype=bool)
+        janela[:, dentro] = matriz[:, colunas[dentro]]
+
+        ativos = janela.sum(axis=0)
+        retornaram = (janela[:, 1:] & janela[:, :-1]).sum(axis=0)
+        anteriores = ativos[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            positivacao = np.where(anteriores > 0, ativos[1:] / anteriores * 100, 0.0)
+            recompra = np.where(anteriores > 0, retornaram / anteriores * 100, 0.0)
+
+        return pd.DataFrame(
+            {'clientes': ativos[1:], 'recompra': recompra, 'positivacao': positivacao},
+            index=pd.period_range(end=ultimo, periods=quantidade, freq='M'),
+        )
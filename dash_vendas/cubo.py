@@ -0,0 +1,122 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         cubo.py
+
+* @brief
+    Cubo mensal de vendas no grão (Vendedor, Grupo, Tipo_Produto, mês).
+
+    O cubo é montado uma única vez a cada carga dos dados e guarda, para cada
+    célula, o faturamento com desconto, a metragem (m2) e a quantidade de
+    pedidos. O consolidado "TODOS OS VENDEDORES" é pré-calculado, de forma que
+    as tabelas e gráficos do Farol apenas consultam dicionários.
+
+    O cubo pode vir das linhas de vendas (CuboVendas(df)) ou das somas já
+    agrupadas pelo banco (CuboVendas.de_agregados, ver agregacao_sql.py).
+"""
+import pandas as pd
+
+TODOS_OS_VENDEDORES = 'TODOS OS VENDEDORES'
+MEDIDAS = ('receita', 'm2', 'pedidos')
+_VAZIO = (0.0, 0.0, 0)
+
+
+# Chaves de cada nível do cubo
+NIVEIS = {
+    'tipo': ['Tipo_Produto'],
+    'grupo': ['Grupo'],
+    'grupo_tipo': ['Grupo', 'Tipo_Produto'],
+}
+
+
+def _para_indice(agrupado):
+    """{mes: {chave: (receita, m2, pedidos)}} a partir de um agrupamento indexado por (mes, *chaves)."""
+    indice = {}
+    for chave, receita, m2, pedidos in zip(agrupado.index, agrupado['receita'], agrupado['m2'], agrupado['pedidos']):
+        periodo, resto = chave[0], chave[1:]
+        indice.setdefault(periodo, {})[resto if len(resto) > 1 else resto[0]] = (float(receita), float(m2), int(pedidos))
+    return indice
+
+
+def _indexar(df, chaves, mes):
+    """Agrupa por mês + chaves e devolve {mes: {chave: (receita, m2, pedidos)}}."""
+    agrupado = df.groupby([mes] + chaves, observed=True, sort=False).agg(
+        receita=('total_produto_com_desconto', 'sum'),
+        m2=('m2', 'sum'),
+        pedidos=('Id_Pedido', 'nunique'),
+    )
+    return _para_indice(agrupado)
+
+
+def _indexar_agregado(df, chaves):
+    """Mesmo índice de _indexar, a partir de linhas já somadas (Mes, *chaves, receita, m2, pedidos)."""
+    mes = pd.PeriodIndex(pd.to_datetime(df['Mes']), freq='M').rename('Mes')
+    agrupado = df.set_index([mes] + [df[chave] for chave in chaves])[list(MEDIDAS)]
+    return _para_indice(agrupado.fillna(0))
+
+
+class CuboVendas:
+    def __init__(self, df=None):
+        self._por_tipo = {}
+        self._por_grupo = {}
+        self._por_grupo_tipo = {}
+        if df is None:
+            return
+        mes = df['Data_Pedido'].dt.to_period('M').rename('Mes')
+
+        # Consolidado de todos os vendedores
+        self._por_tipo[TODOS_OS_VENDEDORES] = _indexar(df, ['Tipo_Produto'], mes)
+        self._por_grupo[TODOS_OS_VENDEDORES] = _indexar(df, ['Grupo'], mes)
+        self._por_grupo_tipo[TODOS_OS_VENDEDORES] = _indexar(df, ['Grupo', 'Tipo_Produto'], mes)
+
+        # Um bloco por vendedor
+        for vendedor, df_vendedor in df.groupby('Vendedor', observed=True, sort=False):
+            mes_vendedor = mes.loc[df_vendedor.index]
+            self._por_tipo[vendedor] = _indexar(df_vendedor, ['Tipo_Produto'], mes_vendedor)
+            self._por_grupo[vendedor] = _indexar(df_vendedor, ['Grupo'], mes_vendedor)
+            self._por_grupo_tipo[vendedor] = _indexar(df_vendedor, ['Grupo', 'Tipo_Produto'], mes_vendedor)
+
+    @classmethod
+    def de_agregados(cls, df):
+        """Monta o cubo a partir das somas feitas no banco.
+
+        df tem as colunas Nivel (chave de NIVEIS), Vendedor (TODOS_OS_VENDEDORES
+        no consolidado), Mes, as chaves do nível, receita, m2 e pedidos.
+        """
+        cubo = cls()
+        for (nivel, vendedor), df_celulas in df.groupby(['Nivel', 'Vendedor'], sort=False):
+            getattr(cubo, f'_por_{nivel}')[vendedor] = _indexar_agregado(df_celulas, NIVEIS[nivel])
+        return cubo
+
+    @staticmethod
+    def _celula(indice, vendedor, mes, chave):
+        return indice.get(vendedor or TODOS_OS_VENDEDORES, {}).get(pd.Period(mes, 'M'), {}).get(chave, _VAZIO)
+
+    def valor(self, vendedor, mes, tipo=None, grupo=None, medida='receita'):
+        """Valor de uma célula do cubo. Sem tipo/grupo, soma o mês inteiro."""
+        posicao = MEDIDAS.index(medida)
+        if tipo is not None and grupo is not None:
+            return self._celula(self._por_grupo_tipo, vendedor, mes, (grupo, tipo))[posicao]
+        if tipo is not None:
+            return self._celula(self._por_tipo, vendedor, mes, tipo)[posicao]
+        if grupo is not None:
+            return self._celula(self._por_grupo, vendedor, mes, grupo)[posicao]
+        celulas = self._por_grupo.get(vendedor or TODOS_OS_VENDEDORES, {}).get(pd.Period(mes, 'M'), {})
+        return sum(valores[posicao] for valores in celulas.values())
+
+    def soma(self, vendedor, meses, tipos=(), grupos=(), medida='receita'):
+        """Soma a medida para os meses e tipos (ou grupos) informados."""
+        total = 0
+        for mes in meses:
+            total += sum(self.valor(vendedor, mes, tipo=tipo, medida=medida) for tipo in tipos)
+            total += sum(self.valor(vendedor, mes, grupo=grupo, medida=medida) for grupo in grupos)
+        return total
+
+    def soma_outros(self, vendedor, meses, grupo, tipos_excluidos, medida='receita'):
+        """Soma do grupo nos meses informados, desconsiderando os tipos já listados."""
+        total = 0
+        for mes in meses:
+            total += self.valor(vendedor, mes, grupo=grupo, medida=medida)
+            total -= sum(self.valor(vendedor, mes, tipo=tipo, grupo=grupo, medida=medida) for tipo in tipos_excluidos)
+        return total
@@ -0,0 +1,189 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         dados.py
+
+* @brief
+    Preparação dos dados de vendas feita uma única vez no carregamento.
+
+    As colunas derivadas (descontos aplicados, etc.) são calculadas de forma
+    colunar sobre o DataFrame inteiro, para que os callbacks do dashboard
+    apenas filtrem e somem.
+"""
+import numpy as np
+import pandas as pd
+
+# Esquemas de ingestão: colunas mantidas depois da preparação e o tipo de cada uma.
+#   'categoria' -> textos de baixa cardinalidade (category)
+#   'data'      -> datetime64, convertida uma única vez na preparação
+#   'inteiro'   -> reduzido ao menor inteiro que comporta os valores
+#   'decimal'   -> float32 (metragem)
+#   'moeda'     -> float64, para não perder centavos nas somas
+#   'original'  -> mantida como veio do banco
+# Colunas fora do esquema (inclusive as entradas do cálculo de desconto) são descartadas.
+ESQUEMA_VENDAS = {
+    'Id_Pedido': 'inteiro',
+    'Data_Pedido': 'data',
+    'Vendedor': 'categoria',
+    'Grupo': 'categoria',
+    'Subgrupo': 'categoria',
+    'Tipo_Produto': 'categoria',
+    'Cidade': 'categoria',
+    'Loja': 'categoria',
+    'Matriz_Cliente': 'original',
+    'Cliente': 'original',
+    'TOTAL': 'moeda',
+    'total_produto_com_desconto': 'moeda',
+    'valor_beneficiamento_com_desconto': 'moeda',
+    'm2': 'decimal',
+    'm2_pedido': 'decimal',
+}
+
+ESQUEMA_FRETE = {
+    'Vendedor': 'categoria',
+    'PERIODO': 'data',
+    'Frete': 'moeda',
+}
+
+ESQUEMA_BENEF = {
+    'Vendedor': 'categoria',
+    'PERIODO': 'data',
+    'NOME_BENEF': 'categoria',
+    'FATURAMENTO': 'moeda',
+}
+
+
+def aplicar_esquema(df, esquema):
+    """Mantém apenas as colunas do esquema, já com os tipos declarados."""
+    df = df[[coluna for coluna in esquema if coluna in df.columns]].copy()
+    for coluna in df.columns:
+        tipo = esquema[coluna]
+        if tipo == 'categoria':
+            df[coluna] = df[coluna].astype('category')
+        elif tipo == 'data' and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+        elif tipo == 'inteiro':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce', downcast='integer')
+        elif tipo == 'decimal':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float32')
+        elif tipo == 'moeda':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float64')
+    return df
+
+
+# Colunas do cabeçalho do pedido (iguais em todas as linhas do mesmo Id_Pedido)
+COLUNAS_PEDIDO = ['Id_Pedido', 'Data_Pedido', 'Vendedor', 'Matriz_Cliente', 'Cliente', 'Cidade', 'Loja', 'TOTAL', 'm2_pedido']
+GRUPOS_AGREGADOS = ['ACESSÓRIOS', 'ALUMÍNIO', 'FERRAGEM', 'KIT PARA BOX PADRÃO', 'SILICONE']
+
+
+def consolidar_categorias(df, esquema):
+    """Refaz as categorias depois de concatenar lotes com categorias diferentes."""
+    for coluna, tipo in esquema.items():
+        if tipo == 'categoria' and coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def calcular_desconto_vetorizado(df, coluna_valor):
+    """Aplica as regras de desconto ('Porcentagem' e 'Reais') sobre a coluna informada."""
+    valor = pd.to_numeric(df[coluna_valor], errors='coerce').to_numpy(dtype='float64')
+    desconto = pd.to_numeric(df['Desconto'], errors='coerce').to_numpy(dtype='float64')
+    total = pd.to_numeric(df['TOTAL'], errors='coerce').to_numpy(dtype='float64')
+
+    # Pedidos sem frete (coluna ausente ou vazia) são tratados como frete zero
+    if 'Valor_Frete' in df.columns:
+        frete = pd.to_numeric(df['Valor_Frete'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+    else:
+        frete = np.zeros(len(df))
+
+    tipo_desconto = df['Tipo_Desconto'].to_numpy(dtype=object)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # fmax ignora NaN, assim como o max() usado na versão linha a linha
+        com_porcentagem = np.fmax(0, valor - (valor * desconto / 100))
+        # Desconto em reais é rateado proporcionalmente ao valor do item no pedido
+        com_reais = valor - (valor * desconto) / ((total - frete) + desconto)
+
+    return np.select(
+        [tipo_desconto == 'Porcentagem', tipo_desconto == 'Reais'],
+        [com_porcentagem, com_reais],
+        default=valor,
+    )
+
+
+def aplicar_descontos(df):
+    """Adiciona ao DataFrame de vendas as colunas com os descontos já aplicados."""
+    df['total_produto_com_desconto'] = calcular_desconto_vetorizado(df, 'total_produto')
+    if 'valor_beneficiamento' in df.columns:
+        df['valor_beneficiamento_com_desconto'] = calcular_desconto_vetorizado(df, 'valor_beneficiamento')
+    return df
+
+
+def primeiro_nome(serie):
+    return serie.str.split().str.get(0)
+
+
+def preparar_vendas(df):
+    """Prepara o DataFrame de vendas: primeiro nome do vendedor, datas, descontos e tipos."""
+    df['Vendedor'] = primeiro_nome(df['Vendedor'])
+    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
+    df = aplicar_descontos(df)
+    return aplicar_esquema(df, ESQUEMA_VENDAS)
+
+
+def preparar_frete(df_frete):
+    df_frete['Vendedor'] = primeiro_nome(df_frete['Vendedor'])
+    df_frete['PERIODO'] = pd.to_datetime(df_frete['PERIODO'])
+    return aplicar_esquema(df_frete, ESQUEMA_FRETE)
+
+
+def separar_caixa_madeira(df_benef):
+    """Separa o beneficiamento 'Caixa de Madeira', exibido em linha própria nas tabelas."""
+    madeira = df_benef['NOME_BENEF'] == 'Caixa de Madeira'
+    return df_benef[~madeira].reset_index(drop=True), df_benef[madeira].reset_index(drop=True)
+
+
+def preparar_benef(df_benef):
+    df_benef['Vendedor'] = primeiro_nome(df_benef['Vendedor'])
+    df_benef['PERIODO'] = pd.to_datetime(df_benef['PERIODO'])
+    return aplicar_esquema(df_benef, ESQUEMA_BENEF)
+
+
+def montar_pedidos(vendas):
+    """Tabela de cabeçalho: uma linha por Id_Pedido, ligada às linhas de vendas pelo Id_Pedido.
+
+    TOTAL e m2_pedido já são do pedido e vêm repetidos em cada item, então
+    vale a primeira linha de cada Id_Pedido (nada é somado). Assim as
+    consultas não precisam remover duplicados da tabela de itens.
+    """
+    primeira_linha = ~vendas['Id_Pedido'].duplicated()
+    colunas = [coluna for coluna in COLUNAS_PEDIDO if coluna in vendas.columns]
+    pedidos = vendas.loc[primeira_linha, colunas].reset_index(drop=True)
+
+    pedidos['Cliente_ID_Nome'] = pedidos['Matriz_Cliente'].astype(str) + ' - ' + pedidos['Cliente']
+
+    # Indica se o pedido tem ao menos um item de vidro / de agregados
+    por_pedido = vendas['Id_Pedido']
+    tem_vidro = (vendas['Grupo'] == 'VIDRO').groupby(por_pedido, sort=False).any()
+    tem_agregados = vendas['Grupo'].isin(GRUPOS_AGREGADOS).groupby(por_pedido, sort=False).any()
+    pedidos['tem_vidro'] = pedidos['Id_Pedido'].map(tem_vidro).fillna(False).astype(bool)
+    pedidos['tem_agregados'] = pedidos['Id_Pedido'].map(tem_agregados).fillna(False).astype(bool)
+    return pedidos
+
+
+def preparar_cubo(df):
+    """Prepara as somas mensais do cubo que vêm do banco (ver agregacao_sql.buscar_cubo)."""
+    df['Mes'] = pd.to_datetime(df['Mes'], errors='coerce')
+    return df.reset_index(drop=True)
+
+
+def preparar_pedidos(df):
+    """Prepara a tabela de pedidos que já vem agrupada do banco (ver agregacao_sql.consulta_pedidos)."""
+    df['Vendedor'] = primeiro_nome(df['Vendedor'])
+    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    pedidos = aplicar_esquema(df, {coluna: ESQUEMA_VENDAS[coluna] for coluna in COLUNAS_PEDIDO})
+    pedidos['Cliente_ID_Nome'] = pedidos['Matriz_Cliente'].astype(str) + ' - ' + pedidos['Cliente']
+    pedidos['tem_vidro'] = pd.to_numeric(df['tem_vidro'], errors='coerce').fillna(0).astype(bool)
+    pedidos['tem_agregados'] = pd.to_numeric(df['tem_agregados'], errors='coerce').fillna(0).astype(bool)
+    return pedidos.reset_index(drop=True)
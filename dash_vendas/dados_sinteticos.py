@@ -0,0 +1,170 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         dados_sinteticos.py
+
+* @brief
+    Gerador de dados sintéticos no formato das consultas do ERP, para
+    benchmarks e testes locais sem acesso ao banco.
+
+    Gera vendas (uma linha por item, com as colunas brutas que
+    dados.preparar_vendas espera), frete e beneficiamento mensais por vendedor
+    e a planilha de metas. O tamanho é configurável (vendedores, clientes,
+    anos de histórico, pedidos por mês e itens por pedido) e, com a mesma
+    semente, os dados gerados são sempre os mesmos.
+
+    gravar_sqlite() grava as tabelas brutas em um arquivo SQLite, para uso
+    com PORTAL_BANCO_SQLITE (ver comum/banco.py); CONSULTAS_SQLITE são as
+    consultas equivalentes às do ERP sobre essas tabelas, no formato de
+    fontes_erp.montar_fontes.
+"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Tipos de produto de cada grupo, com os nomes usados nas tabelas do Farol
+TIPOS_POR_GRUPO = {
+    'VIDRO': ['ENGENHARIA TEMPERADO', 'BOX ENGENHARIA', 'BOX PADRÃO', 'JANELA PADRÃO', 'PORTA PIVOTANTE',
+              'CORTADO ESPELHO', 'CORTADO FLOAT', 'CORTADO LAMINADO', 'CORTADO FANTASIA',
+              'CHAPARIA ESPELHO', 'CHAPARIA FLOAT', 'CHAPARIA LAMINADO', 'TÁBUA DE VIDRO'],
+    'ACESSÓRIOS': ['FIXA ESPELHO', 'SUPORTES', 'BORRACHAS', 'ESCOVINHAS', 'PUXADORES'],
+    'ALUMÍNIO': ['PERFIS ENGENHARIA AL', 'PERFIS ENGENHARIA PERFILEVE', 'PERFIS ENGENHARIA PERFILEVE 3MTS'],
+    'FERRAGEM': ['KIT FERRAGENS LGL', 'FERRAGENS LGL', 'MOLAS', 'ROLDANAS'],
+    'KIT PARA BOX PADRÃO': ['KIT BOX COMPLETO AL', 'KIT BOX COMPLETO PORTAL', 'KIT JANELA COMPLETO PORTAL'],
+    'SILICONE': ['SILICONE'],
+    'SERVIÇOS': ['MÃO DE OBRA'],
+}
+PESOS_GRUPOS = {'VIDRO': 0.55, 'ACESSÓRIOS': 0.1, 'ALUMÍNIO': 0.1, 'FERRAGEM': 0.1,
+                'KIT PARA BOX PADRÃO': 0.07, 'SILICONE': 0.05, 'SERVIÇOS': 0.03}
+LOJAS = ['PORTAL VIDROS (MATRIZ INDÚSTRIA)', 'PORTAL VIDROS (FILIAL)']
+CIDADES_INTERIOR = ['ITACOATIARA', 'PARINTINS', 'MANACAPURU', 'IRANDUBA', 'TEFÉ', 'COARI']
+BENEFICIAMENTOS = ['LAPIDAÇÃO', 'FURO', 'RECORTE', 'Caixa de Madeira']
+NOMES = ['ANA', 'BRUNO', 'CARLA', 'DANIEL', 'ELISA', 'FABIO', 'GABRIELA', 'HUGO', 'IARA', 'JOAO',
+         'KARINA', 'LUCAS', 'MARIA', 'NATAN', 'OLGA', 'PEDRO', 'QUEILA', 'RAFAEL', 'SARA', 'TIAGO']
+
+
+def _nomes_vendedores(quantidade):
+    primeiros = [NOMES[i % len(NOMES)] + ('' if i < len(NOMES) else str(i // len(NOMES))) for i in range(quantidade)]
+    return primeiros, [f'{nome} SILVA' for nome in primeiros]
+
+
+def gerar_dados(vendedores=12, clientes=2000, anos=2, pedidos_por_mes=3000, itens_por_pedido=4,
+                semente=42, hoje=None):
+    """Devolve {'vendas', 'frete', 'benef', 'metas'} no formato bruto das fontes do dashboard."""
+    rng = np.random.default_rng(semente)
+    hoje = pd.Timestamp(hoje or pd.Timestamp.today()).normalize()
+    inicio = (hoje - pd.DateOffset(years=anos)).replace(day=1)
+    meses = pd.date_range(inicio, hoje, freq='MS')
+    primeiros_nomes, nomes_completos = _nomes_vendedores(vendedores)
+
+    # Cabeçalho dos pedidos
+    total_pedidos = pedidos_por_mes * len(meses)
+    dias = rng.integers(0, (hoje - inicio).days + 1, total_pedidos)
+    datas = inicio + pd.to_timedelta(np.sort(dias), unit='D')
+    cliente = rng.integers(1, clientes + 1, total_pedidos)
+    # Cada cliente é atendido sempre pelo mesmo vendedor
+    vendedor = cliente % vendedores
+    capital = rng.random(total_pedidos) < 0.7
+    cidade = np.where(capital, 'MANAUS', rng.choice(CIDADES_INTERIOR, total_pedidos))
+    loja = rng.choice(LOJAS, total_pedidos)
+    tipo_desconto = rng.choice(['Nenhum', 'Porcentagem', 'Reais'], total_pedidos, p=[0.6, 0.3, 0.1])
+    valor_frete = np.round(np.where(rng.random(total_pedidos) < 0.3, rng.uniform(20, 300, total_pedidos), 0), 2)
+
+    # Itens: cada pedido tem pelo menos um
+    itens = 1 + rng.poisson(max(itens_por_pedido - 1, 0), total_pedidos)
+    pedido_do_item = np.repeat(np.arange(total_pedidos), itens)
+    total_itens = len(pedido_do_item)
+    grupos = list(PESOS_GRUPOS)
+    grupo = rng.choice(grupos, total_itens, p=list(PESOS_GRUPOS.values()))
+    tipo = np.empty(total_itens, dtype=object)
+    for nome_grupo in grupos:
+        linhas = grupo == nome_grupo
+        tipo[linhas] = rng.choice(TIPOS_POR_GRUPO[nome_grupo], linhas.sum())
+    subgrupo = np.where(pd.Series(tipo).str.startswith('TÁBUA'), 'TÁBUA', grupo)
+    m2 = np.round(np.where(grupo == 'VIDRO', rng.gamma(2.0, 1.5, total_itens), 0), 3)
+    total_produto = np.round(np.where(grupo == 'VIDRO', m2 * rng.uniform(90, 400, total_itens),
+                                      rng.gamma(2.0, 80, total_itens)), 2)
+    valor_beneficiamento = np.round(np.where(rng.random(total_itens) < 0.2, rng.uniform(10, 150, total_itens), 0), 2)
+
+    soma_produtos = np.bincount(pedido_do_item, weights=total_produto, minlength=total_pedidos)
+    soma_m2 = np.bincount(pedido_do_item, weights=m2, minlength=total_pedidos)
+    total = np.round(soma_produtos + valor_frete, 2)
+    desconto = np.where(tipo_desconto == 'Porcentagem', rng.choice([3.0, 5.0, 10.0], total_pedidos),
+                        np.where(tipo_desconto == 'Reais', np.round(soma_produtos * 0.05, 2), 0.0))
+
+    vendas = pd.DataFrame({
+        'Id_Pedido': pedido_do_item + 1,
+        'Data_Pedido': datas.strftime('%d/%m/%Y').to_numpy()[pedido_do_item],
+        'Vendedor': np.asarray(nomes_completos, dtype=object)[vendedor][pedido_do_item],
+        'Grupo': grupo,
+        'Subgrupo': subgrupo,
+        'Tipo_Produto': tipo,
+        'Cidade': cidade[pedido_do_item],
+        'Loja': loja[pedido_do_item],
+        'Matriz_Cliente': cliente[pedido_do_item],
+        'Cliente': np.char.add('CLIENTE ', cliente.astype(str))[pedido_do_item],
+        'TOTAL': total[pedido_do_item],
+        'total_produto': total_produto,
+        'valor_beneficiamento': valor_beneficiamento,
+        'Desconto': desconto[pedido_do_item],
+        'Tipo_Desconto': tipo_desconto[pedido_do_item],
+        'Valor_Frete': valor_frete[pedido_do_item],
+        'm2': m2,
+        'm2_pedido': np.round(soma_m2, 3)[pedido_do_item],
+    })
+
+    # Frete e beneficiamento: um valor por vendedor e mês (e por beneficiamento)
+    mes_vendedor = pd.MultiIndex.from_product([nomes_completos, meses], names=['Vendedor', 'PERIODO']).to_frame(index=False)
+    frete = mes_vendedor.assign(Frete=np.round(rng.uniform(500, 8000, len(mes_vendedor)), 2))
+    benef = pd.MultiIndex.from_product([nomes_completos, meses, BENEFICIAMENTOS],
+                                       names=['Vendedor', 'PERIODO', 'NOME_BENEF']).to_frame(index=False)
+    benef['FATURAMENTO'] = np.round(rng.uniform(200, 5000, len(benef)), 2)
+    for df in (frete, benef):
+        df['PERIODO'] = df['PERIODO'].dt.strftime('%Y-%m-%d')
+
+    # Metas: um pouco acima da média mensal de cada vendedor
+    media_mensal = pd.Series(total, index=vendedor).groupby(level=0).sum() / len(meses)
+    metas = pd.DataFrame({
+        'NOME VENDEDOR': primeiros_nomes,
+        'META VIDRO': np.round(media_mensal.reindex(range(vendedores), fill_value=0).to_numpy() * 0.6, 2),
+        'META AGREGADOS': np.round(media_mensal.reindex(range(vendedores), fill_value=0).to_numpy() * 0.4, 2),
+        'META VENDEDOR': np.round(media_mensal.reindex(range(vendedores), fill_value=0).to_numpy() * 1.1, 2),
+    })
+    metas['META GERAL'] = np.nan
+    metas.loc[0, 'META GERAL'] = metas['META VENDEDOR'].sum()
+
+    return {'vendas': vendas, 'frete': frete, 'benef': benef, 'metas': metas}
+
+
+# Como no ERP, a data do pedido fica gravada como data (dt_pedido, indexada) e o SELECT devolve dd/mm/aaaa
+COLUNAS_VENDAS = ['Id_Pedido', 'Data_Pedido', 'Vendedor', 'Grupo', 'Subgrupo', 'Tipo_Produto', 'Cidade', 'Loja',
+                  'Matriz_Cliente', 'Cliente', 'TOTAL', 'total_produto', 'valor_beneficiamento', 'Desconto',
+                  'Tipo_Desconto', 'Valor_Frete', 'm2', 'm2_pedido']
+CONSULTAS_SQLITE = {
+    'vendas': (f"SELECT {', '.join(COLUNAS_VENDAS)} FROM vendas WHERE 1 = 1 {{filtro}}", "AND dt_pedido >= %s"),
+    'benef': ("SELECT Vendedor, PERIODO, NOME_BENEF, FATURAMENTO FROM benef WHERE 1 = 1 {filtro}",
+              "AND PERIODO >= %s"),
+    'frete': ("SELECT Vendedor, PERIODO, Frete FROM frete WHERE 1 = 1 {filtro}", "AND PERIODO >= %s"),
+}
+
+
+def gravar_sqlite(caminho, dados, substituir=True):
+    """Grava vendas, frete e beneficiamento brutos em tabelas SQLite com os mesmos nomes.
+
+    Com substituir=False as linhas são acrescentadas às tabelas existentes (ex.: pedidos novos do dia).
+    """
+    vendas = dados['vendas'].assign(
+        dt_pedido=pd.to_datetime(dados['vendas']['Data_Pedido'], format='%d/%m/%Y').dt.strftime('%Y-%m-%d'))
+    tabelas = {'vendas': vendas, 'frete': dados['frete'], 'benef': dados['benef']}
+    conexao = sqlite3.connect(caminho)
+    try:
+        with conexao:
+            for nome, df in tabelas.items():
+                df.to_sql(nome, conexao, if_exists='replace' if substituir else 'append', index=False)
+            conexao.execute('CREATE INDEX IF NOT EXISTS vendas_dt_pedido ON vendas (dt_pedido)')
+            conexao.execute('CREATE INDEX IF NOT EXISTS frete_periodo ON frete (PERIODO)')
+            conexao.execute('CREATE INDEX IF NOT EXISTS benef_periodo ON benef (PERIODO)')
+    finally:
+        conexao.close()
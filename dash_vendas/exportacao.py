@@ -0,0 +1,55 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         exportacao.py
+
+* @brief
+    Exportação da tabela Cliente Sintético para Excel.
+
+    As linhas são gravadas uma a uma com o modo constant_memory do xlsxwriter,
+    que mantém em memória apenas a linha corrente, e os meses saem como
+    células numéricas com formato de moeda (ou m²) do próprio Excel.
+"""
+import os
+import tempfile
+
+import xlsxwriter
+
+FORMATO_EXCEL_REAIS = '"R$" #,##0.00'
+FORMATO_EXCEL_M2 = '#,##0.00 "m²"'
+
+
+def gerar_excel_cliente_sintetico(df_cliente_sintetico, visualizacao='total'):
+    """Gera o arquivo .xlsx da tabela e devolve o conteúdo em bytes."""
+    descritor, caminho = tempfile.mkstemp(suffix='.xlsx')
+    os.close(descritor)
+    try:
+        workbook = xlsxwriter.Workbook(caminho, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Cliente Sintético')
+        cabecalho = workbook.add_format({'bold': True})
+        formato_valor = workbook.add_format({
+            'num_format': FORMATO_EXCEL_M2 if visualizacao == 'metragem' else FORMATO_EXCEL_REAIS,
+        })
+
+        colunas = list(df_cliente_sintetico.columns)
+        worksheet.set_column(0, 0, 45)
+        worksheet.set_column(1, 1, 20)
+        worksheet.set_column(2, len(colunas) - 1, 16, formato_valor)
+        worksheet.write_row(0, 0, colunas, cabecalho)
+
+        linha = 1
+        for cliente, cidade, *valores in df_cliente_sintetico.itertuples(index=False, name=None):
+            worksheet.write_string(linha, 0, str(cliente))
+            worksheet.write_string(linha, 1, '' if cidade is None or cidade != cidade else str(cidade))
+            for coluna, valor in enumerate(valores, start=2):
+                worksheet.write_number(linha, coluna, float(valor), formato_valor)
+            linha += 1
+
+        worksheet.autofilter(0, 0, max(linha - 1, 1), len(colunas) - 1)
+        workbook.close()
+
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    finally:
+        os.remove(caminho)
@@ -0,0 +1,163 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         fontes_erp.py
+
+* @brief
+    Consultas ao ERP e fontes do snapshot do Farol.
+
+    Reúne as conexões, as consultas de vendas, beneficiamento e frete e as
+    fontes (ingestão incremental ou agregação no banco) que alimentam o
+    snapshot. Fica fora do main.py para ser usado tanto pelo dashboard quanto
+    pelo processo atualizador (atualizador.py), que não importa o Dash.
+    montar_fontes() monta as mesmas fontes sobre outros bancos e consultas
+    (ex.: o SQLite sintético do benchmark.py).
+"""
+import os
+
+import pandas as pd
+
+from agregacao_sql import buscar_cubo, consulta_pedidos, somar_por_mes
+from comum.banco import conectar
+from dados import (ESQUEMA_BENEF, ESQUEMA_FRETE, ESQUEMA_VENDAS, consolidar_categorias,
+                   preparar_benef, preparar_cubo, preparar_frete, preparar_pedidos, preparar_vendas)
+from ingestao import CarregadorParalelo, FonteIncremental, FonteSimples
+from persistencia import VERSAO_ESQUEMA
+
+# Ingestão incremental: busca apenas as linhas a partir da última data carregada
+INGESTAO_INCREMENTAL = os.environ.get('FAROL_INGESTAO_INCREMENTAL', '1') == '1'
+
+# Agregação no banco: cubo, pedidos e somas mensais de frete/beneficiamento vêm do GROUP BY (ver agregacao_sql.py)
+AGREGACAO_SQL = os.environ.get('FAROL_AGREGACAO_SQL', '0') == '1'
+
+# Consultas
+# Cada consulta tem {filtro} no WHERE da tabela de origem. Na carga completa ele fica vazio; na
+# incremental recebe a condição da marca d'água (FILTRO_*), aplicada antes de junções e
+# agrupamentos, sobre a coluna de data gravada (indexada) e com o parâmetro no mesmo formato.
+# A condição é escrita em SQL comum, igual no MySQL e no SQLite (PORTAL_BANCO_SQLITE).
+def com_filtro(query, filtro=''):
+    return query.replace('{filtro}', filtro)
+
+banco_vendas = conectar({
+    'user': 's',
+    'password': 'a',
+    'host': 'v',
+    'database': 'i'
+}, nome='vendas')
+
+CONSULTA_VENDAS = '''
+    SELECT 
+        iavos
+        {filtro}
+    '''
+# Data do pedido como gravada na tabela (DATE), antes da formatação dd/mm/aaaa do SELECT
+FILTRO_VENDAS = "AND Data_Pedido >= %s"
+
+banco_benef = conectar({
+    'user': 'i',
+    'password': 's',
+    'host': 'a',
+    'database': 'l'
+}, nome='benef')
+
+CONSULTA_BENEF = '''
+    lasis
+    {filtro}
+    '''
+FILTRO_BENEF = "AND PERIODO >= %s"
+
+banco_frete = conectar({
+    'user': 'a',
+    'password': 'v',
+    'host': 'i',
+    'database': 'o'
+}, nome='frete')
+
+CONSULTA_FRETE = '''
+    SELECT
+        avios
+        {filtro}
+    '''
+FILTRO_FRETE = "AND PERIODO >= %s"
+
+# (consulta, filtro da marca d'água) de cada fonte
+CONSULTAS = {
+    'vendas': (CONSULTA_VENDAS, FILTRO_VENDAS),
+    'benef': (CONSULTA_BENEF, FILTRO_BENEF),
+    'frete': (CONSULTA_FRETE, FILTRO_FRETE),
+}
+
+
+def _buscador(banco, consulta, filtro, agrupar=None):
+    # buscar(desde=None) da FonteIncremental: com 'desde', só as linhas com data >= desde
+    def buscar(desde=None):
+        query = com_filtro(consulta, filtro if desde is not None else '')
+        if agrupar is not None:
+            query = agrupar(query)
+        return banco.consultar(query, (desde.date(),) if desde is not None else None)
+    return buscar
+
+
+def _com_data(filtro, desde):
+    # Data gerada aqui (não vem do usuário); literal porque as consultas agregadas têm '%' no STR_TO_DATE
+    return filtro.replace('%s', f"'{desde.date().isoformat()}'")
+
+
+def montar_fontes(bancos, consultas, incremental=INGESTAO_INCREMENTAL, agregacao_sql=AGREGACAO_SQL):
+    """Fontes do snapshot sobre os bancos e consultas informados (chaves 'vendas', 'benef' e 'frete').
+
+    Usada com o ERP (abaixo) e, no benchmark.py, com as tabelas sintéticas em SQLite.
+    """
+    agrupar_benef = agrupar_frete = None
+    if agregacao_sql:
+        agrupar_benef = lambda query: somar_por_mes(query, 'PERIODO', ['Vendedor', 'NOME_BENEF'], ['FATURAMENTO'])
+        agrupar_frete = lambda query: somar_por_mes(query, 'PERIODO', ['Vendedor'], ['Frete'])
+    buscar_vendas = _buscador(bancos['vendas'], *consultas['vendas'])
+
+    # Pedidos podem ser editados por alguns dias; frete e beneficiamento são fechados por mês
+    fontes = {
+        'vendas': FonteIncremental(buscar_vendas, preparar_vendas, 'Data_Pedido',
+                                   janela_reconciliacao=pd.Timedelta(days=3), incremental=incremental,
+                                   consolidar=lambda df: consolidar_categorias(df, ESQUEMA_VENDAS)),
+        'frete': FonteIncremental(_buscador(bancos['frete'], *consultas['frete'], agrupar=agrupar_frete),
+                                  preparar_frete, 'PERIODO',
+                                  janela_reconciliacao=pd.DateOffset(months=1), incremental=incremental,
+                                  consolidar=lambda df: consolidar_categorias(df, ESQUEMA_FRETE)),
+        'benef': FonteIncremental(_buscador(bancos['benef'], *consultas['benef'], agrupar=agrupar_benef),
+                                  preparar_benef, 'PERIODO',
+                                  janela_reconciliacao=pd.DateOffset(months=1), incremental=incremental,
+                                  consolidar=lambda df: consolidar_categorias(df, ESQUEMA_BENEF)),
+    }
+
+    if agregacao_sql:
+        # Só as linhas e os pedidos do mês atual vêm detalhados; o cubo e o
+        # histórico dos pedidos (por dia, vendedor e cliente) chegam já agrupados.
+        # Pedidos e cubo também são incrementais: só as datas (ou meses) a partir
+        # do corte são agregadas de novo e substituem as que já estavam em memória
+        consulta_vendas, filtro_vendas = consultas['vendas']
+
+        def vendas_desde(desde=None):
+            return com_filtro(consulta_vendas, _com_data(filtro_vendas, desde) if desde is not None else '')
+
+        fontes['vendas'] = FonteSimples(lambda: buscar_vendas(desde=pd.Timestamp.today().normalize().replace(day=1)),
+                                        preparar_vendas)
+        fontes['pedidos'] = FonteIncremental(
+            lambda desde=None: bancos['vendas'].consultar(consulta_pedidos(vendas_desde(desde), pd.Timestamp.today())),
+            preparar_pedidos, 'Data_Pedido', janela_reconciliacao=pd.Timedelta(days=3), incremental=incremental,
+            consolidar=lambda df: consolidar_categorias(df, ESQUEMA_VENDAS))
+        # A marca d'água do cubo é sempre o 1º dia de um mês, então o corte cai na virada do mês
+        # e cada mês é substituído inteiro
+        fontes['cubo'] = FonteIncremental(
+            lambda desde=None: buscar_cubo(bancos['vendas'].consultar, vendas_desde(desde)),
+            preparar_cubo, 'Mes', janela_reconciliacao=pd.DateOffset(months=1), incremental=incremental)
+    return fontes
+
+
+fontes = montar_fontes({'vendas': banco_vendas, 'benef': banco_benef, 'frete': banco_frete}, CONSULTAS)
+
+# As fontes são buscadas ao mesmo tempo; o snapshot só é publicado se todas derem certo
+carregar_fontes = CarregadorParalelo(fontes)
+
+# Versão das fontes gravadas em disco; muda junto com o modo de agregação, que altera as fontes
+VERSAO_FONTES = f"{VERSAO_ESQUEMA}{'-sql' if AGREGACAO_SQL else ''}"
@@ -0,0 +1,49 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         formatacao.py
+
+* @brief
+    Formatação de valores no padrão brasileiro (R$ 1.234,56 e 1.234,56 m²).
+
+    As tabelas levam os números crus e usam FORMATO_REAIS / FORMATO_M2 nas
+    colunas, de forma que a formatação é feita pelo DataTable no navegador e a
+    ordenação continua numérica. formatar_reais / formatar_m2 ficam para os
+    lugares onde o texto é realmente necessário (cards, exportação).
+"""
+import numpy as np
+import pandas as pd
+from dash_table.Format import Format, Group, Scheme, Symbol
+
+FORMATO_REAIS = Format(
+    scheme=Scheme.fixed, precision=2, group=Group.yes, symbol=Symbol.yes,
+    symbol_prefix='R$ ', decimal_delimiter=',', group_delimiter='.',
+)
+FORMATO_M2 = Format(
+    scheme=Scheme.fixed, precision=2, group=Group.yes, symbol=Symbol.yes,
+    symbol_suffix=' m²', decimal_delimiter=',', group_delimiter='.',
+)
+
+# Separadores para gráficos Plotly (decimal, milhar)
+SEPARADORES_PLOTLY = ',.'
+
+# Troca os separadores do padrão americano (1,234.56) pelos brasileiros (1.234,56)
+_TROCA_SEPARADORES = str.maketrans(',.', '.,')
+
+
+def _formatar(valores, modelo):
+    if np.isscalar(valores):
+        return modelo.format(valores).translate(_TROCA_SEPARADORES)
+    serie = pd.Series(valores, dtype='float64')
+    return serie.map(modelo.format).str.translate(_TROCA_SEPARADORES)
+
+
+def formatar_reais(valores):
+    """Valor (ou Series/array de valores) no formato 'R$ 1.234,56'."""
+    return _formatar(valores, 'R$ {:,.2f}')
+
+
+def formatar_m2(valores):
+    """Valor (ou Series/array de valores) no formato '1.234,56 m²'."""
+    return _formatar(valores, '{:,.2f} m²')
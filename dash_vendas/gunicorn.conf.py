@@ -0,0 +1,34 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         gunicorn.conf.py
+
+* @brief
+    Configuração do gunicorn para servir o Farol com vários workers.
+
+    Os workers leem o snapshot gravado pelo atualizador.py (memory-map, sem
+    consultar o banco), então o atualizador deve rodar ao lado, com a mesma
+    FAROL_SNAPSHOT_COMPARTILHADO:
+
+        python atualizador.py &
+        gunicorn main:server -c gunicorn.conf.py
+
+    Cada worker mede os próprios callbacks. Com PORTAL_METRICAS_DIR (padrão
+    abaixo), o /metrics de qualquer worker devolve as séries de todos, cada
+    uma com o rótulo 'processo'; sem ela, cada worker seria coletado à parte.
+"""
+import os
+
+# Os workers herdam a pasta do snapshot; sem ela, cada worker consultaria o banco por conta própria
+os.environ.setdefault('FAROL_SNAPSHOT_COMPARTILHADO', 'snapshot_compartilhado')
+# Pasta comum das métricas: o /metrics de um worker inclui as séries dos demais
+os.environ.setdefault('PORTAL_METRICAS_DIR', 'metricas_workers')
+
+bind = os.environ.get('FAROL_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('FAROL_WORKERS', '4'))
+threads = int(os.environ.get('FAROL_THREADS', '4'))
+# Cada worker importa o main.py depois do fork: a thread do LeitorSnapshot não sobreviveria ao fork
+preload_app = False
+# A subida do worker espera o primeiro snapshot do atualizador (LeitorSnapshot.aguardar)
+timeout = 120
@@ -0,0 +1,153 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         ingestao.py
+
+* @brief
+    Ingestão incremental das fontes do dashboard por marca d'água.
+
+    Cada fonte guarda em memória os dados já preparados e a maior data
+    carregada (Data_Pedido ou PERIODO). Nas atualizações seguintes, apenas as
+    linhas a partir dessa data são buscadas no banco e substituem o trecho
+    correspondente. De tempos em tempos a janela volta alguns dias (ou meses)
+    para reconciliar pedidos que ainda podem ser editados no ERP.
+
+    A carga é feita em duas etapas: buscar() (consulta ao banco, I/O) e
+    incorporar() (preparação e junção, CPU). O CarregadorParalelo roda as
+    buscas de todas as fontes ao mesmo tempo e só depois prepara cada uma.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+class FonteIncremental:
+    def __init__(self, buscar, preparar, coluna_data, janela_reconciliacao,
+                 reconciliar_a_cada=12, incremental=True, consolidar=None):
+        # buscar(desde=None) devolve o DataFrame bruto; com 'desde', só as linhas com data >= desde
+        self._buscar = buscar
+        self._preparar = preparar
+        self._coluna_data = coluna_data
+        self._janela_reconciliacao = janela_reconciliacao
+        self._reconciliar_a_cada = reconciliar_a_cada
+        self._incremental = incremental
+        # consolidar(df) é aplicado após juntar os lotes (ex.: refazer categorias)
+        self._consolidar = consolidar
+        self._dados = None
+        self._ciclos = 0
+
+    @property
+    def marca_dagua(self):
+        if self._dados is None or self._dados.empty:
+            return None
+        maior_data = self._dados[self._coluna_data].max()
+        return None if pd.isna(maior_data) else maior_data.normalize()
+
+    def _corte(self):
+        # O último dia carregado é sempre buscado de novo, pois ainda recebe pedidos
+        corte = self.marca_dagua
+        if corte is not None and self._ciclos % self._reconciliar_a_cada == 0:
+            corte = corte - self._janela_reconciliacao
+        return corte
+
+    def buscar(self):
+        """Busca no banco as linhas novas. Devolve o lote a ser passado para incorporar()."""
+        self._ciclos += 1
+        corte = self._corte() if self._incremental else None
+        if corte is None:
+            return corte, self._buscar()
+        return corte, self._buscar(desde=corte)
+
+    def incorporar(self, lote):
+        """Prepara o lote e devolve um novo DataFrame com a fonte completa (o anterior não é alterado)."""
+        corte, bruto = lote
+        if corte is None:
+            self._dados = self._preparar(bruto).reset_index(drop=True)
+            return self._dados
+
+        novos = self._preparar(bruto)
+        # Linhas com data vazia não voltam na busca incremental, então são mantidas
+        mantidos = self._dados[~(self._dados[self._coluna_data] >= corte)]
+        self._dados = pd.concat([mantidos, novos], ignore_index=True)
+        if self._consolidar is not None:
+            self._dados = self._consolidar(self._dados)
+        return self._dados
+
+    def carregar(self):
+        return self.incorporar(self.buscar())
+
+    def semear(self, dados):
+        """Parte de dados já preparados (ex.: a cópia em disco), sem carga completa no banco."""
+        self._dados = dados.reset_index(drop=True)
+        # A cópia pode ser antiga: a próxima busca já volta a janela de reconciliação
+        self._ciclos = self._reconciliar_a_cada - 1
+
+
+class FonteSimples:
+    """Fonte lida por inteiro a cada atualização."""
+
+    def __init__(self, ler, preparar=None):
+        self._ler = ler
+        self._preparar = preparar
+
+    def buscar(self):
+        return self._ler()
+
+    def incorporar(self, lote):
+        return self._preparar(lote) if self._preparar is not None else lote
+
+    def carregar(self):
+        return self.incorporar(self.buscar())
+
+
+class CarregadorParalelo:
+    """Busca todas as fontes em paralelo e prepara cada uma em seguida.
+
+    Se qualquer busca falhar, nada é devolvido e a exceção sobe, para que o
+    snapshot anterior continue publicado. As durações da última carga ficam em
+    'duracoes' (segundos por fonte e etapa).
+    """
+
+    def __init__(self, fontes, max_workers=None):
+        self._fontes = fontes
+        self._max_workers = max_workers or len(fontes)
+        self.duracoes = {}
+
+    def semear(self, dados):
+        """Repassa os DataFrames restaurados às fontes incrementais."""
+        for nome, fonte in self._fontes.items():
+            if hasattr(fonte, 'semear') and nome in dados:
+                fonte.semear(dados[nome])
+
+    @staticmethod
+    def _buscar(fonte):
+        inicio = time.perf_counter()
+        lote = fonte.buscar()
+        return lote, time.perf_counter() - inicio
+
+    def __call__(self):
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='busca-fonte') as executor:
+            futuros = {nome: executor.submit(self._buscar, fonte) for nome, fonte in self._fontes.items()}
+
+        lotes, duracoes, falhas = {}, {}, {}
+        for nome, futuro in futuros.items():
+            try:
+                lotes[nome], busca = futuro.result()
+                duracoes[nome] = {'busca': busca}
+            except Exception as erro:
+                falhas[nome] = erro
+        if falhas:
+            nome, erro = next(iter(falhas.items()))
+            raise RuntimeError(f"Falha ao buscar as fontes: {', '.join(falhas)}") from erro
+
+        dados = {}
+        for nome, fonte in self._fontes.items():
+            inicio_preparo = time.perf_counter()
+            dados[nome] = fonte.incorporar(lotes[nome])
+            duracoes[nome]['preparo'] = time.perf_counter() - inicio_preparo
+        duracoes['total'] = time.perf_counter() - inicio
+        self.duracoes = duracoes
+        return dados
@@ -21,85 +21,78 @@ Projeto: Farol de Vendas - Dashboard Interativo
     O dashboard é iniciado em um servidor local e pode ser acessado via navegador web para
     uma interação ao vivo com os dados.
 """
-import dash,base64
+import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, dcc, dash_table
 import pandas as pd
-import mysql.connector
-import numpy as np
 import plotly.graph_objs as go
-from datetime import datetime, timedelta
-from io import BytesIO
+from datetime import datetime
 from dash import dash_table
-from dash_table.Format import Format, Scheme, Symbol, Group
 from dash.dependencies import Input, Output, State, MATCH, ALL
 from pandas.tseries.offsets import MonthEnd, BDay
 import dash_auth
-from flask import request
+from flask import has_request_context, request, jsonify
 import os
+import sys
 import locale
 import platform
+# Raiz do repositório no sys.path, para o pacote comum/ (módulos compartilhados entre os painéis)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calendario import CalendarioUteis
+from compartilhado import LeitorSnapshot, SnapshotCompartilhado
+from cache import CacheVersionado
+from cubo import TODOS_OS_VENDEDORES
+from exportacao import gerar_excel_cliente_sintetico
+from formatacao import FORMATO_M2, FORMATO_REAIS, SEPARADORES_PLOTLY, formatar_reais
+from fontes_erp import VERSAO_FONTES, banco_benef, banco_frete, banco_vendas, carregar_fontes
+from comum.instrumentacao import instrumentar_callbacks
+from metas import MetasVendedores
+from paginacao import aplicar_filtro, ordenar, pagina
+from periodos import fatia
+from persistencia import CacheSnapshotLocal
+from snapshot import AtualizadorSnapshot
+from visao import VisaoVendedor
 
 if platform.system() == 'Windows':
     locale.setlocale(locale.LC_TIME, 'portuguese_brazil')
 else:
     locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
 
-# Consultas
-def fetch_data():
-    config = {
-        'user': 's',
-        'password': 'a',
-        'host': 'v',
-        'database': 'i'
-    }
+# A planilha de metas não faz parte do snapshot: é relida apenas quando o arquivo muda
+metas_vendedores = MetasVendedores("META_VENDEDORES.xlsx")
 
-    conn = mysql.connector.connect(**config)
-    query = '''
-    SELECT 
-        iavos
-    '''
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
-df = fetch_data()
-df['Vendedor'] = df['Vendedor'].apply(lambda x: x.split()[0])
-df_metas = pd.read_excel("META_VENDEDORES.xlsx")
-meta_geral_valor = df_metas['META GERAL'].values[0]
-meta_geral_formatada = f"R$ {meta_geral_valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
-def fetch_data_benef():
-    config = {
-        'user': 'i',
-        'password': 's',
-        'host': 'a',
-        'database': 'l'
-    }
+# Intervalo das atualizações em segundo plano, em segundos. Com 0 não há atualização em
+# segundo plano: o dashboard serve a cópia local como está (usado pelo benchmark.py)
+INTERVALO_ATUALIZACAO = int(os.environ.get('FAROL_INTERVALO_ATUALIZACAO', '300'))
 
-    conn = mysql.connector.connect(**config)
-    query = '''
-    lasis
-    '''
-    df_benef = pd.read_sql(query, conn)
-    conn.close()
-    return df_benef
-
-def fetch_data_frete():
-    config = {
-        'user': 'a',
-        'password': 'v',
-        'host': 'i',
-        'database': 'o'
-    }
+# Com vários workers (gunicorn.conf.py), o snapshot é gravado por um único atualizador.py nesta pasta
+SNAPSHOT_COMPARTILHADO = os.environ.get('FAROL_SNAPSHOT_COMPARTILHADO')
+
+if SNAPSHOT_COMPARTILHADO:
+    # Worker: lê (memory-map) o snapshot publicado pelo atualizador, sem consultar o banco
+    atualizador = LeitorSnapshot(SnapshotCompartilhado(SNAPSHOT_COMPARTILHADO, versao_esquema=VERSAO_FONTES))
+    atualizador.aguardar()
+    atualizador.iniciar()
+else:
+    # Cópia local das fontes (Parquet)
+    cache_local = CacheSnapshotLocal(os.environ.get('FAROL_CACHE_SNAPSHOT', 'cache_snapshot'), versao_esquema=VERSAO_FONTES)
+
+    # Na subida, serve a cópia local e busca os dados novos em segundo plano; sem cópia, a
+    # primeira carga é síncrona. As próximas acontecem em segundo plano a cada 5 minutos
+    atualizador = AtualizadorSnapshot(carregar_fontes, intervalo=INTERVALO_ATUALIZACAO or 300, cache_local=cache_local)
+    if atualizador.restaurar():
+        if INTERVALO_ATUALIZACAO:
+            atualizador.iniciar(atualizar_agora=True)
+    else:
+        atualizador.atualizar()
+        if INTERVALO_ATUALIZACAO:
+            atualizador.iniciar()
 
-    conn = mysql.connector.connect(**config)
-    query = '''
-    SELECT
-        avios
-    '''
-    df_frete = pd.read_sql(query, conn)
-    conn.close()
-    return df_frete
+# Resultados dos callbacks do vendedor ficam em cache até o próximo snapshot, até a planilha de metas
+# mudar ou até a virada do dia: os cards, tabelas e gráficos dependem do dia e do mês atuais, mesmo
+# sem atualização (FAROL_INTERVALO_ATUALIZACAO=0 ou o banco fora do ar)
+cache_callbacks = CacheVersionado(
+    lambda: (atualizador.versao, metas_vendedores.versao, datetime.now().date()), tamanho_maximo=512)
 
 VALID_USERNAME_PASSWORD_PAIRS = {}
 nomes_meses = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
@@ -108,45 +101,65 @@ app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 auth = dash_auth.BasicAuth(app, VALID_USERNAME_PASSWORD_PAIRS)
 app.server.secret_key = ''
 app.server.secret_key = os.environ.get('', '')
+# WSGI para o gunicorn: gunicorn main:server -c gunicorn.conf.py
+server = app.server
 
-@app.callback(
-    Output('vendedor-dropdown', 'value'),
-    [Input('interval-update', 'n_intervals'),
-     Input('vendedor-dropdown', 'value')],
-    [State('vendedor-dropdown', 'value')]
-)
-def update_vendedor_selecionado(n_intervals, selected_value, state_value):
-    username = request.authorization['username']
-    if username != '':
-        return username
-    return state_value
-
+# Tempo, CPU, tamanho da resposta e erros de cada callback, por vendedor, em /metrics
+instrumentar_callbacks(app, rotulos={'vendedor': 'vendedor-dropdown.value'})
 
-current_date = pd.to_datetime('today').normalize()
-start_date_realizado = current_date.replace(day=1)
-end_date_realizado = current_date
+@app.server.route('/estatisticas-cache')
+def estatisticas_cache():
+    return jsonify(cache_callbacks.estatisticas())
 
-def calc_realizado(df_):
-    ano_atual = datetime.now().year
-    mes_atual = datetime.now().month
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'])
-    df_filtered = df_[(df_['Data_Pedido'].dt.year == ano_atual) & (df_['Data_Pedido'].dt.month == mes_atual)]
-    df_filtered_unique = df_filtered.drop_duplicates(subset='Id_Pedido', keep='first')
+@app.server.route('/estatisticas-atualizacao')
+def estatisticas_atualizacao():
+    snap = atualizador.atual()
+    return jsonify({'versao': snap.versao, 'criado_em': snap.criado_em.isoformat(), 'duracoes': carregar_fontes.duracoes})
 
-    return df_filtered_unique['TOTAL'].sum()
+@app.server.route('/estatisticas-banco')
+def estatisticas_banco():
+    return jsonify({banco.nome: banco.metricas() for banco in (banco_vendas, banco_benef, banco_frete)})
 
-def calc_realizado_ate_ontem(df_):
-    ano_atual = datetime.now().year
-    mes_atual = datetime.now().month
-    ontem = datetime.now().day-1
+def versao_dados():
+    # Versão do snapshot, da planilha de metas e o dia: os cards só mudam quando um deles muda
+    return [atualizador.versao, metas_vendedores.versao, datetime.now().date().isoformat()]
 
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'])
-    df_filtered = df_[(df_['Data_Pedido'].dt.year == ano_atual) &
-                      (df_['Data_Pedido'].dt.month == mes_atual) &
-                      (df_['Data_Pedido'].dt.day <= ontem)]
-    df_filtered_unique = df_filtered.drop_duplicates(subset='Id_Pedido', keep='first')
+@app.callback(
+    Output('versao-snapshot', 'data'),
+    [Input('interval-update', 'n_intervals')],
+    [State('versao-snapshot', 'data')],
+    prevent_initial_call=True
+)
+def verificar_versao_snapshot(n_intervals, versao_atual):
+    # A cada intervalo só a versão é conferida; nada é recalculado se ela não mudou
+    versao = versao_dados()
+    if versao == versao_atual:
+        return dash.no_update
+    return versao
+
+# O vendedor do login vem no layout ('vendedor-sessao'); travar a seleção e repetir o vendedor
+# quando há dados novos é feito no navegador, sem ida ao servidor. Reenviar o mesmo valor faz
+# os callbacks do vendedor recalcularem com o snapshot novo.
+app.clientside_callback(
+    """
+    function(vendedor_sessao, versao, valor) {
+        const travado = Boolean(vendedor_sessao);
+        const selecionado = travado ? vendedor_sessao : valor;
+        const disparado = window.dash_clientside.callback_context.triggered || [];
+        const nova_versao = disparado.some(t => t.prop_id === 'versao-snapshot.data');
+        if (selecionado === valor && !nova_versao) {
+            return [window.dash_clientside.no_update, travado];
+        }
+        return [selecionado, travado];
+    }
+    """,
+    [Output('vendedor-dropdown', 'value'),
+     Output('vendedor-dropdown', 'disabled')],
+    [Input('vendedor-sessao', 'data'),
+     Input('versao-snapshot', 'data')],
+    [State('vendedor-dropdown', 'value')]
+)
 
-    return df_filtered_unique['TOTAL'].sum()
 
 def get_vendedor_names(df):
     first_names = [name.split()[0] for name in df['Vendedor'].unique()]
@@ -154,118 +167,59 @@ def get_vendedor_names(df):
     options.insert(0, {'label': 'TODOS OS VENDEDORES', 'value': 'TODOS OS VENDEDORES'})
     return options
 
-def dias_uteis_ate_ontem(start_date, end_date):
-    # Converte as datas para o formato 'datetime64[D]'
-    start_date_fmt = np.datetime64(start_date, 'D')
-    # Ajusta end_date para incluir 'ontem' na contagem, adicionando um dia
-    end_date_ajustado = end_date + np.timedelta64(1, 'D')
-    end_date_fmt = np.datetime64(end_date_ajustado, 'D')
-    
-    return np.busday_count(start_date_fmt, end_date_fmt)
-
-def total_dias_uteis_no_mes(start_date_realizado):
-    start_date_realizado = start_date_realizado.replace(day=1)
-    start_date_fmt = np.datetime64(start_date_realizado, 'D')
-    # Calcula o último dia do mês
-    last_day_of_month = start_date_realizado + pd.offsets.MonthEnd(1)
-    last_day_of_month_fmt = np.datetime64(last_day_of_month, 'D')
-
-    return np.busday_count(start_date_fmt, last_day_of_month_fmt + np.timedelta64(1, 'D'))
+# Dias úteis com feriados nacionais e de Manaus; as projeções usam sempre a data do momento
+calendario = CalendarioUteis()
 
-def calc_projecao_geral(valor_realizado):
-    dias_uteis_ate_ontem_ = dias_uteis_ate_ontem(start_date_realizado, end_date_realizado - pd.Timedelta(days=1))
-    total_dias = total_dias_uteis_no_mes(start_date_realizado)
-    if dias_uteis_ate_ontem_ > 0:  
-        return (valor_realizado / dias_uteis_ate_ontem_) * total_dias
-    return 0
+def visao_vendedor(vendedor_selecionado):
+    # Recortes e totais do vendedor, calculados uma vez por (vendedor, dia, snapshot) e
+    # compartilhados por todos os cards, gráficos e tabelas
+    hoje = pd.to_datetime('today').normalize()
+    return cache_callbacks.obter(
+        'visao_vendedor', (vendedor_selecionado, hoje),
+        lambda: VisaoVendedor(atualizador.atual(), vendedor_selecionado, hoje, calendario.fator_projecao(hoje)),
+    )
 
 @app.callback(
     Output("realizado-vendedor", "children"),
     [Input("vendedor-dropdown", "value")]
 )
+@cache_callbacks.memoizar
 def calcular_realizado_vendedor(vendedor_selecionado):
     if vendedor_selecionado == 'TODOS OS VENDEDORES':
         return "R$ 0.00"
     
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
-
-    df_filtrado = df[(df['Vendedor'] == vendedor_selecionado) & 
-                     (df['Data_Pedido'] >= start_date_realizado) & 
-                     (df['Data_Pedido'] <= end_date_realizado)]
-    df_filtrado_unico = df_filtrado.drop_duplicates(subset='Id_Pedido', keep='first')
-
-    if df_filtrado_unico.empty:
+    visao = visao_vendedor(vendedor_selecionado)
+    if visao.pedidos_ate_hoje.empty:
         return "R$ 0.00"
     
-    valor_realizado_vendedor = df_filtrado_unico['TOTAL'].sum()
-    valor_formatado = "R$ {:,.2f}".format(valor_realizado_vendedor).replace(",", "X").replace(".", ",").replace("X", ".")
+    valor_formatado = formatar_reais(visao.realizado)
 
     return valor_formatado
 
-def calc_projecao_vendedor(df_, vendedor_selecionado):
-    ano_atual = datetime.now().year
-    mes_atual = datetime.now().month
-    ontem = datetime.now().day-1
-    # Garantindo que a coluna 'Data_Pedido' esteja no formato correto
-    df_['Data_Pedido'] = pd.to_datetime(df_['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
-
-    # Filtrando o DataFrame pelo vendedor selecionado e pelo período
-    df_filtrado = df_[(df_['Vendedor'] == vendedor_selecionado) & (df_['Data_Pedido'].dt.month == mes_atual) &
-                      (df_['Data_Pedido'].dt.year == ano_atual)
-                      & (df_['Data_Pedido'].dt.day <= ontem)]
-
-    df_filtrado_unico = df_filtrado.drop_duplicates(subset='Id_Pedido', keep='first')
-    valor_realizado_vendedor = df_filtrado_unico['TOTAL'].sum()
-    dias_uteis_ate_ontem_ = dias_uteis_ate_ontem(start_date_realizado, end_date_realizado - pd.Timedelta(days=1))
-    total_dias_uteis = total_dias_uteis_no_mes(start_date_realizado)
-
-    # Calculando a projeção
-    if dias_uteis_ate_ontem_ > 0: 
-        projecao = (valor_realizado_vendedor / dias_uteis_ate_ontem_) * total_dias_uteis
-    else:
-        projecao = 0.00
-
-    return projecao
-
 @app.callback(
     Output("projecao-vendedor", "children"),
     [Input("vendedor-dropdown", "value")]
 )
+@cache_callbacks.memoizar
 def atualizar_projecao_vendedor(vendedor_selecionado):
     if vendedor_selecionado == 'TODOS OS VENDEDORES':
         # Se nenhum vendedor estiver selecionado, não há o que calcular
         return "R$ 0.00"
 
-    projecao = calc_projecao_vendedor(df, vendedor_selecionado)
+    projecao = visao_vendedor(vendedor_selecionado).projecao
     # Formatar a projeção como moeda
-    projecao_formatada = "R$ {:,.2f}".format(projecao).replace(",", "X").replace(".", ",").replace("X", ".")
+    projecao_formatada = formatar_reais(projecao)
 
     return projecao_formatada
 
 #################### GRÁFICO DE LINHA
-def aggregate_daily_sales(df_, vendedor_selecionado):
-    end_date = pd.to_datetime('today').normalize()
-    start_date = end_date.replace(day=1)
-    
-    df_['Data_Pedido'] = pd.to_datetime(df_['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
-    
-    if vendedor_selecionado != "TODOS OS VENDEDORES":
-        df_filtered = df_[(df_['Data_Pedido'].between(start_date, end_date)) & (df_['Vendedor'] == vendedor_selecionado)]
-    else:
-        df_filtered = df_[df_['Data_Pedido'].between(start_date, end_date)]
-        
-    df_filtered_unique = df_filtered.drop_duplicates(subset='Id_Pedido', keep='first')
-    
-    daily_sales = df_filtered_unique.groupby('Data_Pedido')['TOTAL'].sum().reset_index()
-    
-    return daily_sales
-
 @app.callback(
     Output('right-chart', 'figure'), 
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_line_chart(vendedor_selecionado):
-    filtered_data = aggregate_daily_sales(df, vendedor_selecionado)
+    filtered_data = visao_vendedor(vendedor_selecionado).diario
     return generate_line_chart(filtered_data)
 
 # Função para gerar o gráfico de linha com os dados agregados
@@ -302,72 +256,29 @@ def generate_line_chart(agg_df):
     fig = go.Figure(data=[trace], layout=layout)
     fig.update_layout(
         yaxis_tickformat='R$,.2f',  
-        separators=',.'  
+        separators=SEPARADORES_PLOTLY  
     )
 
     return fig
 
-end_date_3_meses = pd.to_datetime('today').normalize()
-start_date_3_meses = (end_date_3_meses - pd.DateOffset(months=2)).replace(day=1)
-
 #################### GRÁFICO DE PILHA
-def apply_discount(row):
-    if row['Tipo_Desconto'] == 'Porcentagem':
-        return max(0, row['total_produto'] - (row['total_produto'] * row['Desconto'] / 100))
-    elif row['Tipo_Desconto'] == 'Reais':
-        valor_frete = row.get('Valor_Frete', 0)
-        return ((row['total_produto'] * row['Desconto']) / ((row['TOTAL'] - valor_frete) + row['Desconto']) - row['total_produto']) * (-1)
-    return row['total_produto'] 
-
-def calcular_somas(df, categorias, inicio_mes, fim_mes, vendedor_selecionado):
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'])
-    if vendedor_selecionado != "TODOS OS VENDEDORES":
-        df_filtrado = df[(df['Data_Pedido'] >= inicio_mes) & 
-                         (df['Data_Pedido'] <= fim_mes) & 
-                         (df['Grupo'].isin(categorias)) & 
-                         (df['Vendedor'] == vendedor_selecionado)]
-    else:
-        df_filtrado = df[(df['Data_Pedido'] >= inicio_mes) & 
-                         (df['Data_Pedido'] <= fim_mes) & 
-                         (df['Grupo'].isin(categorias))]
-
-    df_filtrado['total_produto_com_desconto'] = df_filtrado.apply(apply_discount, axis=1)
-    return df_filtrado['total_produto_com_desconto'].sum()
+def calcular_somas(cubo, categorias, inicio_mes, vendedor_selecionado):
+    # Soma o faturamento com desconto do mês de 'inicio_mes' para os grupos informados
+    return cubo.soma(vendedor_selecionado, [inicio_mes], grupos=categorias)
 categorias_agregadas = ['ACESSÓRIOS', 'ALUMÍNIO', 'FERRAGEM', 'KIT PARA BOX PADRÃO', 'SILICONE']
 categoria_vidro = ['VIDRO']
-hoje = datetime.now()
-meses = []
-for i in range(2, 5):  
-    inicio_mes = (hoje - pd.offsets.MonthBegin(n=i)).to_pydatetime()
-    fim_mes = (inicio_mes + pd.offsets.MonthEnd(n=0)).to_pydatetime()
-    meses.append((inicio_mes, fim_mes))
 
 #################### Card Venda por Localidade 
-def calcular_vendas_por_localidade(df, vendedor_selecionado=None):
-    df = df.drop_duplicates(subset='Id_Pedido', keep='first')
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y')
-    
-    mes_atual = datetime.now().month
-    ano_atual = datetime.now().year
-    df_mes_atual = df[(df['Data_Pedido'].dt.month == mes_atual) & (df['Data_Pedido'].dt.year == ano_atual)]
-    
-    if vendedor_selecionado and vendedor_selecionado != "TODOS OS VENDEDORES":
-        df_mes_atual = df_mes_atual[df_mes_atual['Vendedor'] == vendedor_selecionado]
-    
-    vendas_capital = df_mes_atual[df_mes_atual['Cidade'].str.lower() == 'manaus']['TOTAL'].sum()
-    vendas_interior = df_mes_atual[df_mes_atual['Cidade'].str.lower() != 'manaus']['TOTAL'].sum()
-    
-    return vendas_capital, vendas_interior
-
 @app.callback(
     [Output('vendas-capital', 'children'),
      Output('vendas-interior', 'children')],
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_vendas_por_localidade(vendedor_selecionado):
-    vendas_capital, vendas_interior = calcular_vendas_por_localidade(df, vendedor_selecionado)
-    return [f"R$ {vendas_capital:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-            f"R$ {vendas_interior:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')]
+    vendas_capital, vendas_interior = visao_vendedor(vendedor_selecionado).localidade
+    return [formatar_reais(vendas_capital),
+            formatar_reais(vendas_interior)]
 
 # Callback para atualizar o card de "Clientes Atendidos - Grupos Específicos"
 @app.callback(
@@ -376,68 +287,26 @@ def update_vendas_por_localidade(vendedor_selecionado):
      Output('clientes-atendidos-temperados', 'children')],
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_clientes_atendidos(vendedor_selecionado):
-    clientes_vidro, clientes_agregados, clientes_temperado = contar_clientes_grupos(df, vendedor_selecionado)
+    clientes_vidro, clientes_agregados, clientes_temperado = visao_vendedor(vendedor_selecionado).clientes_por_grupo
     return [
         f"QTD. {clientes_vidro}",
         f"QTD. {clientes_agregados}",
         f"QTD. {clientes_temperado}"
     ]
 
-# #################### Card qtd clientes atendidos
-def contar_clientes_grupos(df, vendedor_selecionado=None):
-    grupos_agregados = ['ACESSÓRIOS', 'ALUMÍNIO', 'FERRAGEM', 'KIT PARA BOX PADRÃO', 'SILICONE']
-
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y')
-
-    # Filtrar o DataFrame pelo mês e ano atual
-    mes_atual = datetime.now().month
-    ano_atual = datetime.now().year
-
-    if vendedor_selecionado and vendedor_selecionado != "TODOS OS VENDEDORES":
-        df = df[df['Vendedor'] == vendedor_selecionado]
-
-    df_mes_atual = df[(df['Data_Pedido'].dt.month == mes_atual) & (df['Data_Pedido'].dt.year == ano_atual)]
-
-    # Filtrar por grupos 'Agregados'
-    df_agregados = df_mes_atual[df_mes_atual['Grupo'].isin(grupos_agregados)]
-    clientes_agregados = df_agregados['Matriz_Cliente'].nunique()
-
-    # Filtrar por grupo 'VIDRO' na matriz (considerado 'Temperado')
-    df_temperado = df_mes_atual[(df_mes_atual['Grupo'] == 'VIDRO') & (df_mes_atual['Loja'] == 'PORTAL VIDROS (MATRIZ INDÚSTRIA)')]
-    clientes_temperado = df_temperado['Matriz_Cliente'].nunique()
-
-    # Filtrar por grupo 'VIDRO' na filial (considerado 'Vidro Comum'), excluindo 'TÁBUA' do subgrupo
-    df_vidro_comum = df_mes_atual[(df_mes_atual['Grupo'] == 'VIDRO') & (df_mes_atual['Subgrupo'] != 'TÁBUA') & (df_mes_atual['Loja'] == 'PORTAL VIDROS (FILIAL)')]
-    clientes_vidro_comum = df_vidro_comum['Matriz_Cliente'].nunique()
-
-    return clientes_agregados, clientes_vidro_comum, clientes_temperado
-
 # #################### Card RECOMPRA
+JANELA_RECOMPRA = 6
+
 @app.callback(
     Output("recompra-ultimos-6-meses", "children"),
     [Input("vendedor-dropdown", "value")]
 )
+@cache_callbacks.memoizar
 def update_recompra_ultimos_6_meses(vendedor_selecionado):
-    global df  # Indica que df é uma variável global
-    end_date = pd.to_datetime("today").normalize()
-    start_date = (end_date - pd.DateOffset(months=6)).replace(day=1)
-
-    # Usa uma nova variável para o DataFrame filtrado
-    df_filtrado = df
-    if vendedor_selecionado and vendedor_selecionado != "TODOS OS VENDEDORES":
-        df_filtrado = df[df['Vendedor'] == vendedor_selecionado]
-
-    results = []
-
-    for month_offset in range(7):  # Inclui um mês extra para cálculo de positivação
-        month_start = start_date + pd.DateOffset(months=month_offset)
-        month_end = (month_start + pd.DateOffset(months=1)) - pd.Timedelta(days=1)
-        
-        # Filtra o DataFrame já ajustado com base no vendedor
-        df_month = df_filtrado[(df_filtrado['Data_Pedido'] >= month_start) & (df_filtrado['Data_Pedido'] <= month_end)]
-        unique_clients = df_month['Matriz_Cliente'].nunique()
-        results.append((month_start, unique_clients))
+    # Clientes por mês e positivação (em relação ao mês anterior) vêm prontos da coorte
+    resumo = atualizador.atual().coorte.resumo(vendedor_selecionado, pd.Timestamp.today(), quantidade=JANELA_RECOMPRA)
 
     children = []
   
@@ -445,11 +314,9 @@ def update_recompra_ultimos_6_meses(vendedor_selecionado):
     title = html.H5("RECOMPRA NOS ÚLTIMOS 6 MESES", className="card-title", style={"margin-bottom": "20px"})
     children.append(title)  # Adiciona o título à lista de children
     
-    for i in reversed(range(1, 7)):
-        current_month, current_count = results[i]
-        prev_month, prev_count = results[i - 1]
-
-        percent_change = ((current_count / prev_count) * 100) if prev_count > 0 else 0
+    for current_month, linha in resumo.iloc[::-1].iterrows():
+        current_count = int(linha['clientes'])
+        percent_change = linha['positivacao']
 
         month_col = dbc.Col([
             html.Div(current_month.strftime('%b').upper()[:3], className="month-name text-center"),
@@ -469,23 +336,18 @@ def update_recompra_ultimos_6_meses(vendedor_selecionado):
 
 # #################### Card tabela Cliente Sintético
 def preparar_dados_cliente_sintetico(vendedor_selecionado, df, ano_selecionado, visualizacao='total'):
-
-    df = df.drop_duplicates(subset='Id_Pedido', keep='first')
-
+    # df é a tabela de pedidos, que já traz 'Cliente_ID_Nome'
     if vendedor_selecionado != "":
         df = df[df['Vendedor'] == vendedor_selecionado]
 
-    # Garantir que 'Cliente_ID_Nome' esteja criado corretamente
-    df['Cliente_ID_Nome'] = df['Matriz_Cliente'].astype(str) + ' - ' + df['Cliente']
-
-    # Filtrar por ano
-    df_filtrado = df[df['Data_Pedido'].dt.year == ano_selecionado]
+    # df já vem recortado no ano selecionado (snap.intervalo)
+    df_filtrado = df
 
     # Agrupar e somar os valores
     if visualizacao == 'total':
-        df_agrupado = df_filtrado.groupby(['Cliente_ID_Nome', 'Cidade', df_filtrado['Data_Pedido'].dt.strftime('%m/%Y')])['TOTAL'].sum().unstack(fill_value=0)
+        df_agrupado = df_filtrado.groupby(['Cliente_ID_Nome', 'Cidade', df_filtrado['Data_Pedido'].dt.strftime('%m/%Y')], observed=True)['TOTAL'].sum().unstack(fill_value=0)
     else:
-        df_agrupado = df_filtrado.groupby(['Cliente_ID_Nome', 'Cidade', df_filtrado['Data_Pedido'].dt.strftime('%m/%Y')])['m2_pedido'].sum().unstack(fill_value=0)
+        df_agrupado = df_filtrado.groupby(['Cliente_ID_Nome', 'Cidade', df_filtrado['Data_Pedido'].dt.strftime('%m/%Y')], observed=True)['m2_pedido'].sum().unstack(fill_value=0)
 
     # Resetar índice para tornar as colunas 'Cliente_ID_Nome' e 'Cidade' parte do DataFrame
     df_agrupado.reset_index(inplace=True)
@@ -505,67 +367,74 @@ def preparar_dados_cliente_sintetico(vendedor_selecionado, df, ano_selecionado,
 
     return df_agrupado
 
-# Callback para atualizar a tabela "Cliente Sintético"
+def pivo_cliente_sintetico(vendedor_selecionado, ano_selecionado, visualizacao):
+    # A tabela dinâmica fica em cache por (vendedor, ano, visualização, versão do snapshot)
+    return cache_callbacks.obter(
+        'pivo_cliente_sintetico', (vendedor_selecionado, ano_selecionado, visualizacao),
+        lambda: preparar_dados_cliente_sintetico(
+            vendedor_selecionado,
+            atualizador.atual().intervalo('pedidos', f'{ano_selecionado}-01-01', f'{ano_selecionado}-12-31'),
+            ano_selecionado, visualizacao,
+        ),
+    )
+
+def buscar_cliente(df_cliente_sintetico, id_busca):
+    """Coloca os clientes que batem com a busca no topo. Devolve None se nenhum bater."""
+    if not id_busca:
+        return df_cliente_sintetico
+    mask = df_cliente_sintetico['Cliente'].str.contains(str(id_busca), case=False, na=False, regex=False)
+    if not mask.any():
+        return None
+    return pd.concat([df_cliente_sintetico[mask], df_cliente_sintetico[~mask]])
+
+# Callback para atualizar a tabela "Cliente Sintético" (paginação, ordenação e filtro no servidor)
 @app.callback(
-    Output("tabela-cliente-sintetico", "children"),
     [
-        Input("interval-update", "n_intervals"),
+        Output("tabela-cliente-sintetico", "data"),
+        Output("tabela-cliente-sintetico", "columns"),
+        Output("tabela-cliente-sintetico", "page_count"),
+        Output("tabela-cliente-sintetico", "page_current"),
+        Output("aviso-cliente-sintetico", "children"),
+    ],
+    [
         Input("filtro_ano", "value"),
         Input('id-busca-input', 'value'),
         Input('filtro_visualizacao', 'value'),
-        Input('vendedor-dropdown', 'value')
-    ] 
+        Input('vendedor-dropdown', 'value'),
+        Input("tabela-cliente-sintetico", "page_current"),
+        Input("tabela-cliente-sintetico", "page_size"),
+        Input("tabela-cliente-sintetico", "sort_by"),
+        Input("tabela-cliente-sintetico", "filter_query"),
+    ]
 )
-def update_tabela_cliente_sintetico(n_intervals, ano_selecionado, id_busca, visualizacao, vendedor_selecionado):
-    df_cliente_sintetico = preparar_dados_cliente_sintetico(vendedor_selecionado, df, ano_selecionado, visualizacao)
-
-    if id_busca:
-        id_busca_str = str(id_busca)
-        mask = df_cliente_sintetico['Cliente'].str.contains(id_busca_str, case=False, na=False)
-
-        if mask.any():
-            df_cliente_sintetico = pd.concat([df_cliente_sintetico[mask], df_cliente_sintetico[~mask]])
-        else:
-            return dbc.Alert(f'ID {id_busca} não encontrado.', color='danger')
-
-    # Format values based on visualization type
-    if visualizacao == 'metragem':
-        for mes in df_cliente_sintetico.columns[2:]:
-            df_cliente_sintetico[mes] = df_cliente_sintetico[mes].apply(lambda x: f"{x:.2f} m²" if x != 0 else x)
-    else:  # Faturamento
-        for mes in df_cliente_sintetico.columns[2:]:
-            df_cliente_sintetico[mes] = df_cliente_sintetico[mes].apply(lambda x: f"R$ {x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') if x != 0 else x)
-
+def update_tabela_cliente_sintetico(ano_selecionado, id_busca, visualizacao, vendedor_selecionado,
+                                    page_current, page_size, sort_by, filter_query):
+    df_cliente_sintetico = pivo_cliente_sintetico(vendedor_selecionado, ano_selecionado, visualizacao)
+    meses = list(df_cliente_sintetico.columns[2:])
+    # Os valores seguem numéricos; o DataTable formata em R$ ou m² no navegador
+    formato = FORMATO_M2 if visualizacao == 'metragem' else FORMATO_REAIS
     columns = [
         {'name': 'Cliente', 'id': 'Cliente'}, 
         {'name': 'Cidade', 'id': 'Cidade'}
     ] + [
-        {'name': mes, 'id': mes} 
-        for mes in df_cliente_sintetico.columns[2:]
+        {'name': mes, 'id': mes, 'type': 'numeric', 'format': formato} 
+        for mes in meses
     ]
 
-    tabela = dash_table.DataTable(
-        data=df_cliente_sintetico.to_dict('records'),
-        columns=columns,
-        style_table={'overflowX': 'auto'},
-        style_cell={
-            'textAlign': 'center',
-            'minWidth': '120px', 'width': '160px', 'maxWidth': '180px',
-            'overflow': 'hidden',
-            'textOverflow': 'ellipsis',
-        },
-        style_cell_conditional=[
-            {'if': {'column_id': 'Cliente'}, 'textAlign': 'left', 'minWidth': '160px', 'width': '280px', 'maxWidth': '300px'},
-            {'if': {'column_id': 'Cidade'}, 'textAlign': 'center', 'minWidth': '80px', 'width': '110px', 'maxWidth': '120px'},
-        ],
-        style_header={
-            'fontWeight': 'bold',
-            'textAlign': 'center'
-        },
-        page_size=20,
-    )
+    # Volta para a primeira página quando a consulta muda (só paginação e ordenação mantêm a página)
+    disparado = [t['prop_id'] for t in dash.callback_context.triggered]
+    if not all(prop in ('tabela-cliente-sintetico.page_current', 'tabela-cliente-sintetico.sort_by') for prop in disparado):
+        page_current = 0
+
+    df_cliente_sintetico = buscar_cliente(df_cliente_sintetico, id_busca)
+    if df_cliente_sintetico is None:
+        return [], columns, 1, 0, dbc.Alert(f'ID {id_busca} não encontrado.', color='danger')
 
-    return tabela
+    df_cliente_sintetico = aplicar_filtro(df_cliente_sintetico, filter_query)
+    df_cliente_sintetico = ordenar(df_cliente_sintetico, sort_by)
+    df_pagina, total_paginas, page_current = pagina(df_cliente_sintetico, page_current, page_size)
+
+    return df_pagina.to_dict('records'), columns, total_paginas, page_current, None
 
 def create_cliente_sintetico_card():
     return dbc.Card(
@@ -621,7 +490,33 @@ def create_cliente_sintetico_card():
                         ],
                         justify="start",  # Isso vai alinhar os itens à esquerda
                     ),
-                    html.Div(id="tabela-cliente-sintetico"),
+                    html.Div(id="aviso-cliente-sintetico"),
+                    dash_table.DataTable(
+                        id="tabela-cliente-sintetico",
+                        page_action='custom',
+                        page_current=0,
+                        page_size=20,
+                        sort_action='custom',
+                        sort_mode='single',
+                        sort_by=[],
+                        filter_action='custom',
+                        filter_query='',
+                        style_table={'overflowX': 'auto'},
+                        style_cell={
+                            'textAlign': 'center',
+                            'minWidth': '120px', 'width': '160px', 'maxWidth': '180px',
+                            'overflow': 'hidden',
+                            'textOverflow': 'ellipsis',
+                        },
+                        style_cell_conditional=[
+                            {'if': {'column_id': 'Cliente'}, 'textAlign': 'left', 'minWidth': '160px', 'width': '280px', 'maxWidth': '300px'},
+                            {'if': {'column_id': 'Cidade'}, 'textAlign': 'center', 'minWidth': '80px', 'width': '110px', 'maxWidth': '120px'},
+                        ],
+                        style_header={
+                            'fontWeight': 'bold',
+                            'textAlign': 'center'
+                        },
+                    ),
                 ]
             ),
         ],
@@ -643,109 +538,89 @@ def create_cliente_sintetico_card():
 )
 def exportar_para_excel(n_clicks, ano_selecionado, id_busca, visualizacao, vendedor_selecionado):
     if n_clicks > 0:
-        df_cliente_sintetico = preparar_dados_cliente_sintetico(vendedor_selecionado, df, ano_selecionado, visualizacao)
-
-        # Aplicar filtro de busca por ID se houver algum
-        if id_busca:
-            id_busca_str = str(id_busca)
-            mask = df_cliente_sintetico['Cliente'].str.contains(id_busca_str, case=False, na=False)
-            if mask.any():
-                # Criar DataFrame concatenado com resultados filtrados primeiro e não filtrados em seguida
-                df_cliente_sintetico = pd.concat([df_cliente_sintetico[mask], df_cliente_sintetico[~mask]])
-            else:
-                return dcc.send_bytes(b'', filename='nenhum_resultado.xlsx')  # Se não houver resultados, enviar um arquivo vazio ou com aviso.
-
-        # Preparar o DataFrame para exportação conforme o tipo de visualização
-        if visualizacao == 'metragem':
-            for mes in df_cliente_sintetico.columns[2:]:
-                df_cliente_sintetico[mes] = df_cliente_sintetico[mes].apply(lambda x: f"{x:.2f} m²" if x != 0 else x)
-        else:  # Faturamento
-            for mes in df_cliente_sintetico.columns[2:]:
-                df_cliente_sintetico[mes] = df_cliente_sintetico[mes].apply(lambda x: f"R$ {x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') if x != 0 else x)
-
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df_cliente_sintetico.to_excel(writer, index=False)
-        output.seek(0)
-
-        # Enviar o buffer para download
-        return dcc.send_bytes(output.getvalue(), filename=f"clientes_sinteticos_{ano_selecionado}.xlsx")
+        # O arquivo pronto fica em cache por (vendedor, ano, visualização, busca, versão do snapshot)
+        conteudo = cache_callbacks.obter(
+            'excel_cliente_sintetico', (vendedor_selecionado, ano_selecionado, visualizacao, id_busca),
+            lambda: montar_excel_cliente_sintetico(vendedor_selecionado, ano_selecionado, visualizacao, id_busca),
+        )
+        if conteudo is None:
+            return dcc.send_bytes(b'', filename='nenhum_resultado.xlsx')  # Se não houver resultados, enviar um arquivo vazio ou com aviso.
+
+        return dcc.send_bytes(conteudo, filename=f"clientes_sinteticos_{ano_selecionado}.xlsx")
 
     return None
 
-# Pegar o os dados para os cards
-valor_realizado = calc_realizado(df)
-vendedor_names = get_vendedor_names(df)  
-realizado_ate_ontem = calc_realizado_ate_ontem(df)
-valor_projetado = calc_projecao_geral(realizado_ate_ontem)
+def montar_excel_cliente_sintetico(vendedor_selecionado, ano_selecionado, visualizacao, id_busca):
+    df_cliente_sintetico = pivo_cliente_sintetico(vendedor_selecionado, ano_selecionado, visualizacao)
+
+    # Resultados da busca por ID primeiro, os demais em seguida
+    df_cliente_sintetico = buscar_cliente(df_cliente_sintetico, id_busca)
+    if df_cliente_sintetico is None:
+        return None
+
+    return gerar_excel_cliente_sintetico(df_cliente_sintetico, visualizacao)
+
 cliente_sintetico_card = create_cliente_sintetico_card()
 categorias_agregadas = ['ACESSÓRIOS', 'ALUMÍNIO', 'FERRAGEM', 'KIT PARA BOX PADRÃO', 'SILICONE']
 categoria_vidro = ['VIDRO']
 
-# Calcular a projeção pela meta geral
-projecao_pela_meta_geral = (valor_projetado / meta_geral_valor) * 100
-
-# Determinar o percentual de comissão com base na projeção pela meta geral
-if projecao_pela_meta_geral >= 100:
-    percentual_comissao = 1.3
-elif projecao_pela_meta_geral >= 95:
-    percentual_comissao = 1.2
-elif projecao_pela_meta_geral >= 90:
-    percentual_comissao = 1.1
-else:
-    percentual_comissao = 1.0
+def calcular_comissao(valor_projetado, meta_geral_valor):
+    # Calcular a projeção pela meta geral
+    projecao_pela_meta_geral = (valor_projetado / meta_geral_valor) * 100
+
+    # Determinar o percentual de comissão com base na projeção pela meta geral
+    if projecao_pela_meta_geral >= 100:
+        percentual_comissao = 1.3
+    elif projecao_pela_meta_geral >= 95:
+        percentual_comissao = 1.2
+    elif projecao_pela_meta_geral >= 90:
+        percentual_comissao = 1.1
+    else:
+        percentual_comissao = 1.0
 
-# Formatar o percentual de comissão com uma casa decimal
-percentual_comissao_str = f"{percentual_comissao:.1f}%"
-# Definição do tooltip
-tooltip_text = f"""
+    # Formatar o percentual de comissão com uma casa decimal
+    percentual_comissao_str = f"{percentual_comissao:.1f}%"
+    # Definição do tooltip
+    tooltip_text = f"""
 100% da Meta Geral: 1.3%
 95% da Meta Geral: 1.2%
 90% da Meta Geral: 1.1%
 Valor atual: {projecao_pela_meta_geral:.2f}%
 """
+    return percentual_comissao_str, tooltip_text
 
-# Preparando os dados
-df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y')
-hoje = datetime.now()
-meses = []
-
-# Calculando os limites dos últimos três meses
-for i in range(2, 5):  
-    inicio_mes = (hoje - pd.offsets.MonthBegin(n=i)).to_pydatetime()
-    fim_mes = (inicio_mes + pd.offsets.MonthEnd(n=0)).to_pydatetime()
-    meses.append((inicio_mes, fim_mes))
+def meses_grafico():
+    # Calculando os limites dos últimos três meses
+    hoje = datetime.now()
+    meses = []
+    for i in range(2, 5):  
+        inicio_mes = (hoje - pd.offsets.MonthBegin(n=i)).to_pydatetime()
+        fim_mes = (inicio_mes + pd.offsets.MonthEnd(n=0)).to_pydatetime()
+        meses.append((inicio_mes, fim_mes))
 
-meses.reverse()
+    meses.reverse()
+    return meses
 
 # Supondo que 'TODOS OS VENDEDORES' seja o valor padrão para incluir todos os vendedores
-vendedor_padrao = "TODOS OS VENDEDORES"
-
-# Calculando as somas para cada mês e categoria com o valor padrão para vendedor
-somas_agregadas = [calcular_somas(df, categorias_agregadas, inicio, fim, vendedor_padrao) for inicio, fim in meses]
-somas_vidro = [calcular_somas(df, categoria_vidro, inicio, fim, vendedor_padrao) for inicio, fim in meses]
+vendedor_padrao = TODOS_OS_VENDEDORES
 
 nomes_meses = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
                'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
 
-# Criando o gráfico de barras
-fig_pilha = go.Figure(data=[
-    go.Bar(name='Vidro', x=nomes_meses, y=somas_vidro, marker_color='#3FB9C6', width=0.4, textposition='auto'),
-    go.Bar(name='Agregadas', x=nomes_meses, y=somas_agregadas, marker_color='#8F9BBA', width=0.4, textposition='auto')
-])
-
-# Atualizando o layout do gráfico para empilhar
-fig_pilha.update_layout(barmode='stack', title='VENDAS POR CATEGORIA ÚLTIMOS 3 MESES')
-
 # Callback para atualizar o gráfico com base no vendedor selecionado
 @app.callback(
     Output('VENDAS POR CATEGORIA ÚTIMOS 3 MESES', 'figure'),
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_graph(vendedor_selecionado):
+    return criar_grafico_pilha(atualizador.atual().cubo, vendedor_selecionado)
+
+def criar_grafico_pilha(cubo, vendedor_selecionado):
     # Calculando as somas para o vendedor selecionado
-    somas_agregadas = [calcular_somas(df, categorias_agregadas, inicio, fim, vendedor_selecionado) for inicio, fim in meses]
-    somas_vidro = [calcular_somas(df, categoria_vidro, inicio, fim, vendedor_selecionado) for inicio, fim in meses]
+    meses = meses_grafico()
+    somas_agregadas = [calcular_somas(cubo, categorias_agregadas, inicio, vendedor_selecionado) for inicio, fim in meses]
+    somas_vidro = [calcular_somas(cubo, categoria_vidro, inicio, vendedor_selecionado) for inicio, fim in meses]
     # Criando o gráfico atualizado
     fig_pilha = go.Figure(data=[
     go.Bar(
@@ -771,68 +646,56 @@ def update_graph(vendedor_selecionado):
         barmode='stack',
         title='VENDAS POR CATEGORIA ÚLTIMOS 3 MESES',
         xaxis=dict(title='Mês'),
-        yaxis=dict(title='Vendas'),
+        yaxis=dict(title='Vendas', tickprefix='R$ ', tickformat=',.0f'),
+        separators=SEPARADORES_PLOTLY,
         margin=dict(l=20, r=20, t=40, b=20)  # Ajusta as margens se necessário para evitar cortes de texto
     )
+    fig_pilha.update_traces(hovertemplate='%{x}<br>R$ %{y:,.2f}<extra>%{fullData.name}</extra>')
 
     return fig_pilha
 
-df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y')
 ##################### Card tabela faturamento vidro 3 meses
-def calcular_somas_grupos(df, subcategoria):
-    # Obtém o primeiro e o último dia do mês atual
+def inicio_ultimos_3_meses():
+    # Primeiro dia de cada um dos três meses anteriores, do mais antigo para o mais recente
     hoje = pd.to_datetime('today').normalize()
-    primeiro_dia_mes = hoje.replace(day=1)
-    ultimo_dia_mes = primeiro_dia_mes + pd.offsets.MonthEnd(1)
-    df_filtrado = df[(df['Data_Pedido'] >= primeiro_dia_mes) & 
-                     (df['Data_Pedido'] <= ultimo_dia_mes) & 
-                     (df['Tipo_Produto'] == subcategoria)]
-
-    # Aplica o desconto antes de somar
-    df_filtrado['total_produto_com_desconto'] = df_filtrado.apply(apply_discount, axis=1)
+    return [(hoje - pd.offsets.MonthBegin(n=i+1)).replace(day=1) for i in range(3, 0, -1)]
 
-    # Retorna a soma dos totais com desconto
-    return df_filtrado['total_produto_com_desconto'].sum()
+def calcular_somas_grupos(cubo, vendedor_selecionado, subcategoria):
+    # Faturamento com desconto da subcategoria no mês atual
+    hoje = pd.to_datetime('today').normalize()
+    return cubo.valor(vendedor_selecionado, hoje, tipo=subcategoria)
 
 def calcular_somas_grupos_frete(df):
-    df['PERIODO'] = pd.to_datetime(df['PERIODO'])
     # Obtém o primeiro e o último dia do mês atual
     hoje = pd.to_datetime('today').normalize()
     primeiro_dia_mes = hoje.replace(day=1)
     ultimo_dia_mes = primeiro_dia_mes + pd.offsets.MonthEnd(1)
-    df_filtrado = df[(df['PERIODO'] >= primeiro_dia_mes) & 
-                     (df['PERIODO'] <= ultimo_dia_mes)]
-    return df_filtrado['Frete'].sum()
+    return fatia(df, 'PERIODO', primeiro_dia_mes, ultimo_dia_mes)['Frete'].sum()
 
 def calcular_somas_grupos_benef(df):
-    df['PERIODO'] = pd.to_datetime(df['PERIODO'])
     # Obtém o primeiro e o último dia do mês atual
     hoje = pd.to_datetime('today').normalize()
     primeiro_dia_mes = hoje.replace(day=1)
     ultimo_dia_mes = primeiro_dia_mes + pd.offsets.MonthEnd(1)
-    df_filtrado = df[(df['PERIODO'] >= primeiro_dia_mes) & 
-                     (df['PERIODO'] <= ultimo_dia_mes)]
-    return df_filtrado['FATURAMENTO'].sum()
+    return fatia(df, 'PERIODO', primeiro_dia_mes, ultimo_dia_mes)['FATURAMENTO'].sum()
 
 @app.callback(
     Output('faturamento_vidro_card_container', 'children'),
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_faturamento_vidro_card(vendedor_selecionado):
     if not vendedor_selecionado:
         # Se por algum motivo o vendedor_selecionado for None, use o valor padrão
         vendedor_selecionado = "TODOS OS VENDEDORES"
     
-    return create_faturamento_vidro_card(df, vendedor_selecionado)
+    snap = atualizador.atual()
+    return create_faturamento_vidro_card(snap, vendedor_selecionado)
 
 icone_svg = """![icone](assets/img/topmes.svg)"""
 
-def format_currency(value):
-    """Formata valores como moeda brasileira."""
-    return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
 # Função para criar o card da tabela
-def create_faturamento_vidro_card(df, vendedor_selecionado):
+def create_faturamento_vidro_card(snap, vendedor_selecionado):
     return dbc.Card([
         dbc.CardHeader(
                 html.H3("FATURAMENTO DOS ÚLTIMOS 3 MESES VIDRO"),
@@ -840,12 +703,12 @@ def create_faturamento_vidro_card(df, vendedor_selecionado):
             ),
         dbc.CardBody(
             html.Div(
-                create_faturamento_vidro_table(df, vendedor_selecionado)
+                create_faturamento_vidro_table(snap.cubo, vendedor_selecionado)
             )
         ),
     ])
 
-def create_faturamento_vidro_table(df, vendedor_selecionado):
+def create_faturamento_vidro_table(cubo, vendedor_selecionado):
     subcategorias = {
         'TEMPERADO ENGENHARIA': ['ENGENHARIA TEMPERADO', 'BOX ENGENHARIA'],
         'TEMPERADO PRONTA ENTREGA': ['BOX PADRÃO', 'JANELA PADRÃO', 'PORTA PIVOTANTE'],
@@ -853,12 +716,7 @@ def create_faturamento_vidro_table(df, vendedor_selecionado):
         'COMUM CHAPARIA': ['CHAPARIA ESPELHO', 'CHAPARIA FANTASIA', 'CHAPARIA FLOAT', 'CHAPARIA LAMINADO', 'CHAPARIA REFLETIVO BRONZE', 'CHAPARIA SERIGRAFADO'],
     }
 
-    # Filtrar por vendedor, se não for "TODOS OS VENDEDORES"
-    if vendedor_selecionado != "TODOS OS VENDEDORES":
-        df = df[df['Vendedor'] == vendedor_selecionado]
-
-    hoje = pd.to_datetime('today').normalize()
-    start_dates = [(hoje - pd.offsets.MonthBegin(n=i+1)).replace(day=1) for i in range(3, 0, -1)]
+    start_dates = inicio_ultimos_3_meses()
 
     totais = {'Subcategoria': 'Totais'}
     total_values = {}
@@ -875,11 +733,8 @@ def create_faturamento_vidro_table(df, vendedor_selecionado):
             tipo_row = {'Subcategoria': f"· {tipo}"}
             faturamento_mes = {}
             for start_date in start_dates:
-                fim_mes = start_date + pd.offsets.MonthEnd(1)
-                df_filtrado = df[(df['Data_Pedido'] >= start_date) & (df['Data_Pedido'] <= fim_mes) & (df['Tipo_Produto'] == tipo)]
-                df_filtrado['Faturamento_com_Desconto'] = df_filtrado.apply(apply_discount, axis=1)
-                faturamento = df_filtrado['Faturamento_com_Desconto'].sum()
-                tipo_row[start_date.strftime('%b/%Y')] = format_currency(faturamento)
+                faturamento = cubo.valor(vendedor_selecionado, start_date, tipo=tipo)
+                tipo_row[start_date.strftime('%b/%Y')] = faturamento
                 faturamento_mes[start_date.strftime('%b/%Y')] = faturamento
                 grupo_somas[start_date.strftime('%b/%Y')] += faturamento
                 total_values[start_date.strftime('%b/%Y')] += faturamento
@@ -893,7 +748,7 @@ def create_faturamento_vidro_table(df, vendedor_selecionado):
         
         # Adiciona faturamento total e TOP MÊS ao grupo
         for mes, soma in grupo_somas.items():
-            grupo_row[mes] = f"R$ {soma:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+            grupo_row[mes] = soma
         top_mes_grupo_faturamento = max(grupo_somas.values())
         grupo_row['TOP MÊS'] = [mes for mes, faturamento in grupo_somas.items() if faturamento == top_mes_grupo_faturamento][0]
         data.insert(len(data) - len(tipos), grupo_row)
@@ -902,11 +757,8 @@ def create_faturamento_vidro_table(df, vendedor_selecionado):
     row_outros_vidros = {'Subcategoria': 'OUTROS VIDROS'}
     soma_outros_vidros = {}
     for start_date in start_dates:
-        fim_mes = start_date + pd.offsets.MonthEnd(1)
-        df_filtrado = df[(df['Data_Pedido'] >= start_date) & (df['Data_Pedido'] <= fim_mes) & (~df['Tipo_Produto'].isin(sum(subcategorias.values(), []))) & (df['Grupo'] == 'VIDRO')]
-        df_filtrado['Faturamento_com_Desconto_'] = df_filtrado.apply(apply_discount, axis=1)
-        soma_grupo = df_filtrado['Faturamento_com_Desconto_'].sum()
-        row_outros_vidros[start_date.strftime('%b/%Y')] = f"R$ {soma_grupo:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        soma_grupo = cubo.soma_outros(vendedor_selecionado, [start_date], 'VIDRO', sum(subcategorias.values(), []))
+        row_outros_vidros[start_date.strftime('%b/%Y')] = soma_grupo
         soma_outros_vidros[start_date.strftime('%b/%Y')] = soma_grupo
         total_values[start_date.strftime('%b/%Y')] += soma_grupo
     
@@ -918,13 +770,13 @@ def create_faturamento_vidro_table(df, vendedor_selecionado):
     top_mes_totais = max(total_values, key=total_values.get)
     totais['TOP MÊS'] = top_mes_totais
     for mes, total in total_values.items():
-        totais[mes] = format_currency(total)
+        totais[mes] = total
     data.insert(0, totais)
     
     columns = [
         {"name": "Subcategoria", "id": "Subcategoria", "type": "text"}
     ] + [
-        {"name": mes.strftime('%b/%Y'), "id": mes.strftime('%b/%Y'), "type": "numeric", "format": Format(symbol=Symbol.yes, symbol_suffix='R$ ', scheme=Scheme.fixed)}
+        {"name": mes.strftime('%b/%Y'), "id": mes.strftime('%b/%Y'), "type": "numeric", "format": FORMATO_REAIS}
         for mes in start_dates
     ] + [
         {"name": "TOP MÊS", "id": "TOP MÊS", "type": "text","presentation": "markdown"}
@@ -984,54 +836,23 @@ def create_faturamento_vidro_table(df, vendedor_selecionado):
         }])
 ])
 
-def calcular_volume_por_categoria(df, categoria):
-    # Obtém o primeiro e o último dia do mês atual
+def calcular_volume_por_categoria(cubo, vendedor_selecionado, categoria):
+    # Soma da coluna 'm2' da subcategoria no mês atual
     hoje = pd.to_datetime('today').normalize()
-    primeiro_dia_mes = hoje.replace(day=1)
-    ultimo_dia_mes = primeiro_dia_mes + pd.offsets.MonthEnd(1)
-
-    df_filtrado = df[(df['Data_Pedido'] >= primeiro_dia_mes) & 
-                     (df['Data_Pedido'] <= ultimo_dia_mes) & 
-                     (df['Tipo_Produto'] == categoria)]
-
-    # Calcula e retorna a soma da coluna 'm2' para as linhas filtradas
-    return df_filtrado['m2'].sum()
+    return cubo.valor(vendedor_selecionado, hoje, tipo=categoria, medida='m2')
 
 def calc_projecao_categoria(realizado):
-    hoje = pd.to_datetime('today')
-    ontem = hoje - pd.offsets.BDay(1)  # Calcula o dia útil anterior
-    primeiro_dia_mes = hoje.replace(day=1)
-    ultimo_dia_mes = hoje + pd.offsets.MonthEnd(1)
-    
-    dias_uteis_ate_ontem = pd.bdate_range(start=primeiro_dia_mes, end=ontem).size
-    total_dias_uteis_mes = pd.bdate_range(start=primeiro_dia_mes, end=ultimo_dia_mes).size
-
-    if dias_uteis_ate_ontem > 0:
-        projecao = (realizado / dias_uteis_ate_ontem) * total_dias_uteis_mes
-        return projecao
-    return 0
-
-def calcular_media_faturamento_ultimos_3_meses(df, subcategorias):
-    def calcular_somas_grupos_(df, subcategoria, inicio_mes, fim_mes):
-        df_filtrado = df[(df['Data_Pedido'] >= inicio_mes) & (df['Data_Pedido'] <= fim_mes) & (df['Tipo_Produto'].isin([subcategoria]))]
-        df_filtrado['total_produto_com_desconto'] = df_filtrado.apply(apply_discount, axis=1)
-        return df_filtrado['total_produto_com_desconto'].sum()
-    
+    # Aceita um valor ou um vetor de valores; os dias úteis vêm do calendário pré-calculado
+    return calendario.projetar(realizado, pd.to_datetime('today').normalize())
+
+def calcular_media_faturamento_ultimos_3_meses(cubo, vendedor_selecionado, subcategorias):
     # Calcula a média do faturamento dos últimos 3 meses
-    hoje = pd.to_datetime('today').normalize()
-    start_dates = [(hoje - pd.offsets.MonthBegin(n=i+1)).replace(day=1) for i in range(3, 0, -1)]
-    faturamento_total = sum(
-        calcular_somas_grupos_(df, tipo, start_date, start_date + pd.offsets.MonthEnd(1))
-        for start_date in start_dates
-        for tipo in subcategorias
-    ) 
+    faturamento_total = cubo.soma(vendedor_selecionado, inicio_ultimos_3_meses(), tipos=subcategorias)
     return (faturamento_total / 3)
 
 def calcular_media_faturamento_ultimos_3_meses_frete(df):
-    df['PERIODO'] = pd.to_datetime(df['PERIODO'])
     def calcular_somas_grupos_(df, inicio_mes, fim_mes):
-        df_filtrado = df[(df['PERIODO'] >= inicio_mes) & (df['PERIODO'] <= fim_mes)]
-        return df_filtrado['Frete'].sum()
+        return fatia(df, 'PERIODO', inicio_mes, fim_mes)['Frete'].sum()
     
     # Calcula a média do faturamento dos últimos 3 meses
     hoje = pd.to_datetime('today').normalize()
@@ -1043,10 +864,8 @@ def calcular_media_faturamento_ultimos_3_meses_frete(df):
     return (faturamento_total / 3)
 
 def calcular_media_faturamento_ultimos_3_meses_benef(df):
-    df['PERIODO'] = pd.to_datetime(df['PERIODO'])
     def calcular_somas_grupos_(df, inicio_mes, fim_mes):
-        df_filtrado = df[(df['PERIODO'] >= inicio_mes) & (df['PERIODO'] <= fim_mes)]
-        return df_filtrado['FATURAMENTO'].sum()
+        return fatia(df, 'PERIODO', inicio_mes, fim_mes)['FATURAMENTO'].sum()
 
     # Calcula a média do faturamento dos últimos 3 meses
     hoje = pd.to_datetime('today').normalize()
@@ -1061,13 +880,15 @@ def calcular_media_faturamento_ultimos_3_meses_benef(df):
     Output('categoria_vidro_table_container', 'children'),
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_categoria_vidro_table(vendedor_selecionado):
     if not vendedor_selecionado:
         vendedor_selecionado = "TODOS OS VENDEDORES"
 
-    return create_categoria_vidro_card(df, vendedor_selecionado)
+    snap = atualizador.atual()
+    return create_categoria_vidro_card(snap, vendedor_selecionado)
 
-def create_categoria_vidro_card(df, vendedor_selecionado):
+def create_categoria_vidro_card(snap, vendedor_selecionado):
     return dbc.Card(
         [
             dbc.CardHeader(
@@ -1075,11 +896,11 @@ def create_categoria_vidro_card(df, vendedor_selecionado):
                 className="card-header-custom",
             ),
             dbc.CardBody(
-                create_categoria_vidro_table(df, vendedor_selecionado)
+                create_categoria_vidro_table(snap.cubo, vendedor_selecionado)
                 ),
         ])
 
-def create_categoria_vidro_table(df, vendedor_selecionado):
+def create_categoria_vidro_table(cubo, vendedor_selecionado):
     subcategorias = {
         'TEMPERADO ENGENHARIA': ['ENGENHARIA TEMPERADO', 'BOX ENGENHARIA'],
         'TEMPERADO PRONTA ENTREGA': ['BOX PADRÃO', 'JANELA PADRÃO', 'PORTA PIVOTANTE'],
@@ -1087,9 +908,6 @@ def create_categoria_vidro_table(df, vendedor_selecionado):
         'COMUM CHAPARIA': ['CHAPARIA ESPELHO', 'CHAPARIA FANTASIA', 'CHAPARIA FLOAT', 'CHAPARIA LAMINADO', 'CHAPARIA REFLETIVO BRONZE', 'CHAPARIA SERIGRAFADO'],
     }
 
-    if vendedor_selecionado != "TODOS OS VENDEDORES":
-        df = df[df['Vendedor'] == vendedor_selecionado]
-
     totals = {'Subcategoria': 'Totais', 'Volume': 0, 'Realizado': 0, 'Projeção': 0, 'Meta': 0}
     data = []
 
@@ -1099,10 +917,10 @@ def create_categoria_vidro_table(df, vendedor_selecionado):
         grupo_total_meta = 0
 
         for tipo in tipos:
-            volume = calcular_volume_por_categoria(df, tipo)
-            realizado = calcular_somas_grupos(df, tipo)
+            volume = calcular_volume_por_categoria(cubo, vendedor_selecionado, tipo)
+            realizado = calcular_somas_grupos(cubo, vendedor_selecionado, tipo)
             projecao = calc_projecao_categoria(realizado)
-            meta = calcular_media_faturamento_ultimos_3_meses(df, [tipo])
+            meta = calcular_media_faturamento_ultimos_3_meses(cubo, vendedor_selecionado, [tipo])
 
             # Atualiza somatórios do grupo
             grupo_data['Volume'] += volume
@@ -1115,10 +933,10 @@ def create_categoria_vidro_table(df, vendedor_selecionado):
             # Insere dados da subcategoria
             data.append({
                 'Subcategoria': f"· {tipo}",
-                'Volume': f"{volume:.2f} m²",
-                'Realizado': "R$ {:,.2f}".format(realizado).replace(',', 'X').replace('.', ',').replace('X', '.'),
-                'Projeção': "R$ {:,.2f}".format(projecao).replace(',', 'X').replace('.', ',').replace('X', '.'),
-                'Meta': "R$ {:,.2f}".format(meta).replace(',', 'X').replace('.', ',').replace('X', '.'),
+                'Volume': volume,
+                'Realizado': realizado,
+                'Projeção': projecao,
+                'Meta': meta,
                 'Projeção vs Meta': f"{(projecao / meta * 100) if meta else 0:.2f}%",
             })
         # Acumula totais agregados
@@ -1130,36 +948,26 @@ def create_categoria_vidro_table(df, vendedor_selecionado):
         # Calcula e adiciona projeção vs meta para o grupo
         grupo_data['Projeção vs Meta'] = f"{(grupo_data['Projeção'] / grupo_data['Meta'] * 100) if grupo_data['Meta'] else 0:.2f}%"
 
-        # Formata valores para o grupo
-        grupo_data['Volume'] = f"{grupo_data['Volume']:.2f} m²"
-        grupo_data['Realizado'] = "R$ {:,.2f}".format(grupo_data['Realizado']).replace(',', 'X').replace('.', ',').replace('X', '.')
-        grupo_data['Projeção'] = "R$ {:,.2f}".format(grupo_data['Projeção']).replace(',', 'X').replace('.', ',').replace('X', '.')
-        grupo_data['Meta'] = "R$ {:,.2f}".format(grupo_data['Meta']).replace(',', 'X').replace('.', ',').replace('X', '.')
-
         data.insert(len(data) - len(tipos), grupo_data)
-    df_outros_vidros = df[~df['Tipo_Produto'].isin(sum(subcategorias.values(), [])) & (df['Grupo'] == 'VIDRO')]
- 
-    volume_outros = calcular_volume_por_categoria(df_outros_vidros, "OUTROS VIDROS")
-    realizado_outros = calcular_somas_grupos(df_outros_vidros, "OUTROS VIDROS")
+    # "OUTROS VIDROS" = itens do grupo VIDRO com o tipo "OUTROS VIDROS" (como no cálculo original)
+    mes_atual = pd.to_datetime('today').normalize()
+    volume_outros = cubo.valor(vendedor_selecionado, mes_atual, tipo="OUTROS VIDROS", grupo='VIDRO', medida='m2')
+    realizado_outros = cubo.valor(vendedor_selecionado, mes_atual, tipo="OUTROS VIDROS", grupo='VIDRO')
     projecao_outros = calc_projecao_categoria(realizado_outros)
-    meta_outros = calcular_media_faturamento_ultimos_3_meses(df_outros_vidros, ["OUTROS VIDROS"])
+    meta_outros = sum(cubo.valor(vendedor_selecionado, inicio, tipo="OUTROS VIDROS", grupo='VIDRO')
+                      for inicio in inicio_ultimos_3_meses()) / 3
     projecao_vs_meta_outros = f"{(projecao_outros / meta_outros) * 100:.2f}%" if meta_outros > 0 else "0.00%"
 
     # Adicionando "OUTROS VIDROS" aos dados
     data.append({
         'Subcategoria': 'OUTROS VIDROS',
-        'Volume': f"{volume_outros:,.2f} m²",
-        'Realizado': "R$ {:,.2f}".format(realizado_outros).replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Projeção': "R$ {:,.2f}".format(projecao_outros).replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Meta': "R$ {:,.2f}".format(meta_outros).replace(',', 'X').replace('.', ',').replace('X', '.'),
+        'Volume': volume_outros,
+        'Realizado': realizado_outros,
+        'Projeção': projecao_outros,
+        'Meta': meta_outros,
         'Projeção vs Meta': projecao_vs_meta_outros
     })
 
-    for key in ['Realizado', 'Projeção', 'Meta']:
-        totals[key] = "R$ {:,.2f}".format(totals[key]).replace(',', 'X').replace('.', ',').replace('X', '.')
-    for key in ['Volume']:
-        totals[key] = "{:,.2f} m²".format(totals[key]).replace(',', 'X').replace('.', ',').replace('X', '.')
-
     data.insert(0, totals)
 
     style_cell = {
@@ -1176,13 +984,13 @@ def create_categoria_vidro_table(df, vendedor_selecionado):
     columns = [
         {'name': 'Subcategoria', 'id': 'Subcategoria'}
     ] + [
-        {'name': 'Volume', 'id': 'Volume'},
+        {'name': 'Volume', 'id': 'Volume', 'type': 'numeric', 'format': FORMATO_M2},
     ] + [
-        {'name': 'Realizado', 'id': 'Realizado'},
+        {'name': 'Realizado', 'id': 'Realizado', 'type': 'numeric', 'format': FORMATO_REAIS},
     ] + [
-        {'name': 'Projeção', 'id': 'Projeção'},
+        {'name': 'Projeção', 'id': 'Projeção', 'type': 'numeric', 'format': FORMATO_REAIS},
     ] + [
-        {'name': 'Meta', 'id': 'Meta', 'type': 'numeric', 'format': Format(symbol=Symbol.yes, symbol_suffix='R$ ', scheme=Scheme.fixed)},
+        {'name': 'Meta', 'id': 'Meta', 'type': 'numeric', 'format': FORMATO_REAIS},
     ] + [
         {'name': 'Projeção vs Meta', 'id': 'Projeção vs Meta'}
     ]
@@ -1235,38 +1043,32 @@ def create_categoria_vidro_table(df, vendedor_selecionado):
     Output('faturamento_agregados_3m_container', 'children'),
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_faturamento_agregados_table(vendedor_selecionado):
     if not vendedor_selecionado:
         vendedor_selecionado = "TODOS OS VENDEDORES"
 
-    return create_categoria_vidro_agregados_card(df, vendedor_selecionado)
+    snap = atualizador.atual()
+    return create_categoria_vidro_agregados_card(snap, vendedor_selecionado)
 
-def create_categoria_vidro_agregados_card(df, vendedor_selecionado):
+def create_categoria_vidro_agregados_card(snap, vendedor_selecionado):
     return dbc.Card([
             dbc.CardHeader(
                 html.H3("FATURAMENTO DOS ÚLTIMOS 3 MESES AGREGADOS"),
                 className="card-header-custom",
             ),
             dbc.CardBody(
-                create_faturamento_agregados_table(df, vendedor_selecionado),
+                create_faturamento_agregados_table(snap, vendedor_selecionado),
               style={'margin-bottom': '0px', 'padding-bottom': '0px'}),
             ])
 
-def apply_discount_benef(row):
-    if row['Tipo_Desconto'] == 'Porcentagem':
-        return max(0, row['valor_beneficiamento'] - (row['valor_beneficiamento'] * row['Desconto'] / 100))
-    elif row['Tipo_Desconto'] == 'Reais':
-        valor_frete = row.get('Valor_Frete', 0)
-        return ((row['valor_beneficiamento'] * row['Desconto']) / ((row['TOTAL'] - valor_frete) + row['Desconto']) - row['valor_beneficiamento']) * (-1)
-    return row['valor_beneficiamento'] 
-
-def create_faturamento_agregados_table(df, vendedor_selecionado):
-    df_frete = fetch_data_frete()
-    df_benef = fetch_data_benef()
-    df_frete['Vendedor'] = df_frete['Vendedor'].str.split().str.get(0)
-    df_benef['Vendedor'] = df_benef['Vendedor'].str.split().str.get(0)
-    df_madeira = df_benef[df_benef['NOME_BENEF'] == 'Caixa de Madeira']
-    df_benef = df_benef[df_benef['NOME_BENEF'] != 'Caixa de Madeira']
+def create_faturamento_agregados_table(snap, vendedor_selecionado):
+    cubo = snap.cubo
+    # Frete e beneficiamento já filtrados pelo vendedor
+    visao = visao_vendedor(vendedor_selecionado)
+    df_frete = visao.frete
+    df_benef = visao.benef
+    df_madeira = visao.madeira
 
     subcategorias = {
         'KIT\'S PARA BOX': ['KIT BOX COMPLETO AL', 'KIT BOX COMPLETO IDEIA GLASS', 'KIT BOX COMPLETO IMPORTADO', 'KIT BOX COMPLETO PORTAL', 'KIT BOX COMPLETO PORTAL - AVARIA'],
@@ -1277,21 +1079,10 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
         'SERVIÇOS': ['MÃO DE OBRA'],
     }
     
-    # Filtrando dados conforme o vendedor selecionado
-    if vendedor_selecionado != "TODOS OS VENDEDORES":
-        df = df[df['Vendedor'] == vendedor_selecionado]
-        df_frete = df_frete[df_frete['Vendedor'] == vendedor_selecionado]
-        df_benef = df_benef[df_benef['Vendedor'] == vendedor_selecionado]
-        df_madeira = df_madeira[df_madeira['Vendedor'] == vendedor_selecionado]
 
-    # Convertendo datas
-    df_frete['PERIODO'] = pd.to_datetime(df_frete['PERIODO'])
-    df_benef['PERIODO'] = pd.to_datetime(df_benef['PERIODO'])
-    df_madeira['PERIODO'] = pd.to_datetime(df_madeira['PERIODO'])
 
     # Definindo as datas de início de cada mês para os últimos 3 meses
-    hoje = pd.to_datetime('today').normalize()
-    start_dates = [(hoje - pd.offsets.MonthBegin(n=i+1)).replace(day=1) for i in range(3, 0, -1)]
+    start_dates = inicio_ultimos_3_meses()
 
     totais = {'Subcategoria': 'Totais'}
     total_values = {}
@@ -1308,15 +1099,8 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
             faturamento_mes = {}
             
             for start_date in start_dates:
-                fim_mes = start_date + pd.offsets.MonthEnd(1)
-                df_tipo_filtrado = df[
-                    (df['Data_Pedido'] >= start_date) &
-                    (df['Data_Pedido'] <= fim_mes) &
-                    (df['Tipo_Produto'] == tipo)
-                ]
-                df_tipo_filtrado['Faturamento_com_Desconto'] = df_tipo_filtrado.apply(apply_discount, axis=1)
-                faturamento = df_tipo_filtrado['Faturamento_com_Desconto'].sum()
-                tipo_row[start_date.strftime('%b/%Y')] = format_currency(faturamento)
+                faturamento = cubo.valor(vendedor_selecionado, start_date, tipo=tipo)
+                tipo_row[start_date.strftime('%b/%Y')] = faturamento
                 faturamento_mes[start_date.strftime('%b/%Y')] = faturamento
                 grupo_somas[start_date.strftime('%b/%Y')] += faturamento
                 total_values[start_date.strftime('%b/%Y')] += faturamento
@@ -1327,7 +1111,7 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
             data.append(tipo_row)
 
         for mes, soma in grupo_somas.items():
-            grupo_row[mes] = f"R$ {soma:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+            grupo_row[mes] = soma
         top_mes_grupo_faturamento = max(grupo_somas.values())
         grupo_row['TOP MÊS'] = [mes for mes, faturamento in grupo_somas.items() if faturamento == top_mes_grupo_faturamento][0]
 
@@ -1335,12 +1119,12 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
     frete_somas = {}
     for start_date in start_dates:
         fim_mes = start_date + pd.offsets.MonthEnd(1)
-        df_frete_filtrado = df_frete[(df_frete['PERIODO'] >= start_date) & (df_frete['PERIODO'] <= fim_mes)]
+        df_frete_filtrado = fatia(df_frete, 'PERIODO', start_date, fim_mes)
         frete_somas[start_date.strftime('%b/%Y')] = df_frete_filtrado['Frete'].sum()
         
     frete_row = {'Subcategoria': '· FRETE'}
     for mes, soma in frete_somas.items():
-        frete_row[mes] = f"R$ {soma:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        frete_row[mes] = soma
     top_mes_frete = max(frete_somas, key=frete_somas.get)
     frete_row['TOP MÊS'] = top_mes_frete
     data.append(frete_row)
@@ -1349,12 +1133,12 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
     beneficiamento_somas = {}
     for start_date in start_dates:
         fim_mes = start_date + pd.offsets.MonthEnd(1)
-        df_filtrado = df_benef[(df_benef['PERIODO'] >= start_date) & (df_benef['PERIODO'] <= fim_mes)]
+        df_filtrado = fatia(df_benef, 'PERIODO', start_date, fim_mes)
         beneficiamento_somas[start_date.strftime('%b/%Y')] = df_filtrado['FATURAMENTO'].sum()
 
     beneficiamento_row = {'Subcategoria': '· BENEFICIAMENTO'}
     for mes, soma in beneficiamento_somas.items():
-        beneficiamento_row[mes] = f"R$ {soma:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        beneficiamento_row[mes] = soma
     top_mes_beneficiamento = max(beneficiamento_somas, key=beneficiamento_somas.get)
     beneficiamento_row['TOP MÊS'] = top_mes_beneficiamento
     data.append(beneficiamento_row)
@@ -1363,12 +1147,12 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
     madeira_somas = {}
     for start_date in start_dates:
         fim_mes = start_date + pd.offsets.MonthEnd(1)
-        df_filtrado_madeira = df_madeira[(df_madeira['PERIODO'] >= start_date) & (df_madeira['PERIODO'] <= fim_mes)]
+        df_filtrado_madeira = fatia(df_madeira, 'PERIODO', start_date, fim_mes)
         madeira_somas[start_date.strftime('%b/%Y')] = df_filtrado_madeira['FATURAMENTO'].sum()
 
     madeira_row = {'Subcategoria': '· CAIXA DE MADEIRA'}
     for mes, soma in madeira_somas.items():
-        madeira_row[mes] = f"R$ {soma:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        madeira_row[mes] = soma
     top_madeira = max(madeira_somas, key=madeira_somas.get)
     madeira_row['TOP MÊS'] = top_madeira
     data.append(madeira_row)
@@ -1376,13 +1160,13 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
     top_mes_totais = max(total_values, key=total_values.get)
     totais['TOP MÊS'] = top_mes_totais
     for mes, total in total_values.items():
-        totais[mes] = format_currency(total)
+        totais[mes] = total
     data.insert(0, totais)
     
     columns = [
         {"name": "Subcategoria", "id": "Subcategoria", "type": "text"}
     ] + [
-        {"name": mes.strftime('%b/%Y'), "id": mes.strftime('%b/%Y'), "type": "numeric", "format": Format(symbol=Symbol.yes, symbol_suffix='R$ ', scheme=Scheme.fixed)}
+        {"name": mes.strftime('%b/%Y'), "id": mes.strftime('%b/%Y'), "type": "numeric", "format": FORMATO_REAIS}
         for mes in start_dates
     ] + [
         {"name": "TOP MÊS", "id": "TOP MÊS", "type": "text", "presentation": "markdown"}
@@ -1453,13 +1237,15 @@ def create_faturamento_agregados_table(df, vendedor_selecionado):
     Output('categoria_agregados_table_container', 'children'),
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_categoria_agregados_table(vendedor_selecionado):
     if not vendedor_selecionado:
         vendedor_selecionado = "TODOS OS VENDEDORES"
   
-    return create_categorias_agregados_card(df, vendedor_selecionado)
+    snap = atualizador.atual()
+    return create_categorias_agregados_card(snap, vendedor_selecionado)
 
-def create_categorias_agregados_card(df, vendedor_selecionado):
+def create_categorias_agregados_card(snap, vendedor_selecionado):
     return dbc.Card(
         [
             dbc.CardHeader(
@@ -1467,13 +1253,12 @@ def create_categorias_agregados_card(df, vendedor_selecionado):
                 className="card-header-custom",
             ),
             dbc.CardBody(
-                create_categoria_agregadas_table(df, vendedor_selecionado),
+                create_categoria_agregadas_table(snap, vendedor_selecionado),
                style={'margin-bottom': '0px', 'padding-bottom': '0px'}),
         ])
 
 def calcular_faturamento_frete(df_frete):
     # Filtra os dados dos últimos 3 meses
-    df_frete['PERIODO'] = pd.to_datetime(df_frete['PERIODO'])
     ultimo_mes = df_frete['PERIODO'].max()
     tres_meses_atras = ultimo_mes - pd.DateOffset(months=3)
     df_frete_3_meses = df_frete[df_frete['PERIODO'] > tres_meses_atras]
@@ -1482,13 +1267,13 @@ def calcular_faturamento_frete(df_frete):
     faturamento_frete = df_frete_3_meses['Frete'].sum()
     return faturamento_frete
 
-def create_categoria_agregadas_table(df, vendedor_selecionado):
-    df_frete = fetch_data_frete()
-    df_benef = fetch_data_benef()
-    df_frete['Vendedor'] = df_frete['Vendedor'].str.split().str.get(0)
-    df_benef['Vendedor'] = df_benef['Vendedor'].str.split().str.get(0)
-    df_madeira = df_benef[df_benef['NOME_BENEF'] == 'Caixa de Madeira']
-    df_benef = df_benef[df_benef['NOME_BENEF'] != 'Caixa de Madeira']
+def create_categoria_agregadas_table(snap, vendedor_selecionado):
+    cubo = snap.cubo
+    # Frete e beneficiamento já filtrados pelo vendedor
+    visao = visao_vendedor(vendedor_selecionado)
+    df_frete = visao.frete
+    df_benef = visao.benef
+    df_madeira = visao.madeira
 
     subcategorias = {
     'KIT\'S PARA BOX': ['KIT BOX COMPLETO AL', 'KIT BOX COMPLETO IDEIA GLASS', 'KIT BOX COMPLETO IMPORTADO', 'KIT BOX COMPLETO PORTAL', 'KIT BOX COMPLETO PORTAL - AVARIA'],
@@ -1499,11 +1284,6 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
     'SERVIÇOS': ['MÃO DE OBRA'],
     }
 
-    if vendedor_selecionado != "TODOS OS VENDEDORES":
-        df = df[df['Vendedor'] == vendedor_selecionado]
-        df_frete = df_frete[df_frete['Vendedor'] == vendedor_selecionado]
-        df_benef = df_benef[df_benef['Vendedor'] == vendedor_selecionado]
-        df_madeira = df_madeira[df_madeira['Vendedor'] == vendedor_selecionado]
     
     # Preparação da lista de dados e somatórios de grupo
     total_realizado, total_projecao, total_meta = 0, 0, 0
@@ -1511,9 +1291,9 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
     for grupo, tipos in subcategorias.items():
         grupo_data = {'Subcategoria': grupo, 'Volume': 0, 'Realizado': 0, 'Projeção': 0, 'Meta': 0}
         for tipo in tipos:
-            realizado = calcular_somas_grupos(df, tipo)
+            realizado = calcular_somas_grupos(cubo, vendedor_selecionado, tipo)
             projecao = calc_projecao_categoria(realizado)
-            meta = calcular_media_faturamento_ultimos_3_meses(df, [tipo])
+            meta = calcular_media_faturamento_ultimos_3_meses(cubo, vendedor_selecionado, [tipo])
 
             grupo_data['Realizado'] += realizado
             grupo_data['Projeção'] += projecao
@@ -1521,9 +1301,9 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
 
             data.append({
                 'Subcategoria': f"· {tipo}",
-                'Realizado': f"R$ {realizado:,.2f}".format(grupo_data['Realizado']).replace(',', 'X').replace('.', ',').replace('X', '.'),
-                'Projeção': f"R$ {projecao:,.2f}".format(grupo_data['Realizado']).replace(',', 'X').replace('.', ',').replace('X', '.'),
-                'Meta': f"R$ {meta:,.2f}".format(grupo_data['Realizado']).replace(',', 'X').replace('.', ',').replace('X', '.'),
+                'Realizado': realizado,
+                'Projeção': projecao,
+                'Meta': meta,
                 'Projeção vs Meta': f"{100 * projecao / meta:.2f}%" if meta else "Meta não definida"
             })
         total_realizado += grupo_data['Realizado']
@@ -1531,35 +1311,17 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
         total_meta += grupo_data['Meta']
 
         grupo_data['Projeção vs Meta'] = f"{100 * grupo_data['Projeção'] / grupo_data['Meta']:.2f}%" if grupo_data['Meta'] else "Meta não definida"
-        # Formata valores para o grupo
-        grupo_data['Realizado'] = "R$ {:,.2f}".format(grupo_data['Realizado']).replace(',', 'X').replace('.', ',').replace('X', '.')
-        grupo_data['Projeção'] = "R$ {:,.2f}".format(grupo_data['Projeção']).replace(',', 'X').replace('.', ',').replace('X', '.')
-        grupo_data['Meta'] = "R$ {:,.2f}".format(grupo_data['Meta']).replace(',', 'X').replace('.', ',').replace('X', '.')
-
         # Insere os dados agregados do grupo no início de sua seção
         data.insert(len(data) - len(tipos), grupo_data)
 
     total_row = {
         'Subcategoria': 'Totais',
-        'Realizado': f"R$ {total_realizado:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Projeção': f"R$ {total_projecao:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Meta': f"R$ {total_meta:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        'Realizado': total_realizado,
+        'Projeção': total_projecao,
+        'Meta': total_meta
     }
     data.insert(0, total_row)  # Insere a linha de totais no início
 
-    df_outros_agregados = df[~df['Tipo_Produto'].isin(sum(subcategorias.values(), [])) & (df['Grupo'] == 'AGREGADOS')]
-    # Adapte as funções de cálculo se necessário para aceitar um df como argumento
-
-    realizado_outros = calcular_somas_grupos(df_outros_agregados, "OUTROS AGREGADOS")
-    projecao_outros = calc_projecao_categoria(realizado_outros)
-    meta_outros = calcular_media_faturamento_ultimos_3_meses(df_outros_agregados, ["OUTROS AGREGADOS"])
-    projecao_vs_meta_outros = f"{(projecao_outros / meta_outros) * 100:.2f}%" if meta_outros > 0 else " Meta não definida"
-
-    realizado_frete = calcular_somas_grupos_frete(df_frete)
-    projecao_frete = calc_projecao_categoria(realizado_frete)
-    meta_frete = calcular_media_faturamento_ultimos_3_meses_frete(df_frete)
-    projecao_vs_meta_frete = f"{(projecao_frete / meta_frete * 100) if meta_frete else 0:.2f}%"
-
     # Calcula dados para 'FRETE'
     realizado_frete = calcular_somas_grupos_frete(df_frete)
     projecao_frete = calc_projecao_categoria(realizado_frete)
@@ -1568,24 +1330,23 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
 
     data.append({
         'Subcategoria': '· FRETE',
-        'Realizado': f"R$ {realizado_frete:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Projeção': f"R$ {projecao_frete:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Meta': f"R$ {meta_frete:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+        'Realizado': realizado_frete,
+        'Projeção': projecao_frete,
+        'Meta': meta_frete,
         'Projeção vs Meta': projecao_vs_meta_frete
     })
 
     # Calcula dados para 'BENEFICIAMENTO'
-    df_benef_filtered = df_benef[df_benef['NOME_BENEF'] != 'Caixa de Madeira']
-    realizado_benef = calcular_somas_grupos_benef(df_benef_filtered)
+    realizado_benef = calcular_somas_grupos_benef(df_benef)
     projecao_benef = calc_projecao_categoria(realizado_benef)
-    meta_benef = calcular_media_faturamento_ultimos_3_meses_benef(df_benef_filtered)
+    meta_benef = calcular_media_faturamento_ultimos_3_meses_benef(df_benef)
     projecao_vs_meta_benef = f"{(projecao_benef / meta_benef * 100) if meta_benef else 0:.2f}%"
 
     data.append({
         'Subcategoria': '· BENEFICIAMENTO',
-        'Realizado': f"R$ {realizado_benef:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Projeção': f"R$ {projecao_benef:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Meta': f"R$ {meta_benef:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+        'Realizado': realizado_benef,
+        'Projeção': projecao_benef,
+        'Meta': meta_benef,
         'Projeção vs Meta': projecao_vs_meta_benef
     })
 
@@ -1596,9 +1357,9 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
 
     data.append({
         'Subcategoria': '· CAIXA DE MADEIRA',
-        'Realizado': f"R$ {realizado_madeira:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Projeção': f"R$ {projecao_madeira:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-        'Meta': f"R$ {meta_madeira:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+        'Realizado': realizado_madeira,
+        'Projeção': projecao_madeira,
+        'Meta': meta_madeira,
         'Projeção vs Meta': projecao_vs_meta_madeira
     })
 
@@ -1617,9 +1378,9 @@ def create_categoria_agregadas_table(df, vendedor_selecionado):
         id='categoria-agregadas-table',
         columns=[
             {'name': 'Subcategoria', 'id': 'Subcategoria'},
-            {'name': 'Realizado', 'id': 'Realizado'},
-            {'name': 'Projeção', 'id': 'Projeção'},
-            {'name': 'Meta', 'id': 'Meta', 'type': 'numeric'},
+            {'name': 'Realizado', 'id': 'Realizado', 'type': 'numeric', 'format': FORMATO_REAIS},
+            {'name': 'Projeção', 'id': 'Projeção', 'type': 'numeric', 'format': FORMATO_REAIS},
+            {'name': 'Meta', 'id': 'Meta', 'type': 'numeric', 'format': FORMATO_REAIS},
             {'name': 'Projeção vs Meta', 'id': 'Projeção vs Meta'}
         ],
         data=data,
@@ -1653,79 +1414,36 @@ def calcular_pontuacao(porcentagem):
     else:
         return 400
 
-# Função auxiliar para carregar imagens e converter para o formato adequado para uso no Dash
-def encode_image(image_file):
-    encoded = base64.b64encode(open(image_file, 'rb').read())
-    return f'data:image/png;base64,{encoded.decode()}'
-
 # Função para escolher a imagem com base na porcentagem
+# As imagens são servidas pela pasta assets (com cache do navegador); a resposta leva só a URL
 def image_for_percentage(percentage):
     if percentage >= 100:
-        return encode_image('assets/img/01feliz.png')
+        return app.get_asset_url('img/01feliz.png')
     elif percentage >= 50:
-        return encode_image('assets/img/02triste.png')
+        return app.get_asset_url('img/02triste.png')
     else:
-        return encode_image('assets/img/03triste.png')
+        return app.get_asset_url('img/03triste.png')
 
 @app.callback(
     Output("pontuacao-vendedor-destaque", "children"), 
     [Input("vendedor-dropdown", "value")]
 )
-
+@cache_callbacks.memoizar
 def atualizar_pontuacao_vendedor(vendedor_selecionado):
     if vendedor_selecionado == 'TODOS OS VENDEDORES':
         return "Selecione um vendedor"
 
-    temp_path = 'META_VENDEDORES.xlsx'
-    df_meta_vendedores = pd.read_excel(temp_path)
+    visao = visao_vendedor(vendedor_selecionado)
 
-    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
-    
-    meta_vendedor = df_meta_vendedores[df_meta_vendedores['NOME VENDEDOR'] == vendedor_selecionado]
-    if not meta_vendedor.empty:
-        meta_vidro = meta_vendedor['META VIDRO'].values[0]
-        meta_agregado = meta_vendedor['META AGREGADOS'].values[0]
-        meta_geral = meta_vendedor['META VENDEDOR'].values[0]
-
-        def projecao_vidro():
-            df_ = df
-            df_['Data_Pedido'] = pd.to_datetime(df_['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
-            df_filtrado = df_[(df_['Vendedor'] == vendedor_selecionado) & 
-                            (df_['Data_Pedido'] >= start_date_realizado) & 
-                            (df_['Data_Pedido'] <= end_date_realizado) & 
-                            (df_['Grupo'] == "VIDRO")]
-            df_filtrado_unico = df_filtrado.drop_duplicates(subset='Id_Pedido', keep='first')
-            valor_realizado_vendedor = df_filtrado_unico['TOTAL'].sum()
-            dias_uteis_ate_ontem_ = dias_uteis_ate_ontem(start_date_realizado, end_date_realizado - pd.Timedelta(days=1))
-            total_dias_uteis = total_dias_uteis_no_mes(start_date_realizado)
-
-            if dias_uteis_ate_ontem_ > 0:  
-                projecao = (valor_realizado_vendedor / dias_uteis_ate_ontem_) * total_dias_uteis
-            else: projecao = 0
-            return projecao
-        def projecao_agregado():
-            agregados = ['ACESSÓRIOS', 'ALUMÍNIO', 'FERRAGEM', 'KIT PARA BOX PADRÃO', 'SILICONE']
-            df_ = df
-            df_['Data_Pedido'] = pd.to_datetime(df_['Data_Pedido'], format='%d/%m/%Y', errors='coerce')
-
-            df_filtrado = df_[(df_['Vendedor'] == vendedor_selecionado) & 
-                            (df_['Data_Pedido'] >= start_date_realizado) & 
-                            (df_['Data_Pedido'] <= end_date_realizado) & 
-                            (df_['Grupo'].isin(agregados))]
-            
-            df_filtrado_unico = df_filtrado.drop_duplicates(subset='Id_Pedido', keep='first')
-            valor_realizado_vendedor = df_filtrado_unico['TOTAL'].sum()
-            dias_uteis_ate_ontem_ = dias_uteis_ate_ontem(start_date_realizado, end_date_realizado - pd.Timedelta(days=1))
-            total_dias_uteis = total_dias_uteis_no_mes(start_date_realizado)
-           
-            if dias_uteis_ate_ontem_ > 0: 
-                projecao = (valor_realizado_vendedor / dias_uteis_ate_ontem_) * total_dias_uteis
-            else: projecao = 0
-            return projecao
-
-        projecao_vidro_ = projecao_vidro()
-        projecao_agregado_ = projecao_agregado()
-        projecao_ = calc_projecao_vendedor(df, vendedor_selecionado)
+    meta_vendedor = metas_vendedores.atual().vendedor(vendedor_selecionado)
+    if meta_vendedor is not None:
+        meta_vidro = meta_vendedor['META VIDRO']
+        meta_agregado = meta_vendedor['META AGREGADOS']
+        meta_geral = meta_vendedor['META VENDEDOR']
+
+        projecao_vidro_ = visao.projecao_vidro
+        projecao_agregado_ = visao.projecao_agregados
+        projecao_ = visao.projecao
 
         porcentagem_vidro = (projecao_vidro_ / meta_vidro) * 100 if meta_vidro > 0 else 0
         porcentagem_agregado = (projecao_agregado_ / meta_agregado) * 100 if meta_agregado > 0 else 0
@@ -1772,32 +1490,46 @@ def atualizar_pontuacao_vendedor(vendedor_selecionado):
     Output('meta-vendedor-texto', 'children'),
     [Input('vendedor-dropdown', 'value')]
 )
+@cache_callbacks.memoizar
 def update_meta_vendedor(vendedor_selecionado):
     if vendedor_selecionado and vendedor_selecionado != 'TODOS OS VENDEDORES':
-        meta_vendedor = df_metas[df_metas['NOME VENDEDOR'] == vendedor_selecionado]['META VENDEDOR'].values[0]
-        return f"R$ {meta_vendedor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        meta_vendedor = metas_vendedores.atual().meta(vendedor_selecionado, 'META VENDEDOR')
+        if meta_vendedor is None:
+            return "Sem meta cadastrada"
+        return formatar_reais(meta_vendedor)
     else:
         return "Selecionar vendedor"
 
-mes_atual_nome = datetime.now().strftime('%B').capitalize()
-mensagem_atualizacao = f"Última atualização - Metas {mes_atual_nome}"
-hoje_ = pd.to_datetime('today').normalize()
-ontem_ = hoje_ - timedelta(days=1)
-primeiro_dia_do_mes_ = hoje.replace(day=1)
-ultimo_dia_do_mes_ = hoje + pd.offsets.MonthEnd(1)
-
-dias_corridos_ = dias_uteis_ate_ontem(primeiro_dia_do_mes_, ontem_)
-dias_uteis_mes_ = total_dias_uteis_no_mes(hoje_)
-dias_restantes_ = dias_uteis_ate_ontem(hoje_, ultimo_dia_do_mes_)
-
 ########## LAYOUT DASH
-app.layout = dbc.Container([
+def montar_layout():
+    # O layout é montado a cada carregamento da página a partir do snapshot atual
+    snap = atualizador.atual()
+    # Datas e dias úteis calculados a cada carregamento, para virar o dia/mês sem reiniciar
+    hoje_ = pd.to_datetime('today').normalize()
+    mensagem_atualizacao = f"Última atualização - Metas {hoje_.strftime('%B').capitalize()}"
+    dias_corridos_ = calendario.dias_uteis_ate_ontem(hoje_)
+    dias_uteis_mes_ = calendario.dias_uteis_mes(hoje_)
+    dias_restantes_ = calendario.dias_uteis_restantes(hoje_)
+    visao_geral = visao_vendedor(TODOS_OS_VENDEDORES)
+    valor_realizado = visao_geral.realizado
+    valor_projetado = visao_geral.projecao
+    meta_geral_valor = metas_vendedores.atual().meta_geral
+    percentual_comissao_str, tooltip_text = calcular_comissao(valor_projetado, meta_geral_valor)
+    fig_pilha = criar_grafico_pilha(snap.cubo, vendedor_padrao)
+    # Vendedor do login, resolvido uma vez por carregamento da página. Fora de uma requisição
+    # (validação do layout pelo Dash) não há login
+    autorizacao = request.authorization if has_request_context() else None
+    vendedor_sessao = autorizacao['username'] if autorizacao else ''
+
+    return dbc.Container([
     dcc.Interval(
         id='interval-update', 
         interval=300*1000,  # 5 minutos
         n_intervals=0
     ),
     dcc.Store(id='meta-value-store'),
+    dcc.Store(id='vendedor-sessao', data=vendedor_sessao or None),
+    dcc.Store(id='versao-snapshot', data=versao_dados()),
     dbc.Row([
         dbc.Col(html.H1("FAROL DE VENDAS", className="text-center-titulo"), width=12),
         html.P(mensagem_atualizacao, className="card-text", style={'color': '#3FB9C6', 'margin-top': '0px'})
@@ -1806,7 +1538,7 @@ app.layout = dbc.Container([
         dbc.Col(dbc.Card([dbc.CardBody([html.H5("Filtro Vendedor", className="card-title", style={'text-align': 'left'}),
             dcc.Dropdown(
                 id='vendedor-dropdown', 
-                options=[{'label': 'TODOS OS VENDEDORES', 'value': 'TODOS OS VENDEDORES'}] + get_vendedor_names(df),
+                options=get_vendedor_names(snap.pedidos),
                 value='TODOS OS VENDEDORES',
                 clearable=False,
                  style={'width': '100%', 'border': 'none', 'background-color': 'transparent', 'font-weight': 'bold'}  # define a largura do dropdown
@@ -1818,7 +1550,7 @@ app.layout = dbc.Container([
         html.Img(src=app.get_asset_url("img/iconmeta.svg"), style={'height': '50px', 'width': '50px'}),
         html.H5("META GERAL", className="card-title"),
     ], style={'display': 'flex', 'align-items': 'center'}),
-    html.Div(id="meta-geral-texto", children=meta_geral_formatada, className="card-text", style={'fontSize': '1.2rem'}),  # Tamanho da fonte ajustado
+    html.Div(id="meta-geral-texto", children=formatar_reais(meta_geral_valor), className="card-text", style={'fontSize': '1.2rem'}),  # Tamanho da fonte ajustado
     html.Div([
         html.P(f"Dias corridos: {dias_corridos_}", className="card-text", style={'font-size': '0.6rem', 'display': 'inline', 'margin-right': '10px', 'color': '#A3AED0'}),
         html.P(f"Dias úteis: {dias_uteis_mes_}", className="card-text", style={'font-size': '0.6rem', 'display': 'inline', 'margin-right': '10px', 'color': '#A3AED0'}),
@@ -1830,7 +1562,7 @@ app.layout = dbc.Container([
                             html.Img(src=app.get_asset_url("img/iconfinanc.svg"), style={'height': '50px', 'width': '50px'}),
                             html.H5("REALIZADO GERAL", className="card-title"),
                               ], style={'display': 'flex', 'align-items': 'center'}),
-                            html.P(f"R$ {valor_realizado:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'), className="card-text")
+                            html.P(formatar_reais(valor_realizado), className="card-text")
         ],className="card-topo")]), width=2),
         dbc.Col(
     dbc.Card([
@@ -1844,7 +1576,7 @@ app.layout = dbc.Container([
             ], style={'display': 'flex', 'align-items': 'center'}),
             html.P(
                 [
-                    f"R$ {valor_projetado:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+                    formatar_reais(valor_projetado),
                     " - ", 
                     html.Span(
                         f"{percentual_comissao_str}",
@@ -2027,5 +1759,7 @@ dbc.Row([
     
     ], className="container")
 
+app.layout = montar_layout
+
 if __name__ == "__main__":
     app.run_server(host='', debug=False)
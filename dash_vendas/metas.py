@@ -0,0 +1,92 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         metas.py
+
+* @brief
+    Metas dos vendedores (META_VENDEDORES.xlsx), lidas uma vez e indexadas por
+    NOME VENDEDOR.
+
+    A planilha só é lida de novo quando o arquivo muda: a cada acesso é feito
+    apenas um os.stat; se data de modificação ou tamanho mudarem, o conteúdo é
+    comparado pelo hash antes de reprocessar. A versão das metas entra na
+    chave do cache dos callbacks, de forma que uma alteração feita pela
+    gerência aparece no próximo clique, sem reiniciar o dashboard.
+"""
+import hashlib
+import io
+import os
+import threading
+import traceback
+
+import pandas as pd
+
+
+class TabelaMetas:
+    """Metas de uma versão da planilha, indexadas por NOME VENDEDOR."""
+
+    def __init__(self, df):
+        self.df = df
+        # Como no filtro original, vale a primeira linha de cada vendedor
+        self._por_vendedor = df.drop_duplicates('NOME VENDEDOR').set_index('NOME VENDEDOR')
+
+    def vendedor(self, nome):
+        """Linha de metas do vendedor (Series) ou None se ele não estiver na planilha."""
+        if nome not in self._por_vendedor.index:
+            return None
+        return self._por_vendedor.loc[nome]
+
+    def meta(self, nome, coluna):
+        linha = self.vendedor(nome)
+        return None if linha is None else linha[coluna]
+
+    @property
+    def meta_geral(self):
+        return self.df['META GERAL'].values[0]
+
+
+class MetasVendedores:
+    def __init__(self, caminho):
+        self._caminho = caminho
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._hash = None
+        self._tabela = None
+        self._versao = 0
+
+    def _verificar(self):
+        estado = os.stat(self._caminho)
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+        if assinatura == self._assinatura:
+            return
+        with self._lock:
+            if assinatura == self._assinatura:
+                return
+            with open(self._caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+            hash_conteudo = hashlib.sha1(conteudo).hexdigest()
+            if hash_conteudo != self._hash:
+                try:
+                    # Lê o mesmo conteúdo do hash: uma gravação no meio não separa tabela e hash
+                    tabela = TabelaMetas(pd.read_excel(io.BytesIO(conteudo)))
+                except Exception:
+                    # Planilha sendo salva ou inválida: mantém as metas anteriores e tenta de novo no próximo acesso
+                    if self._tabela is None:
+                        raise
+                    traceback.print_exc()
+                    return
+                self._tabela = tabela
+                self._hash = hash_conteudo
+                self._versao += 1
+            self._assinatura = assinatura
+
+    def atual(self):
+        """TabelaMetas da versão atual da planilha."""
+        self._verificar()
+        return self._tabela
+
+    @property
+    def versao(self):
+        self._verificar()
+        return self._versao
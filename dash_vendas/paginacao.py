@@ -0,0 +1,95 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         paginacao.py
+
+* @brief
+    Paginação, ordenação e filtro no servidor para DataTables com
+    page_action/sort_action/filter_action='custom'.
+
+    O DataFrame completo fica no servidor e só a página pedida pela tabela é
+    enviada ao navegador.
+"""
+import math
+
+import pandas as pd
+
+# Operadores do filter_query do DataTable, na ordem em que devem ser testados
+_OPERADORES = [
+    ('ge', ('>=', ' ge ')),
+    ('le', ('<=', ' le ')),
+    ('lt', ('<', ' lt ')),
+    ('gt', ('>', ' gt ')),
+    ('ne', ('!=', ' ne ')),
+    ('eq', ('=', ' eq ')),
+    ('contains', (' contains ',)),
+    ('datestartswith', (' datestartswith ',)),
+]
+
+
+def _separar_filtro(parte):
+    """'{coluna} op valor' -> (coluna, operador, valor)."""
+    for operador, simbolos in _OPERADORES:
+        for simbolo in simbolos:
+            if simbolo in parte:
+                nome, valor = parte.split(simbolo, 1)
+                nome = nome.strip()
+                nome = nome[nome.find('{') + 1:nome.rfind('}')]
+                valor = valor.strip()
+                if valor and valor[0] == valor[-1] and valor[0] in ('"', "'", '`'):
+                    valor = valor[1:-1].replace('\\' + valor[0], valor[0])
+                else:
+                    try:
+                        valor = float(valor)
+                    except ValueError:
+                        pass
+                return nome, operador, valor
+    return None, None, None
+
+
+def aplicar_filtro(df, filter_query):
+    """Aplica o filter_query da tabela (condições unidas por '&&')."""
+    if not filter_query:
+        return df
+    for parte in filter_query.split(' && '):
+        coluna, operador, valor = _separar_filtro(parte)
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        if operador == 'contains':
+            mascara = serie.astype(str).str.contains(str(valor), case=False, na=False, regex=False)
+        elif operador == 'datestartswith':
+            mascara = serie.astype(str).str.startswith(str(valor))
+        elif operador in ('eq', 'ne') and not pd.api.types.is_numeric_dtype(serie):
+            mascara = serie.astype(str) == str(valor)
+            mascara = ~mascara if operador == 'ne' else mascara
+        else:
+            if isinstance(valor, float) and not pd.api.types.is_numeric_dtype(serie):
+                serie = pd.to_numeric(serie, errors='coerce')
+            elif not isinstance(valor, float) and pd.api.types.is_numeric_dtype(serie):
+                serie = serie.astype(str)
+            mascara = getattr(serie, operador)(valor)
+        df = df[mascara]
+    return df
+
+
+def ordenar(df, sort_by):
+    """Ordena pelo sort_by da tabela; a ordem original é mantida nos empates."""
+    if not sort_by:
+        return df
+    colunas = [coluna['column_id'] for coluna in sort_by if coluna['column_id'] in df.columns]
+    if not colunas:
+        return df
+    crescente = [coluna['direction'] == 'asc' for coluna in sort_by if coluna['column_id'] in df.columns]
+    return df.sort_values(colunas, ascending=crescente, kind='mergesort')
+
+
+def pagina(df, page_current, page_size):
+    """Devolve (linhas da página, quantidade de páginas, página atual ajustada)."""
+    page_size = page_size or 20
+    page_current = page_current or 0
+    total_paginas = max(1, math.ceil(len(df) / page_size))
+    page_current = min(page_current, total_paginas - 1)
+    inicio = page_current * page_size
+    return df.iloc[inicio:inicio + page_size], total_paginas, page_current
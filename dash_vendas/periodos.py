@@ -0,0 +1,70 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         periodos.py
+
+* @brief
+    Recortes por período sobre tabelas ordenadas pela data.
+
+    As tabelas do snapshot são ordenadas pela coluna de data na montagem
+    (datas vazias no fim). Assim, qualquer intervalo de datas é uma fatia
+    posicional (df.iloc[i:j]) encontrada com searchsorted, sem montar máscaras
+    booleanas do tamanho da tabela. Para os meses, o IndiceMensal guarda as
+    posições de início e fim de cada mês, calculadas uma vez na carga.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _ja_ordenado(df, coluna):
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        return False
+    datas = df[coluna].to_numpy()
+    vazias = np.isnat(datas)
+    validas = len(datas) - int(vazias.sum())
+    if validas < 2:
+        return not vazias[:validas].any()
+    return not vazias[:validas].any() and bool(np.all(datas[1:validas] >= datas[:validas - 1]))
+
+
+def ordenar_por_data(df, coluna):
+    # Tabela já ordenada (ex.: lida do snapshot compartilhado) é devolvida sem cópia
+    if _ja_ordenado(df, coluna):
+        return df
+    # mergesort é estável: linhas do mesmo dia mantêm a ordem original
+    return df.sort_values(coluna, kind='mergesort', na_position='last', ignore_index=True)
+
+
+def _posicao(datas, data, lado):
+    return int(datas.searchsorted(pd.Timestamp(data).to_datetime64(), side=lado))
+
+
+def fatia(df, coluna, inicio=None, fim=None):
+    """Linhas com inicio <= data <= fim (limites opcionais) de um df ordenado por 'coluna'."""
+    datas = df[coluna].to_numpy()
+    i = 0 if inicio is None else _posicao(datas, inicio, 'left')
+    if fim is None:
+        # Sem limite final, as datas vazias (no fim da tabela) ficam de fora
+        j = len(datas) - int(np.isnat(datas).sum())
+    else:
+        j = _posicao(datas, fim, 'right')
+    return df.iloc[i:max(i, j)]
+
+
+class IndiceMensal:
+    """Posições [início, fim) de cada mês em uma tabela ordenada pela data."""
+
+    def __init__(self, df, coluna):
+        datas = df[coluna].to_numpy()
+        validas = datas[~np.isnat(datas)]
+        meses, inicios, quantidades = np.unique(validas.astype('datetime64[M]'), return_index=True, return_counts=True)
+        self._posicoes = {
+            pd.Period(mes, 'M'): (int(inicio), int(inicio + quantidade))
+            for mes, inicio, quantidade in zip(meses, inicios, quantidades)
+        }
+
+    def mes(self, data):
+        """slice com as linhas do mês de 'data' (vazio se não houver)."""
+        inicio, fim = self._posicoes.get(pd.Period(data, 'M'), (0, 0))
+        return slice(inicio, fim)
@@ -0,0 +1,86 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         persistencia.py
+
+* @brief
+    Cópia local das fontes preparadas em Parquet, para subir o dashboard sem
+    esperar o ERP.
+
+    A cada atualização as fontes (vendas, frete, beneficiamento e, no modo de
+    agregação no banco, pedidos e cubo) são gravadas em arquivos Parquet de
+    uma mesma geração, e por último o manifesto.json, com a versão do esquema,
+    a data da carga e os arquivos da geração. Como o manifesto é trocado com os.replace, quem lê
+    sempre vê uma geração completa. Ao reiniciar, o dashboard monta o snapshot
+    a partir dessa cópia e busca os dados novos em segundo plano.
+
+    VERSAO_ESQUEMA deve ser incrementada sempre que a preparação das fontes
+    mudar (colunas, tipos); cópias de outra versão são ignoradas.
+"""
+import glob
+import json
+import os
+import traceback
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+VERSAO_ESQUEMA = 1
+MANIFESTO = 'manifesto.json'
+
+
+class CacheSnapshotLocal:
+    def __init__(self, pasta, versao_esquema=VERSAO_ESQUEMA):
+        self._pasta = pasta
+        self._versao_esquema = versao_esquema
+
+    def salvar(self, fontes, criado_em=None):
+        """Grava as fontes (DataFrames) como uma nova geração e remove a anterior."""
+        os.makedirs(self._pasta, exist_ok=True)
+        geracao = uuid.uuid4().hex[:12]
+        arquivos = {}
+        for nome, df in fontes.items():
+            arquivo = f'{nome}-{geracao}.parquet'
+            df.to_parquet(os.path.join(self._pasta, arquivo), index=False)
+            arquivos[nome] = arquivo
+
+        manifesto = {
+            'versao_esquema': self._versao_esquema,
+            'criado_em': (criado_em or datetime.now()).isoformat(),
+            'geracao': geracao,
+            'arquivos': arquivos,
+        }
+        temporario = os.path.join(self._pasta, f'{MANIFESTO}.{geracao}')
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(manifesto, arquivo)
+        os.replace(temporario, os.path.join(self._pasta, MANIFESTO))
+
+        # Arquivos de gerações anteriores não são mais referenciados
+        for caminho in glob.glob(os.path.join(self._pasta, '*.parquet')):
+            if not caminho.endswith(f'-{geracao}.parquet'):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+
+    def carregar(self):
+        """Devolve (fontes, criado_em) da última geração, ou None se não houver cópia válida."""
+        caminho_manifesto = os.path.join(self._pasta, MANIFESTO)
+        if not os.path.exists(caminho_manifesto):
+            return None
+        try:
+            with open(caminho_manifesto, encoding='utf-8') as arquivo:
+                manifesto = json.load(arquivo)
+            if manifesto.get('versao_esquema') != self._versao_esquema:
+                return None
+            fontes = {
+                nome: pd.read_parquet(os.path.join(self._pasta, arquivo))
+                for nome, arquivo in manifesto['arquivos'].items()
+            }
+            return fontes, datetime.fromisoformat(manifesto['criado_em'])
+        except Exception:
+            # Cópia corrompida ou incompleta: segue como se não existisse
+            traceback.print_exc()
+            return None
@@ -0,0 +1,185 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         snapshot.py
+
+* @brief
+    Snapshot dos dados do dashboard e atualização em segundo plano.
+
+    Um snapshot reúne as fontes já preparadas (vendas, frete, beneficiamento e
+    caixa de madeira), a tabela de cabeçalho dos pedidos, o cubo mensal e a
+    coorte de clientes. Ele é montado inteiro fora do caminho das requisições e
+    publicado com uma troca atômica de referência, junto com um número de
+    versão. Cada callback pega o snapshot atual uma única vez e trabalha sobre
+    ele, mantendo uma visão consistente mesmo que uma nova versão seja publicada
+    no meio do processamento. Os DataFrames de um snapshot publicado não devem
+    ser alterados.
+
+    As tabelas do snapshot ficam ordenadas pela data, com um índice das
+    posições de cada mês: snap.mes() e snap.intervalo() devolvem fatias
+    posicionais (ver periodos.py).
+
+    O snapshot funciona como cache compartilhado de todas as fontes, com
+    validade igual ao intervalo de atualização: nenhum callback consulta o
+    banco. Pedidos de atualização simultâneos são agrupados em uma única carga.
+
+    Com um cache_local (persistencia.CacheSnapshotLocal), as fontes de cada
+    carga são gravadas em disco e restaurar() publica a última cópia na
+    subida do processo, antes da primeira consulta ao banco.
+"""
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+from coorte import CoorteClientes
+from cubo import CuboVendas
+from dados import montar_pedidos, separar_caixa_madeira
+from periodos import IndiceMensal, fatia, ordenar_por_data
+
+# Coluna de data de cada tabela do snapshot; as tabelas ficam ordenadas por ela
+COLUNAS_DATA = {
+    'vendas': 'Data_Pedido',
+    'pedidos': 'Data_Pedido',
+    'frete': 'PERIODO',
+    'benef': 'PERIODO',
+    'madeira': 'PERIODO',
+}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    versao: int
+    criado_em: datetime
+    vendas: pd.DataFrame
+    pedidos: pd.DataFrame
+    frete: pd.DataFrame
+    benef: pd.DataFrame
+    madeira: pd.DataFrame
+    cubo: CuboVendas
+    coorte: CoorteClientes
+    indices_mensais: dict
+
+    def mes(self, tabela, data):
+        """Linhas da tabela no mês de 'data' (fatia posicional, sem cópia)."""
+        return getattr(self, tabela).iloc[self.indices_mensais[tabela].mes(data)]
+
+    def intervalo(self, tabela, inicio=None, fim=None):
+        """Linhas da tabela com inicio <= data <= fim."""
+        return fatia(getattr(self, tabela), COLUNAS_DATA[tabela], inicio, fim)
+
+
+def montar_snapshot(fontes, versao, criado_em=None):
+    """Monta um snapshot completo a partir das fontes já preparadas."""
+    # No modo de agregação no banco, pedidos e cubo já chegam prontos
+    vendas = ordenar_por_data(fontes['vendas'], 'Data_Pedido')
+    if 'pedidos' in fontes:
+        pedidos = ordenar_por_data(fontes['pedidos'], 'Data_Pedido')
+    else:
+        # A primeira linha de cada pedido já vem na ordem das datas
+        pedidos = montar_pedidos(vendas)
+    benef, madeira = separar_caixa_madeira(ordenar_por_data(fontes['benef'], 'PERIODO'))
+    tabelas = {
+        'vendas': vendas,
+        'pedidos': pedidos,
+        'frete': ordenar_por_data(fontes['frete'], 'PERIODO'),
+        'benef': benef,
+        'madeira': madeira,
+    }
+    return Snapshot(
+        versao=versao,
+        criado_em=criado_em or datetime.now(),
+        cubo=CuboVendas.de_agregados(fontes['cubo']) if 'cubo' in fontes else CuboVendas(vendas),
+        coorte=CoorteClientes(tabelas['pedidos']),
+        indices_mensais={nome: IndiceMensal(df, COLUNAS_DATA[nome]) for nome, df in tabelas.items()},
+        **tabelas,
+    )
+
+
+class AtualizadorSnapshot:
+    """Recarrega as fontes periodicamente e publica novos snapshots."""
+
+    def __init__(self, carregar_fontes, intervalo=300, cache_local=None):
+        # carregar_fontes() deve devolver {'vendas': df, 'frete': df, 'benef': df}, já preparados,
+        # e opcionalmente 'pedidos' e 'cubo' prontos
+        self._carregar_fontes = carregar_fontes
+        self._intervalo = intervalo
+        self._cache_local = cache_local
+        self._atual = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def atual(self):
+        # A leitura de uma referência é atômica; o snapshot devolvido nunca muda
+        return self._atual
+
+    @property
+    def versao(self):
+        return self._atual.versao if self._atual is not None else 0
+
+    def atualizar(self):
+        """Monta um novo snapshot e o publica. Apenas uma atualização roda por vez."""
+        versao_antes = self.versao
+        with self._lock:
+            # Uma carga terminou enquanto esta chamada esperava: usa o snapshot dela
+            if self.versao != versao_antes:
+                return self._atual
+            fontes = self._carregar_fontes()
+            novo = montar_snapshot(fontes, self.versao + 1)
+            self._atual = novo
+        self._salvar_copia(fontes, novo.criado_em)
+        return novo
+
+    def _salvar_copia(self, fontes, criado_em):
+        if self._cache_local is None:
+            return
+        try:
+            self._cache_local.salvar(fontes, criado_em)
+        except Exception:
+            # A cópia local é só para a próxima subida; falhar aqui não afeta o snapshot publicado
+            traceback.print_exc()
+
+    def restaurar(self):
+        """Publica o snapshot salvo em disco, se houver. Devolve True se algum foi publicado."""
+        if self._cache_local is None:
+            return False
+        copia = self._cache_local.carregar()
+        if copia is None:
+            return False
+        fontes, criado_em = copia
+        with self._lock:
+            if self._atual is None:
+                self._atual = montar_snapshot(fontes, self.versao + 1, criado_em)
+                # As fontes incrementais continuam da cópia, em vez de recarregar todo o histórico
+                semear = getattr(self._carregar_fontes, 'semear', None)
+                if semear is not None:
+                    semear(fontes)
+        return True
+
+    def _executar(self, atualizar_agora):
+        if atualizar_agora:
+            try:
+                self.atualizar()
+            except Exception:
+                traceback.print_exc()
+        while not self._parar.wait(self._intervalo):
+            try:
+                self.atualizar()
+            except Exception:
+                # Mantém o último snapshot válido se a carga falhar
+                traceback.print_exc()
+
+    def iniciar(self, atualizar_agora=False):
+        # atualizar_agora: faz a primeira carga já na thread (ex.: depois de restaurar())
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, args=(atualizar_agora,),
+                                            name='atualizador-snapshot', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
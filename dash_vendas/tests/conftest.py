@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os módulos do dashboard são importados pelo nome (como no main.py) e os
+# compartilhados pelo pacote comum/, a partir da raiz do repositório
+PASTA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [PASTA, os.path.dirname(PASTA)]
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from agregacao_sql import buscar_cubo
+from cubo import TODOS_OS_VENDEDORES, CuboVendas
+from fontes_erp import montar_fontes
+
+CONSULTAS = {
+    'vendas': ('SELECT * FROM vendas WHERE 1 = 1 {filtro}', 'AND Data_Pedido >= %s'),
+    'benef': ('SELECT * FROM benef WHERE 1 = 1 {filtro}', 'AND PERIODO >= %s'),
+    'frete': ('SELECT * FROM frete WHERE 1 = 1 {filtro}', 'AND PERIODO >= %s'),
+}
+
+
+def _somas(meses, receita):
+    """Linhas como as do GROUP BY por vendedor, iguais em todos os níveis."""
+    linhas = [(pd.Timestamp(mes), vendedor, 'VIDRO', tipo, receita, 1.0, 2)
+              for mes in meses for vendedor in ('ANA', 'BRUNO') for tipo in ('TEMPERADO', 'COMUM')]
+    return pd.DataFrame(linhas, columns=['Mes', 'Vendedor', 'Grupo', 'Tipo_Produto', 'receita', 'm2', 'pedidos'])
+
+
+class BancoFalso:
+    """Devolve as somas do cubo; com o filtro de data, só os meses a partir dele com novos valores."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def consultar(self, query, params=None):
+        self.consultas.append(query)
+        if "Data_Pedido >= '2024-03-01'" in query:
+            return _somas(['2024-03-01'], 50.0)
+        return _somas(['2024-01-01', '2024-02-01', '2024-03-01'], 10.0)
+
+
+def test_cubo_soma_todos_os_vendedores_no_pandas():
+    banco = BancoFalso()
+    cubo = CuboVendas.de_agregados(buscar_cubo(banco.consultar, 'SELECT * FROM vendas'))
+
+    # Uma consulta por nível, só por vendedor
+    assert len(banco.consultas) == 3
+    assert cubo.valor('ANA', '2024-01', tipo='TEMPERADO') == 10.0
+    assert cubo.valor(TODOS_OS_VENDEDORES, '2024-01', tipo='TEMPERADO') == 20.0
+    assert cubo.valor(TODOS_OS_VENDEDORES, '2024-01', grupo='VIDRO', medida='pedidos') == 8
+    assert cubo.valor(None, '2024-01', tipo='COMUM', grupo='VIDRO', medida='pedidos') == 4
+
+
+def test_cubo_incremental_substitui_so_os_meses_do_corte():
+    banco = BancoFalso()
+    fonte = montar_fontes({'vendas': banco, 'benef': banco, 'frete': banco}, CONSULTAS,
+                          incremental=True, agregacao_sql=True)['cubo']
+    fonte.carregar()
+    assert all('Data_Pedido >=' not in consulta for consulta in banco.consultas)
+
+    banco.consultas.clear()
+    cubo = CuboVendas.de_agregados(fonte.carregar())
+    # Só o mês da marca d'água é agregado de novo; janeiro e fevereiro ficam como estavam
+    assert len(banco.consultas) == 3
+    assert all("Data_Pedido >= '2024-03-01'" in consulta for consulta in banco.consultas)
+    assert cubo.valor(TODOS_OS_VENDEDORES, '2024-01', tipo='TEMPERADO') == 20.0
+    assert cubo.valor(TODOS_OS_VENDEDORES, '2024-03', tipo='TEMPERADO') == 100.0
+    assert cubo.valor('ANA', '2024-03', tipo='TEMPERADO') == 50.0
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from cache import CacheVersionado
+
+
+def test_entradas_de_versoes_anteriores_sao_descartadas():
+    versao = [1]
+    cache = CacheVersionado(lambda: versao[0])
+    assert cache.obter('f', ('ANA',), lambda: 'v1') == 'v1'
+    assert cache.obter('f', ('ANA',), lambda: 'outro') == 'v1'
+
+    versao[0] = 2
+    assert cache.obter('f', ('ANA',), lambda: 'v2') == 'v2'
+    assert cache.estatisticas()['entradas'] == 1
+
+
+def test_mesma_chave_calculada_uma_vez():
+    cache = CacheVersionado(lambda: 1)
+    chamadas = []
+    liberar = threading.Event()
+
+    def calcular():
+        chamadas.append(1)
+        liberar.wait(5)
+        return 'ok'
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter('f', (), calcular))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+    assert resultados == ['ok'] * 5
+    assert len(chamadas) == 1
+
+
+def test_falha_libera_quem_espera():
+    cache = CacheVersionado(lambda: 1)
+
+    def falhar():
+        raise ValueError
+
+    try:
+        cache.obter('f', (), falhar)
+    except ValueError:
+        pass
+    assert cache.obter('f', (), lambda: 'ok') == 'ok'
@@ -0,0 +1,50 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from calendario import CalendarioUteis, feriados, pascoa
+
+
+def dias_uteis_ate_ontem(start_date, end_date, holidays=()):
+    # Contagem original do main.py (np.busday_count), aqui com os feriados
+    return np.busday_count(np.datetime64(start_date, 'D'), np.datetime64(end_date + np.timedelta64(1, 'D'), 'D'),
+                           holidays=list(holidays))
+
+
+def total_dias_uteis_no_mes(data, holidays=()):
+    inicio = data.replace(day=1)
+    fim = inicio + pd.offsets.MonthEnd(1)
+    return np.busday_count(np.datetime64(inicio, 'D'), np.datetime64(fim, 'D') + np.timedelta64(1, 'D'),
+                           holidays=list(holidays))
+
+
+def test_pascoa():
+    assert pascoa(2024) == date(2024, 3, 31)
+    assert pascoa(2025) == date(2025, 4, 20)
+    assert date(2025, 4, 18) in feriados(2025)
+
+
+def test_igual_a_contagem_com_busday_count():
+    calendario = CalendarioUteis(hoje='2024-01-15')
+    for hoje in pd.date_range('2024-01-01', '2025-12-31', freq='D'):
+        lista = feriados(hoje.year)
+        inicio = hoje.replace(day=1)
+        assert calendario.dias_uteis_mes(hoje) == total_dias_uteis_no_mes(hoje, lista)
+        assert calendario.dias_uteis_ate_ontem(hoje) == dias_uteis_ate_ontem(inicio, hoje - pd.Timedelta(days=1), lista)
+        assert calendario.dias_uteis_ate(hoje) == dias_uteis_ate_ontem(inicio, hoje, lista)
+
+
+def test_outubro_de_2024():
+    # 23 dias de semana; 12/10 cai no sábado e 24/10 (aniversário de Manaus) numa quinta
+    calendario = CalendarioUteis(hoje='2024-10-01')
+    assert calendario.dias_uteis_mes('2024-10-10') == 22
+    assert calendario.dias_uteis_ate_ontem('2024-10-25') == 17
+    assert calendario.dias_uteis_restantes('2024-10-25') == 5
+
+
+def test_fator_e_projecao():
+    calendario = CalendarioUteis(hoje='2024-10-01')
+    assert calendario.fator_projecao('2024-10-01') == 0.0
+    assert calendario.fator_projecao('2024-10-25') == 22 / 17
+    np.testing.assert_allclose(calendario.projetar(np.array([170.0, 0.0]), '2024-10-25'), [220.0, 0.0])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from coorte import CoorteClientes
+from cubo import TODOS_OS_VENDEDORES
+
+
+def _pedidos(quantidade=400, semente=7):
+    rng = np.random.default_rng(semente)
+    datas = pd.Timestamp('2023-06-01') + pd.to_timedelta(rng.integers(0, 400, quantidade), unit='D')
+    pedidos = pd.DataFrame({
+        'Data_Pedido': datas,
+        'Matriz_Cliente': rng.integers(1, 40, quantidade).astype(float),
+        'Vendedor': rng.choice(['ANA', 'BRUNO', 'CARLA'], quantidade),
+    })
+    pedidos.loc[[3, 10], 'Data_Pedido'] = pd.NaT
+    pedidos.loc[[5], 'Matriz_Cliente'] = np.nan
+    return pedidos
+
+
+def _resumo_por_filtro(pedidos, vendedor, ultimo_mes, quantidade):
+    # Mesmo cálculo mês a mês do card original, por máscaras sobre os pedidos
+    if vendedor != TODOS_OS_VENDEDORES:
+        pedidos = pedidos[pedidos['Vendedor'] == vendedor]
+    ultimo = pd.Period(ultimo_mes, 'M')
+    clientes = []
+    for deslocamento in range(quantidade, -1, -1):
+        mes = ultimo - deslocamento
+        do_mes = pedidos[(pedidos['Data_Pedido'] >= mes.start_time) & (pedidos['Data_Pedido'] <= mes.end_time)]
+        clientes.append(set(do_mes['Matriz_Cliente'].dropna()))
+    linhas = []
+    for anterior, atual in zip(clientes[:-1], clientes[1:]):
+        positivacao = len(atual) / len(anterior) * 100 if anterior else 0.0
+        recompra = len(atual & anterior) / len(anterior) * 100 if anterior else 0.0
+        linhas.append((len(atual), recompra, positivacao))
+    return linhas
+
+
+def test_resumo_igual_ao_filtro_mes_a_mes():
+    pedidos = _pedidos()
+    coorte = CoorteClientes(pedidos)
+    for vendedor in (TODOS_OS_VENDEDORES, 'ANA', 'CARLA'):
+        # Janelas dentro, no começo e além do período com pedidos
+        for ultimo_mes in ('2024-06-15', '2023-07-01', '2024-10-01'):
+            resumo = coorte.resumo(vendedor, ultimo_mes, quantidade=6)
+            esperado = _resumo_por_filtro(pedidos, vendedor, ultimo_mes, 6)
+            assert list(resumo.index) == list(pd.period_range(end=pd.Period(ultimo_mes, 'M'), periods=6, freq='M'))
+            np.testing.assert_allclose(resumo[['clientes', 'recompra', 'positivacao']].to_numpy(dtype=float),
+                                       np.array(esperado, dtype=float))
+
+
+def test_vendedor_desconhecido_e_sem_pedidos():
+    resumo = CoorteClientes(_pedidos()).resumo('ZECA', '2024-06-01', quantidade=3)
+    assert resumo['clientes'].tolist() == [0, 0, 0]
+    vazio = CoorteClientes(_pedidos().iloc[:0]).resumo(None, '2024-06-01', quantidade=2)
+    assert vazio['recompra'].tolist() == [0.0, 0.0]
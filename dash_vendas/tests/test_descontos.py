@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from dados import aplicar_descontos, calcular_desconto_vetorizado
+
+
+def apply_discount(row, coluna='total_produto'):
+    # Regra linha a linha original do main.py, usada como referência
+    if row['Tipo_Desconto'] == 'Porcentagem':
+        return max(0, row[coluna] - (row[coluna] * row['Desconto'] / 100))
+    elif row['Tipo_Desconto'] == 'Reais':
+        valor_frete = row.get('Valor_Frete', 0)
+        return ((row[coluna] * row['Desconto']) / ((row['TOTAL'] - valor_frete) + row['Desconto']) - row[coluna]) * (-1)
+    return row[coluna]
+
+
+def _vendas():
+    return pd.DataFrame({
+        'Tipo_Desconto': ['Porcentagem', 'Porcentagem', 'Reais', 'Reais', 'Nenhum', None, 'Porcentagem'],
+        'total_produto': [100.0, 50.0, 300.0, 200.0, 80.0, 40.0, 10.0],
+        'valor_beneficiamento': [0.0, 10.0, 25.0, 0.0, 5.0, 0.0, 2.0],
+        'Desconto': [10.0, 150.0, 50.0, 20.0, 0.0, 0.0, np.nan],
+        'TOTAL': [120.0, 50.0, 550.0, 230.0, 80.0, 40.0, 10.0],
+        'Valor_Frete': [20.0, 0.0, 0.0, 30.0, 0.0, 0.0, 0.0],
+    })
+
+
+def test_igual_a_regra_linha_a_linha():
+    df = _vendas()
+    for coluna in ('total_produto', 'valor_beneficiamento'):
+        esperado = df.apply(apply_discount, axis=1, coluna=coluna).to_numpy(dtype='float64')
+        np.testing.assert_allclose(calcular_desconto_vetorizado(df, coluna), esperado)
+
+
+def test_sem_coluna_de_frete():
+    df = _vendas().drop(columns='Valor_Frete')
+    esperado = df.apply(apply_discount, axis=1).to_numpy(dtype='float64')
+    np.testing.assert_allclose(calcular_desconto_vetorizado(df, 'total_produto'), esperado)
+
+
+def test_frete_vazio_conta_como_zero():
+    df = _vendas()
+    df['Valor_Frete'] = df['Valor_Frete'].astype(object)
+    df.loc[2, 'Valor_Frete'] = None
+    resultado = calcular_desconto_vetorizado(df, 'total_produto')
+    assert resultado[2] == 300.0 - (300.0 * 50.0) / (550.0 + 50.0)
+
+
+def test_aplicar_descontos_adiciona_colunas():
+    df = aplicar_descontos(_vendas())
+    assert {'total_produto_com_desconto', 'valor_beneficiamento_com_desconto'} <= set(df.columns)
+    assert df.loc[0, 'total_produto_com_desconto'] == 90.0
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from comum.banco import BackendSQLite, BancoDados
+from dados_sinteticos import CONSULTAS_SQLITE, gerar_dados, gravar_sqlite
+from fontes_erp import montar_fontes
+from ingestao import CarregadorParalelo
+
+HOJE = pd.Timestamp('2024-03-15')
+
+
+def _ordenar(df):
+    return df.sort_values('Id_Pedido', kind='mergesort', ignore_index=True)
+
+
+def test_atualizacao_incremental_pelo_sqlite(tmp_path):
+    brutos = gerar_dados(vendedores=3, clientes=50, anos=1, pedidos_por_mes=60, itens_por_pedido=2, hoje=HOJE)
+    do_dia = brutos['vendas']['Data_Pedido'] == HOJE.strftime('%d/%m/%Y')
+    caminho = str(tmp_path / 'erp.sqlite')
+    gravar_sqlite(caminho, dict(brutos, vendas=brutos['vendas'][~do_dia]))
+
+    banco = BancoDados(BackendSQLite(caminho), 'sintetico')
+    bancos = {'vendas': banco, 'frete': banco, 'benef': banco}
+    atualizar = CarregadorParalelo(montar_fontes(bancos, CONSULTAS_SQLITE, incremental=True, agregacao_sql=False))
+    primeira = atualizar()['vendas']
+    assert len(primeira) == (~do_dia).sum()
+
+    gravar_sqlite(caminho, {'vendas': brutos['vendas'][do_dia], 'frete': brutos['frete'].iloc[:0],
+                            'benef': brutos['benef'].iloc[:0]}, substituir=False)
+    consultas_antes = banco.metricas()['consultas']
+    incremental = atualizar()
+    assert banco.metricas()['consultas'] == consultas_antes + 3
+
+    completa = CarregadorParalelo(montar_fontes(bancos, CONSULTAS_SQLITE, incremental=False, agregacao_sql=False))()
+    for nome in ('vendas', 'frete', 'benef'):
+        assert len(incremental[nome]) == len(completa[nome])
+    pd.testing.assert_frame_equal(_ordenar(incremental['vendas']), _ordenar(completa['vendas']),
+                                  check_dtype=False, check_categorical=False)
@@ -0,0 +1,106 @@
+import pandas as pd
+
+from ingestao import CarregadorParalelo, FonteIncremental
+
+
+class BancoFalso:
+    """Tabela bruta em memória; registra o 'desde' de cada busca."""
+
+    def __init__(self, linhas):
+        self.tabela = pd.DataFrame(linhas, columns=['Id', 'Data', 'Valor'])
+        self.buscas = []
+
+    def buscar(self, desde=None):
+        self.buscas.append(desde)
+        if desde is None:
+            return self.tabela.copy()
+        return self.tabela[pd.to_datetime(self.tabela['Data']) >= desde].copy()
+
+
+def _preparar(df):
+    df['Data'] = pd.to_datetime(df['Data'])
+    return df
+
+
+def _fonte(banco, **kwargs):
+    return FonteIncremental(banco.buscar, _preparar, 'Data', janela_reconciliacao=pd.Timedelta(days=3), **kwargs)
+
+
+def _ordenado(df):
+    return df.sort_values('Id', ignore_index=True)
+
+
+def test_incremental_igual_a_carga_completa():
+    banco = BancoFalso([(1, '2024-03-01', 10), (2, '2024-03-05', 20), (3, '2024-03-10', 30), (4, None, 40)])
+    fonte = _fonte(banco, reconciliar_a_cada=2)
+    fonte.carregar()
+    assert banco.buscas == [None]
+
+    # Pedido novo no último dia, pedido alterado dentro da janela e pedido novo depois dela
+    banco.tabela.loc[banco.tabela['Id'] == 2, 'Valor'] = 25
+    banco.tabela.loc[len(banco.tabela)] = (5, '2024-03-10', 50)
+    banco.tabela.loc[len(banco.tabela)] = (6, '2024-03-11', 60)
+
+    # Ciclo 2 reconcilia: volta 3 dias a partir do último dia carregado
+    dados = fonte.carregar()
+    assert banco.buscas[-1] == pd.Timestamp('2024-03-07')
+    esperado = _preparar(banco.tabela.copy())
+    # A alteração do pedido 2 (antes da janela) ainda não foi vista
+    esperado.loc[esperado['Id'] == 2, 'Valor'] = 20
+    pd.testing.assert_frame_equal(_ordenado(dados), _ordenado(esperado), check_dtype=False)
+
+    # Ciclo 3 busca só a partir do último dia; a linha sem data é mantida
+    dados = fonte.carregar()
+    assert banco.buscas[-1] == pd.Timestamp('2024-03-11')
+    assert sorted(dados['Id']) == [1, 2, 3, 4, 5, 6]
+
+
+def test_reconciliacao_remove_linhas_apagadas():
+    banco = BancoFalso([(1, '2024-03-01', 10), (2, '2024-03-09', 20), (3, '2024-03-10', 30)])
+    fonte = _fonte(banco, reconciliar_a_cada=1)
+    fonte.carregar()
+
+    banco.tabela = banco.tabela[banco.tabela['Id'] != 2]
+    dados = fonte.carregar()
+    assert banco.buscas[-1] == pd.Timestamp('2024-03-07')
+    assert sorted(dados['Id']) == [1, 3]
+
+
+def test_sem_incremental_sempre_carga_completa():
+    banco = BancoFalso([(1, '2024-03-01', 10)])
+    fonte = _fonte(banco, incremental=False)
+    fonte.carregar()
+    fonte.carregar()
+    assert banco.buscas == [None, None]
+
+
+def test_carregador_paralelo_falha_sem_publicar():
+    def falhar():
+        raise ConnectionError('fora do ar')
+
+    class FonteFalha:
+        def buscar(self):
+            return falhar()
+
+    banco = BancoFalso([(1, '2024-03-01', 10)])
+    carregador = CarregadorParalelo({'ok': _fonte(banco), 'falha': FonteFalha()})
+    try:
+        carregador()
+    except RuntimeError as erro:
+        assert isinstance(erro.__cause__, ConnectionError)
+    else:
+        raise AssertionError('a falha de uma fonte deveria interromper a carga')
+
+
+def test_semear_continua_da_copia_restaurada():
+    banco = BancoFalso([(1, '2024-03-01', 10), (2, '2024-03-09', 20), (3, '2024-03-10', 30)])
+    copia = _preparar(banco.tabela.copy())
+    banco.tabela.loc[len(banco.tabela)] = (4, '2024-03-12', 40)
+
+    carregador = CarregadorParalelo({'vendas': _fonte(banco)})
+    carregador.semear({'vendas': copia})
+    dados = carregador()['vendas']
+
+    # Nada de carga completa: a primeira busca já reconcilia a partir da cópia
+    assert banco.buscas == [pd.Timestamp('2024-03-07')]
+    pd.testing.assert_frame_equal(_ordenado(dados), _ordenado(_preparar(banco.tabela.copy())), check_dtype=False)
@@ -0,0 +1,62 @@
+import pandas as pd
+
+from paginacao import aplicar_filtro, ordenar, pagina
+
+
+def _pivo():
+    return pd.DataFrame({
+        'Cliente': ['10 - VIDRACARIA SOL', '20 - PORTAL BOX', '30 - "ALFA" VIDROS', '40 - SOL NASCENTE'],
+        'Cidade': ['MANAUS', 'PARINTINS', 'MANAUS', 'COARI'],
+        '01/2024': [100.0, 0.0, 250.5, 40.0],
+        '02/2024': [0.0, 10.0, 30.0, 40.0],
+    })
+
+
+def _clientes(df):
+    return df['Cliente'].str.split(' - ').str[0].tolist()
+
+
+def test_sem_filtro_devolve_tudo():
+    df = _pivo()
+    assert aplicar_filtro(df, '') is df
+    assert aplicar_filtro(df, None) is df
+
+
+def test_contains_ignora_maiusculas():
+    assert _clientes(aplicar_filtro(_pivo(), '{Cliente} contains "sol"')) == ['10', '40']
+
+
+def test_texto_igual_e_diferente():
+    assert _clientes(aplicar_filtro(_pivo(), '{Cidade} = "MANAUS"')) == ['10', '30']
+    assert _clientes(aplicar_filtro(_pivo(), '{Cidade} ne "MANAUS"')) == ['20', '40']
+
+
+def test_comparacoes_numericas():
+    df = _pivo()
+    assert _clientes(aplicar_filtro(df, '{01/2024} > 50')) == ['10', '30']
+    assert _clientes(aplicar_filtro(df, '{01/2024} >= 40')) == ['10', '30', '40']
+    assert _clientes(aplicar_filtro(df, '{02/2024} < 10')) == ['10']
+    assert _clientes(aplicar_filtro(df, '{02/2024} le 10')) == ['10', '20']
+    assert _clientes(aplicar_filtro(df, '{01/2024} = 250.5')) == ['30']
+
+
+def test_condicoes_combinadas_e_coluna_desconhecida():
+    df = _pivo()
+    filtro = '{Cidade} = "MANAUS" && {02/2024} > 0 && {Inexistente} > 1'
+    assert _clientes(aplicar_filtro(df, filtro)) == ['30']
+
+
+def test_aspas_escapadas():
+    assert _clientes(aplicar_filtro(_pivo(), '{Cliente} contains "\\"ALFA\\""')) == ['30']
+
+
+def test_ordenar_estavel_e_pagina():
+    df = _pivo()
+    ordenado = ordenar(df, [{'column_id': '02/2024', 'direction': 'desc'}])
+    assert _clientes(ordenado) == ['40', '30', '20', '10']
+    empate = ordenar(df, [{'column_id': 'Cidade', 'direction': 'asc'}])
+    assert _clientes(empate) == ['40', '10', '30', '20']
+
+    linhas, total, atual = pagina(ordenado, 5, 3)
+    assert (total, atual) == (2, 1)
+    assert _clientes(linhas) == ['10']
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from periodos import IndiceMensal, fatia, ordenar_por_data
+
+
+def _tabela(datas):
+    return pd.DataFrame({'Data_Pedido': pd.to_datetime(datas), 'valor': np.arange(len(datas))})
+
+
+def test_ordenar_sem_datas_validas():
+    df = _tabela([None, None])
+    ordenado = ordenar_por_data(df, 'Data_Pedido')
+    assert ordenado is df
+
+
+def test_ordenar_com_uma_data_valida():
+    df = _tabela(['2024-03-01', None])
+    assert ordenar_por_data(df, 'Data_Pedido') is df
+
+    invertido = _tabela([None, '2024-03-01'])
+    ordenado = ordenar_por_data(invertido, 'Data_Pedido')
+    assert ordenado['valor'].tolist() == [1, 0]
+
+
+def test_ordenar_tabela_vazia():
+    df = _tabela([])
+    assert ordenar_por_data(df, 'Data_Pedido') is df
+
+
+def test_ordenar_mantem_ordem_do_mesmo_dia():
+    df = _tabela(['2024-03-02', None, '2024-03-01', '2024-03-02'])
+    ordenado = ordenar_por_data(df, 'Data_Pedido')
+    assert ordenado['valor'].tolist() == [2, 0, 3, 1]
+
+
+def test_fatia_igual_a_mascara():
+    datas = ['2024-01-31', '2024-02-01', None, '2024-02-15', '2024-02-29', '2024-03-01', None]
+    df = ordenar_por_data(_tabela(datas), 'Data_Pedido')
+    limites = [(None, None), ('2024-02-01', '2024-02-29'), ('2024-02-10', None), (None, '2024-01-31'),
+               ('2024-04-01', '2024-04-30'), ('2024-02-20', '2024-02-10')]
+    for inicio, fim in limites:
+        mascara = df['Data_Pedido'].notna()
+        if inicio is not None:
+            mascara &= df['Data_Pedido'] >= inicio
+        if fim is not None:
+            mascara &= df['Data_Pedido'] <= fim
+        esperado = df.loc[mascara, 'valor'].tolist()
+        assert fatia(df, 'Data_Pedido', inicio, fim)['valor'].tolist() == esperado
+
+
+def test_indice_mensal():
+    df = ordenar_por_data(_tabela(['2024-02-10', '2024-01-05', None, '2024-02-01']), 'Data_Pedido')
+    indice = IndiceMensal(df, 'Data_Pedido')
+    assert df.iloc[indice.mes('2024-02-20')]['valor'].tolist() == [3, 0]
+    assert df.iloc[indice.mes('2024-01-01')]['valor'].tolist() == [1]
+    assert len(df.iloc[indice.mes('2023-12-01')]) == 0
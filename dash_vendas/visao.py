@@ -0,0 +1,114 @@
+"""
+Projeto: Farol de Vendas - Dashboard Interativo
+
+* @copyrigth    Sávio Silas <svosilas@gmail.com> - DEV Portal Vidros
+* @file         visao.py
+
+* @brief
+    Visão do vendedor selecionado: os recortes e totais usados pelos cards,
+    gráficos e tabelas do Farol, para um (vendedor, dia, snapshot).
+
+    Em vez de cada callback filtrar o DataFrame inteiro pelo vendedor e pelo
+    mês atual, o filtro é feito uma vez aqui e os callbacks leem os atributos
+    da visão. Cada atributo é calculado no primeiro acesso e guardado; a visão
+    em si fica no cache dos callbacks (ver main.visao_vendedor). O mês atual
+    sai do índice mensal do snapshot, e o filtro do vendedor só percorre as
+    linhas desse mês.
+"""
+from functools import cached_property
+
+import pandas as pd
+
+from cubo import TODOS_OS_VENDEDORES
+from dados import GRUPOS_AGREGADOS
+from periodos import fatia
+
+
+def _do_vendedor(df, vendedor):
+    if vendedor == TODOS_OS_VENDEDORES:
+        return df
+    return df[df['Vendedor'] == vendedor]
+
+
+class VisaoVendedor:
+    def __init__(self, snap, vendedor, hoje, fator_projecao):
+        # hoje: data normalizada; fator_projecao: dias úteis do mês / dias úteis até ontem (0 no 1º dia útil)
+        self.snap = snap
+        self.vendedor = vendedor
+        self.hoje = hoje
+        self.inicio_mes = hoje.replace(day=1)
+        self.fator_projecao = fator_projecao
+
+    # Recortes (todos continuam ordenados pela data)
+    @cached_property
+    def pedidos_mes(self):
+        """Pedidos do vendedor no mês atual."""
+        return _do_vendedor(self.snap.mes('pedidos', self.hoje), self.vendedor)
+
+    @cached_property
+    def pedidos_ate_hoje(self):
+        return fatia(self.pedidos_mes, 'Data_Pedido', fim=self.hoje)
+
+    @cached_property
+    def vendas_mes(self):
+        """Itens de venda do vendedor no mês atual."""
+        return _do_vendedor(self.snap.mes('vendas', self.hoje), self.vendedor)
+
+    @cached_property
+    def frete(self):
+        return _do_vendedor(self.snap.frete, self.vendedor)
+
+    @cached_property
+    def benef(self):
+        return _do_vendedor(self.snap.benef, self.vendedor)
+
+    @cached_property
+    def madeira(self):
+        return _do_vendedor(self.snap.madeira, self.vendedor)
+
+    # Totais do mês
+    @cached_property
+    def realizado(self):
+        return self.pedidos_ate_hoje['TOTAL'].sum()
+
+    @cached_property
+    def realizado_ate_ontem(self):
+        return fatia(self.pedidos_mes, 'Data_Pedido', fim=self.hoje - pd.Timedelta(days=1))['TOTAL'].sum()
+
+    @cached_property
+    def diario(self):
+        """Faturamento por dia do mês atual (gráfico de linha)."""
+        return self.pedidos_ate_hoje.groupby('Data_Pedido', sort=False)['TOTAL'].sum().reset_index()
+
+    @cached_property
+    def localidade(self):
+        """(vendas na capital, vendas no interior) do mês atual."""
+        capital = self.pedidos_mes['Cidade'].str.lower() == 'manaus'
+        return self.pedidos_mes.loc[capital, 'TOTAL'].sum(), self.pedidos_mes.loc[~capital, 'TOTAL'].sum()
+
+    @cached_property
+    def clientes_por_grupo(self):
+        """(clientes de agregados, de vidro comum, de temperado) atendidos no mês atual."""
+        vendas = self.vendas_mes
+        vidro = vendas['Grupo'] == 'VIDRO'
+        agregados = vendas.loc[vendas['Grupo'].isin(GRUPOS_AGREGADOS), 'Matriz_Cliente'].nunique()
+        # 'VIDRO' na matriz é considerado 'Temperado'; na filial, 'Vidro Comum' (sem 'TÁBUA')
+        temperado = vendas.loc[vidro & (vendas['Loja'] == 'PORTAL VIDROS (MATRIZ INDÚSTRIA)'), 'Matriz_Cliente'].nunique()
+        vidro_comum = vendas.loc[vidro & (vendas['Subgrupo'] != 'TÁBUA') & (vendas['Loja'] == 'PORTAL VIDROS (FILIAL)'),
+                                 'Matriz_Cliente'].nunique()
+        return agregados, vidro_comum, temperado
+
+    # Projeções (realizado por dia útil x dias úteis do mês)
+    @cached_property
+    def projecao(self):
+        return self.realizado_ate_ontem * self.fator_projecao
+
+    @cached_property
+    def projecao_vidro(self):
+        pedidos = self.pedidos_ate_hoje
+        return pedidos.loc[pedidos['tem_vidro'], 'TOTAL'].sum() * self.fator_projecao
+
+    @cached_property
+    def projecao_agregados(self):
+        pedidos = self.pedidos_ate_hoje
+        return pedidos.loc[pedidos['tem_agregados'], 'TOTAL'].sum() * self.fator_projecao
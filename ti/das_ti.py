@@ -10,7 +10,6 @@ import dash
 from dash import html, dcc, Input, Output
 import pandas as pd
 import plotly.express as px
-import mysql.connector
 from flask import send_file
 from dash import callback_context
 import dash
@@ -18,10 +17,33 @@ from dash import html, dcc, Input, Output
 import dash_table
 import pandas as pd
 import plotly.express as px
-import mysql.connector
+import os
+import sys
+
+# Raiz do repositório no sys.path, para o pacote comum/ (módulos compartilhados entre os painéis)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.banco import conectar
+from comum.instrumentacao import instrumentar_callbacks
+
+banco_chamados = conectar({
+    'user': '',
+    'password': '',
+    'host': '',
+    'database': ''
+}, nome='chamados')
+
+def fetch_data():
+    query = '''
+    select ***
+    '''
+
+    return banco_chamados.consultar(query)
 
 app = dash.Dash(__name__)
 
+# Tempo, CPU, tamanho da resposta e erros de cada callback em /metrics
+instrumentar_callbacks(app)
+
 app.layout = html.Div([
     html.Div([
         dcc.DatePickerRange(